@@ -0,0 +1,45 @@
+from django.contrib.auth.backends import ModelBackend
+from . import hashing, tokens
+from .models import User
+
+
+class PooledModelBackend(ModelBackend):
+    """ModelBackend verifying the passwords in the pool of hashing.py.
+
+    Stored hashes made by another algorithm or at another cost than the
+    preferred hasher's are replaced on a successful login.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Hashes anyway, so that unknown usernames cannot be told
+            # apart by the time they take.
+            hashing.make_password(password)
+            return None
+
+        if not (hashing.check_password(password, user.password)
+                and self.user_can_authenticate(user)):
+            return None
+
+        if hashing.must_update(user.password):
+            self.rehash(user, password)
+        return user
+
+    @staticmethod
+    def rehash(user, password):
+        # An UPDATE rather than save(): the password is the same, so the
+        # tokens of the user must not be revoked.
+        encoded = hashing.make_password(password)
+        User.objects.filter(pk=user.pk, password=user.password).update(
+            password=encoded
+        )
+        user.password = encoded
+        user._credentials = user.credentials()
+        tokens.forget_user(user.pk)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """Django's PBKDF2 hasher, at PASSWORD_HASH_ITERATIONS iterations.
+
+    Hashes of another cost are upgraded (or downgraded) at the next login
+    of their user, see backends.py.
+    """
+
+    def __init__(self):
+        # Set on the instance, which the hashing pool gets pickled: its
+        # processes have no settings.
+        self.iterations = (getattr(settings, 'PASSWORD_HASH_ITERATIONS', None)
+                           or hashers.PBKDF2PasswordHasher.iterations)
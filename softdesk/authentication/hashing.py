@@ -0,0 +1,84 @@
+"""Password hashing off the request threads.
+
+Hashes are computed and verified by a pool of PASSWORD_HASHING_WORKERS
+processes: a burst of signups or logins queues there instead of running
+as many slow hashes at once as there are requests, which would starve
+the CPU and the workers every other request needs.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import (get_hasher, identify_hasher,
+                                         is_password_usable)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = getattr(settings, 'PASSWORD_HASHING_WORKERS',
+                                  None) or os.cpu_count()
+                # Spawned rather than forked: the request threads of the
+                # parent may hold locks a fork would copy.
+                _executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _executor
+
+
+def run(function, *args):
+    """Returns function(*args), computed by the pool.
+
+    A pool one of whose processes died is broken for good: it is replaced
+    by a new one, and the call is tried once more there.
+    """
+    global _executor
+    pool = executor()
+    try:
+        return pool.submit(function, *args).result()
+    except BrokenProcessPool:
+        with _lock:
+            if _executor is pool:
+                _executor = None
+        pool.shutdown(wait=False)
+        return executor().submit(function, *args).result()
+
+
+def make_password(password):
+    """Same as django.contrib.auth.hashers.make_password() for a usable
+    password, computed by the pool."""
+    hasher = get_hasher()
+    return run(hasher.encode, password, hasher.salt())
+
+
+def check_password(password, encoded):
+    """Same as django.contrib.auth.hashers.check_password() without a
+    setter, verified by the pool."""
+    if password is None or not is_password_usable(encoded):
+        return False
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return run(hasher.verify, password, encoded)
+
+
+def must_update(encoded):
+    """Tells whether a hash was made by another algorithm or at another
+    cost than those of the preferred hasher."""
+    preferred = get_hasher()
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return (hasher.algorithm != preferred.algorithm
+            or preferred.must_update(encoded))
@@ -1,5 +1,20 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import models
 
 
 class User(AbstractUser):
-    pass
+    # Bumped whenever the credentials change, which revokes the tokens
+    # issued before (see tokens.py).
+    token_version = models.PositiveIntegerField(default=0)
+
+    CREDENTIAL_FIELDS = {'password', 'is_active'}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        if not cls.CREDENTIAL_FIELDS & user.get_deferred_fields():
+            user._credentials = user.credentials()
+        return user
+
+    def credentials(self):
+        return (self.password, self.is_active)
@@ -1,8 +1,14 @@
+from collections.abc import Mapping
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from . import hashing
 from .models import User
 
 
 class UserSerializer(serializers.ModelSerializer):
+    password = serializers.CharField(write_only=True,
+                                     style={'input_type': 'password'})
+
     class Meta:
         model = User
         fields = [
@@ -10,5 +16,41 @@ class UserSerializer(serializers.ModelSerializer):
             'username',
             'first_name',
             'last_name',
-            'email'
+            'email',
+            'password'
         ]
+        extra_kwargs = {
+            'first_name': {'required': True},
+            'last_name': {'required': True},
+            'email': {'required': True}
+        }
+
+    def to_internal_value(self, data):
+        # As create_user() does, but before the uniqueness of the username
+        # is checked: 'ｃarol' is 'carol'.
+        if isinstance(data, Mapping):
+            data = data.copy()
+            if isinstance(data.get('username'), str):
+                data['username'] = User.normalize_username(data['username'])
+            if isinstance(data.get('email'), str):
+                data['email'] = User.objects.normalize_email(data['email'])
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        # Hashed once the data is known to be valid, then stored with a
+        # single INSERT.
+        validated_data['password'] = hashing.make_password(
+            validated_data['password']
+        )
+        try:
+            with transaction.atomic():
+                return User.objects.create(**validated_data)
+        except IntegrityError:
+            # Taken by a concurrent signup since the validation.
+            if not User.objects.filter(
+                username=validated_data['username']
+            ).exists():
+                raise
+            raise serializers.ValidationError({'username': [
+                User._meta.get_field('username').error_messages['unique']
+            ]})
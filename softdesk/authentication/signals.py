@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from . import tokens
+from .models import User
+
+
+@receiver(pre_save, sender=User)
+def bump_token_version(sender, instance, **kwargs):
+    credentials = getattr(instance, '_credentials', None)
+    if credentials is None and instance.pk is not None:
+        # Saved without being loaded first: its old credentials are
+        # unknown.
+        credentials = User.objects.filter(pk=instance.pk).values_list(
+            'password', 'is_active'
+        ).first()
+
+    if credentials is not None and credentials != instance.credentials():
+        instance.token_version += 1
+
+
+@receiver(post_save, sender=User)
+def forget_saved_user(sender, instance, created, **kwargs):
+    instance._credentials = instance.credentials()
+    tokens.forget_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    tokens.forget_user(instance.pk)
@@ -1,11 +1,21 @@
-from django.test import TestCase
+import datetime
+from django.db import connection
+from django.db.models import F
+from django.contrib.auth.hashers import get_hasher
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.tokens import AccessToken
+from projects import models
+from projects.tests.base import APITestCase
+from . import hashing, serializers, tokens
 from .models import User
 
 
-class CreateUserTest(TestCase):
+class CreateUserTest(APITestCase):
     def test_ok_complete_user(self):
         client = APIClient()
         
@@ -52,8 +62,100 @@ class CreateUserTest(TestCase):
         self.assertNotEqual(status.HTTP_201_CREATED, response.status_code)
         self.assertEqual(0, User.objects.count())
 
+    def test_ok_single_insert(self):
+        client = APIClient()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(reverse_lazy('authentication:signup'), {
+                'username': 'alice25',
+                'first_name': 'Alice',
+                'last_name': 'Morgan',
+                'email': 'alice.morgan@email.com',
+                'password': 'azerty'
+            })
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(1, inserts(queries))
+        self.assertTrue(User.objects.get().check_password('azerty'))
+
+    def test_err_invalid_user_no_write(self):
+        client = APIClient()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(reverse_lazy('authentication:signup'), {
+                'username': 'alice25',
+                'first_name': 'Alice',
+                'last_name': 'Morgan',
+                'email': 'notamail',
+                'password': 'azerty'
+            })
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('email', response.data)
+        self.assertEqual(0, inserts(queries))
+
+    def test_err_taken_username(self):
+        User.objects.create_user(username='alice25', password='qwerty')
+        client = APIClient()
+
+        response = client.post(reverse_lazy('authentication:signup'), {
+            'username': 'alice25',
+            'first_name': 'Alice',
+            'last_name': 'Morgan',
+            'email': 'alice.morgan@email.com',
+            'password': 'azerty'
+        })
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('username', response.data)
+        self.assertEqual(1, User.objects.count())
+
+    def test_err_username_taken_concurrently(self):
+        serializer = serializers.UserSerializer(data={
+            'username': 'alice25',
+            'first_name': 'Alice',
+            'last_name': 'Morgan',
+            'email': 'alice.morgan@email.com',
+            'password': 'azerty'
+        })
+        self.assertTrue(serializer.is_valid())
+        # Another signup of the same username wins the race.
+        User.objects.create_user(username='alice25', password='qwerty')
+
+        with self.assertRaises(ValidationError) as error:
+            serializer.save()
+
+        self.assertIn('username', error.exception.detail)
+        self.assertEqual(1, User.objects.count())
+
+    def test_ok_normalized(self):
+        client = APIClient()
+        data = {
+            'username': 'carol',
+            'first_name': 'Carol',
+            'last_name': 'Smith',
+            'email': 'carol@EMAIL.COM',
+            'password': 'azerty'
+        }
+
+        response = client.post(reverse_lazy('authentication:signup'), data)
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual('carol@email.com', User.objects.get().email)
+
+        # Fullwidth c: the same username once normalized.
+        response = client.post(reverse_lazy('authentication:signup'),
+                               {**data, 'username': '\uff43arol'})
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn('username', response.data)
+        self.assertEqual(1, User.objects.count())
+
+
+def inserts(queries):
+    return sum(query['sql'].startswith('INSERT')
+               for query in queries.captured_queries)
+
         
-class LoginTest(TestCase):
+class LoginTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(username='alice',
@@ -83,3 +185,202 @@ class LoginTest(TestCase):
         })
 
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
+
+    def test_ok_rehash(self):
+        hasher = get_hasher()
+        self.user.password = hasher.encode('coucou', hasher.salt(), 1000)
+        self.user.save()
+        version = User.objects.get(pk=self.user.pk).token_version
+
+        response = self.client.post(reverse_lazy('authentication:login'), {
+            'username': 'alice',
+            'password': 'coucou'
+        })
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertFalse(hasher.must_update(user.password))
+        self.assertTrue(user.check_password('coucou'))
+        # Same password: the tokens of the user are still valid.
+        self.assertEqual(version, user.token_version)
+
+    @override_settings(LOGIN_THROTTLE_RATES={'username': '2/min'})
+    def test_err_throttled_username(self):
+        for password in ['salut', 'bonjour']:
+            response = self.client.post(reverse_lazy('authentication:login'),
+                                        {'username': 'alice',
+                                         'password': password})
+            self.assertEqual(status.HTTP_401_UNAUTHORIZED,
+                             response.status_code)
+
+        response = self.client.post(reverse_lazy('authentication:login'), {
+            'username': 'alice',
+            'password': 'coucou'
+        })
+        self.assertEqual(status.HTTP_429_TOO_MANY_REQUESTS,
+                         response.status_code)
+        self.assertIn('Retry-After', response.headers)
+
+        # Other usernames have their own bucket.
+        response = self.client.post(reverse_lazy('authentication:login'), {
+            'username': 'bob',
+            'password': 'coucou'
+        })
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
+
+    def test_err_not_an_object(self):
+        for body in [[1, 2], 'alice']:
+            response = self.client.post(reverse_lazy('authentication:login'),
+                                        body, format='json')
+            self.assertEqual(status.HTTP_400_BAD_REQUEST,
+                             response.status_code)
+
+    def test_ok_broken_pool(self):
+        hashing.make_password('coucou')
+        # A dead process breaks the whole pool.
+        for process in list(hashing.executor()._processes.values()):
+            process.kill()
+            process.join()
+
+        response = self.client.post(reverse_lazy('authentication:login'), {
+            'username': 'alice',
+            'password': 'coucou'
+        })
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    @override_settings(LOGIN_THROTTLE_RATES={'address': '1/min',
+                                             'username': None})
+    def test_err_throttled_address(self):
+        self.client.post(reverse_lazy('authentication:login'), {
+            'username': 'alice',
+            'password': 'coucou'
+        })
+        response = self.client.post(reverse_lazy('authentication:login'), {
+            'username': 'bob',
+            'password': 'coucou'
+        })
+        self.assertEqual(status.HTTP_429_TOO_MANY_REQUESTS,
+                         response.status_code)
+
+
+class StatelessAuthenticationTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='alice',
+            password='azerty',
+            email='alice@email.com'
+        )
+
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+
+        self.url = reverse_lazy('projects:projects-detail',
+                                args=[self.project.id])
+
+    def login(self, password='azerty'):
+        response = self.client.post(reverse_lazy('authentication:login'), {
+            'username': 'alice',
+            'password': password
+        })
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}'
+        )
+        return response
+
+    def test_ok_no_user_query(self):
+        self.login()
+        self.client.get(self.url)
+
+        # Only the project: the role is cached and the user is the token.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    def test_ok_claims(self):
+        token = AccessToken(self.login().data['access'])
+        user = tokens.ClaimsUser(token)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.user.id, user.id)
+            self.assertEqual('alice', user.username)
+            self.assertTrue(user.is_active)
+            self.assertEqual(0, user.token_version)
+
+    def test_ok_full_user_on_demand(self):
+        token = AccessToken(self.login().data['access'])
+
+        with self.assertNumQueries(1):
+            self.assertEqual('alice@email.com',
+                             tokens.ClaimsUser(token).email)
+        with self.assertNumQueries(0):
+            self.assertEqual('alice@email.com',
+                             tokens.ClaimsUser(token).email)
+
+    def refresh(self, login):
+        return self.client.post(reverse_lazy('authentication:refresh'), {
+            'refresh': login.data['refresh']
+        })
+
+    def test_ok_refresh(self):
+        response = self.refresh(self.login())
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        token = AccessToken(response.data['access'])
+        self.assertEqual('alice', token['username'])
+        self.assertEqual(0, token[tokens.VERSION_CLAIM])
+
+    def test_err_revoked_by_new_password(self):
+        login = self.login()
+
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('qwerty')
+        user.save()
+
+        response = self.refresh(login)
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
+        self.assertEqual('token_revoked', response.data['code'])
+        self.assertEqual(status.HTTP_200_OK,
+                         self.refresh(self.login('qwerty')).status_code)
+
+    def test_err_revoked_by_deactivation(self):
+        login = self.login()
+
+        User.objects.get(pk=self.user.pk).save()
+        self.assertEqual(status.HTTP_200_OK, self.refresh(login).status_code)
+
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED,
+                         self.refresh(login).status_code)
+
+    def test_err_revoked_by_another_process(self):
+        login = self.login()
+
+        # No signal runs here, as in a worker that did not save the user.
+        User.objects.filter(pk=self.user.pk).update(
+            token_version=F('token_version') + 1
+        )
+
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED,
+                         self.refresh(login).status_code)
+
+    def test_err_expired_access(self):
+        token = AccessToken(self.login().data['access'])
+        token.set_exp(lifetime=-datetime.timedelta(seconds=1))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.assertEqual(status.HTTP_401_UNAUTHORIZED,
+                         self.client.get(self.url).status_code)
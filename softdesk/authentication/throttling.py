@@ -0,0 +1,101 @@
+"""Throttling of the logins with token buckets.
+
+Every client address and every username gets a bucket of N tokens,
+refilled at N per period for a LOGIN_THROTTLE_RATES rate of 'N/period';
+a login takes a token from both. The buckets live in the memory of each
+process: the limits are per worker, which is enough to keep a burst of
+logins from reaching the password hashes.
+"""
+import threading
+import time
+from collections.abc import Mapping
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+from softdesk.lru import LRUCache
+
+DEFAULT_RATES = {
+    'address': '100/min',
+    'username': '10/min'
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_buckets = LRUCache(getattr(settings, 'LOGIN_THROTTLE_BUCKETS', 10000))
+_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """Returns the capacity and the refill rate, in tokens per second, of
+    a 'N/period' rate."""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period[0]]
+
+
+def clear():
+    _buckets.clear()
+
+
+class TokenBucket:
+    def __init__(self, capacity, rate):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.stamp = time.monotonic()
+
+    def refill(self, now):
+        if now > self.stamp:
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+
+    def wait(self):
+        """Seconds until the bucket holds a token."""
+        return max(0, (1 - self.tokens) / self.rate)
+
+
+class LoginRateThrottle(BaseThrottle):
+    def get_rates(self):
+        return {**DEFAULT_RATES,
+                **getattr(settings, 'LOGIN_THROTTLE_RATES', {})}
+
+    def get_buckets(self, request):
+        keys = {'address': self.get_ident(request)}
+        # A JSON body may be a list or a string, which the serializer
+        # rejects after the throttle.
+        username = None
+        if isinstance(request.data, Mapping):
+            username = request.data.get('username')
+        if isinstance(username, str):
+            keys['username'] = username
+
+        buckets = []
+        for scope, rate in self.get_rates().items():
+            if rate is None or scope not in keys:
+                continue
+            key = (scope, keys[scope])
+            bucket = _buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(*parse_rate(rate))
+                _buckets.set(key, bucket)
+            buckets.append(bucket)
+        return buckets
+
+    def allow_request(self, request, view):
+        now = time.monotonic()
+        with _lock:
+            buckets = self.get_buckets(request)
+            for bucket in buckets:
+                bucket.refill(now)
+
+            self.buckets = buckets
+            if any(bucket.tokens < 1 for bucket in buckets):
+                return False
+
+            for bucket in buckets:
+                bucket.tokens -= 1
+            return True
+
+    def wait(self):
+        return max((bucket.wait() for bucket in self.buckets), default=None)
@@ -0,0 +1,109 @@
+"""Stateless JWT authentication.
+
+Access tokens carry the id, username, active flag and token version of
+their user, so that authenticating a request does not load their row:
+the user of the request is a ClaimsUser built from the token. The rest
+of the User row is only fetched, through a small per-process LRU, when
+an attribute the token lacks is read.
+
+Changing the password or the active flag of a user bumps their token
+version (see signals.py). The requests do not check it: their access
+tokens live ACCESS_TOKEN_LIFETIME, a few minutes, and a new one is only
+given for a refresh token of the current version of an active user.
+Revoking the tokens of a user takes effect within that lifetime, in
+every worker, without a query per request.
+"""
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt import serializers
+from rest_framework_simplejwt.authentication import (
+    JWTStatelessUserAuthentication
+)
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from softdesk.lru import LRUCache
+from .models import User
+
+VERSION_CLAIM = 'ver'
+
+_users = LRUCache(getattr(settings, 'USER_CACHE_SIZE', 1000),
+                  getattr(settings, 'USER_CACHE_TIMEOUT', 60))
+
+
+def get_user(user_id):
+    """Returns the User row of the given id, from the LRU if possible."""
+    user = _users.get(user_id)
+    if user is None:
+        user = User.objects.get(pk=user_id)
+        _users.set(user_id, user)
+    return user
+
+
+def forget_user(user_id):
+    _users.delete(user_id)
+
+
+def clear():
+    _users.clear()
+
+
+class ClaimsUser(TokenUser):
+    """The user of a token, as far as its claims tell."""
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', True)
+
+    @cached_property
+    def token_version(self):
+        return self.token.get(VERSION_CLAIM, 0)
+
+    @cached_property
+    def user(self):
+        """The User row, for what the claims do not tell."""
+        return get_user(self.id)
+
+    def __getattr__(self, attr):
+        if attr.startswith('_') or attr == 'token':
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.user, attr)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive',
+                                       code='user_inactive')
+
+        return user
+
+
+class TokenObtainPairSerializer(serializers.TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        # The access token gets the claims of the refresh token.
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['is_active'] = user.is_active
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    def validate(self, attrs):
+        # Where the revocations are checked, see the top of this module.
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            pk=refresh.get(api_settings.USER_ID_CLAIM)
+        ).only('is_active', 'token_version').first()
+        if (user is None or not user.is_active
+                or user.token_version != refresh.get(VERSION_CLAIM, 0)):
+            raise AuthenticationFailed('Token revoked',
+                                       code='token_revoked')
+
+        return super().validate(attrs)
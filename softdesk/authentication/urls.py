@@ -1,11 +1,11 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView
 from . import views
 
 app_name = 'authentication'
 
 urlpatterns = [
     path('signup/', views.LoginView.as_view(), name='signup'),
-    path('login/', TokenObtainPairView.as_view(), name='login')
+    path('login/', views.TokenView.as_view(), name='login'),
+    path('refresh/', views.RefreshView.as_view(), name='refresh')
     
 ]
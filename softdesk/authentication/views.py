@@ -1,32 +1,28 @@
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.response import Response
-from . import models
+from rest_framework_simplejwt.views import (TokenObtainPairView,
+                                            TokenRefreshView)
+from softdesk.metrics import InstrumentedViewMixin
+from . import serializers, throttling
 
 
-class LoginView(APIView):
+class LoginView(InstrumentedViewMixin, APIView):
     def post(self, request):
-        id = None
-        
-        try:
-            username = request.POST['username']
-            first_name = request.POST['first_name']
-            last_name = request.POST['last_name']
-            email = request.POST['email']
-            password = request.POST['password']
-            
-            user = models.User.objects.create_user(username=username,
-                                                   password=password)
-            id = user.id
-            user.first_name = first_name
-            user.last_name = last_name
-            user.email = email
+        serializer = serializers.UserSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(status=status.HTTP_400_BAD_REQUEST,
+                            data=serializer.errors)
 
-            user.full_clean()
-            user.save()
-        except Exception as err:
-            if id is not None:
-                models.User.objects.filter(id=id)[0].delete()
-            return Response(status=status.HTTP_400_BAD_REQUEST, data=str(err))
-        
+        serializer.save()
         return Response(status=status.HTTP_201_CREATED)
+
+
+class TokenView(InstrumentedViewMixin, TokenObtainPairView):
+    # The password is checked by backends.PooledModelBackend.
+    throttle_classes = [throttling.LoginRateThrottle]
+
+
+class RefreshView(InstrumentedViewMixin, TokenRefreshView):
+    # See tokens.TokenRefreshSerializer.
+    pass
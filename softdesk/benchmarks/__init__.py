@@ -0,0 +1,192 @@
+"""Benchmarks of the SoftDesk API.
+
+Each module is meant to be run from the directory of manage.py, e.g.::
+
+    python -m benchmarks.indexes --issues 1000000
+
+They all work on their own SQLite database (never on db.sqlite3), which
+they migrate and seed with setup() and seed() below.
+"""
+import os
+import random
+import sys
+import time
+
+import django
+
+
+def setup(database, **others):
+    """Points Django at the given database file and migrates it.
+
+    Every keyword argument declares another SQLite database alias, left
+    unmigrated, named after the keyword and stored in the given file.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softdesk.settings')
+
+    from django.conf import settings
+    # Whatever DATABASE_URL says.
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': database,
+    }
+    for alias, name in others.items():
+        settings.DATABASES[alias] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': name,
+        }
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def seed(users=100, projects=100, members=10, issues=10000, comments=10000,
+         batch_size=10000, seed=0, words=0):
+    """Fills the database with a random but reproducible dataset.
+
+    Every project gets `members` collaborators (its first one being the
+    author); issues and comments are spread evenly over the projects and
+    issues respectively. With `words`, their descriptions are made of as
+    many words drawn from vocabulary(). Returns the number of seconds
+    spent.
+    """
+    from django.db import transaction
+    from authentication.models import User
+    from projects import models
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    vocabulary, weights = _vocabulary()
+
+    def text(default):
+        if not words:
+            return default
+        return ' '.join(rng.choices(vocabulary, cum_weights=weights,
+                                    k=words))
+
+    def insert(model, rows, total):
+        batch = []
+        done = 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                done += _flush(model, batch)
+                _progress(model.__name__, done, total)
+        done += _flush(model, batch)
+        _progress(model.__name__, done, total, end='\n')
+
+    with transaction.atomic():
+        insert(User, (
+            User(username=f'user{i}', password='!')
+            for i in range(users)
+        ), users)
+        insert(models.Project, (
+            models.Project(title=f'Project {i}',
+                           description='seeded project',
+                           type=rng.choice(models.Project.TYPES)[0])
+            for i in range(projects)
+        ), projects)
+
+    user_ids = list(User.objects.values_list('id', flat=True))
+    project_ids = list(models.Project.objects.values_list('id', flat=True))
+    members = min(members, len(user_ids))
+
+    def collaborators():
+        for project_id in project_ids:
+            for i, user_id in enumerate(rng.sample(user_ids, members)):
+                role = (models.Collaborator.AUTHOR_ROLE if i == 0 else
+                        rng.choice(models.Collaborator.ROLES[:2])[0])
+                yield models.Collaborator(user_id=user_id,
+                                          project_id=project_id,
+                                          role=role)
+
+    def issue_rows():
+        for i in range(issues):
+            yield models.Issue(
+                title=f'Issue {i}',
+                description=text('seeded issue'),
+                tag=rng.choice(models.Issue.TAGS)[0],
+                priority=rng.randint(1, 5),
+                status=rng.choice(models.Issue.STATUS)[0],
+                project_id=project_ids[i % len(project_ids)],
+                author_id=rng.choice(user_ids),
+                assignee_id=rng.choice(user_ids)
+            )
+
+    with transaction.atomic():
+        insert(models.Collaborator, collaborators(),
+               members * len(project_ids))
+        insert(models.Issue, issue_rows(), issues)
+
+    issue_ids = list(models.Issue.objects.values_list('id', flat=True))
+
+    def comment_rows():
+        for i in range(comments):
+            yield models.Comment(
+                description=text(f'Comment {i}'),
+                author_id=rng.choice(user_ids),
+                issue_id=issue_ids[i % len(issue_ids)]
+            )
+
+    if issue_ids:
+        with transaction.atomic():
+            insert(models.Comment, comment_rows(), comments)
+
+    return time.perf_counter() - started
+
+
+def vocabulary(size=5000):
+    """Returns `size` made-up words, most frequent first."""
+    syllables = ['ba', 'ko', 'ri', 'mu', 'te', 'sa', 'lo', 'ni', 'da', 've',
+                 'pu', 'zo', 'ge', 'fi', 'ha', 'ju']
+    words = []
+    for i in range(size):
+        word = ''
+        i += len(syllables)
+        while i:
+            i, rest = divmod(i, len(syllables))
+            word += syllables[rest]
+        words.append(word)
+    return words
+
+
+def _vocabulary():
+    # Word frequencies follow Zipf's law, as in natural languages.
+    words = vocabulary()
+    weights = []
+    total = 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1 / rank
+        weights.append(total)
+    return words, weights
+
+
+def _flush(model, batch):
+    count = len(batch)
+    if count:
+        model.objects.bulk_create(batch)
+        batch.clear()
+    return count
+
+
+def _progress(name, done, total, end='\r'):
+    sys.stderr.write(f'  {name}: {done}/{total}{end}')
+    sys.stderr.flush()
+
+
+def measure(function, repeat):
+    """Calls function `repeat` times; returns the timings in ms, sorted."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)
+
+
+def percentile(timings, ratio):
+    """Nearest-rank percentile of already sorted timings."""
+    if not timings:
+        return 0.0
+    index = min(len(timings) - 1, max(0, round(ratio * len(timings)) - 1))
+    return timings[index]
@@ -0,0 +1,169 @@
+"""Compares the throughput of the read endpoints under WSGI and ASGI.
+
+Seeds (or reuses) a database, then has --concurrency clients poll the
+issue list of one of their projects, in process and without sockets:
+
+- wsgi: the WSGI handler, called from as many threads;
+- asgi sync: Django's ASGI handler with the DRF views, which it runs in
+  its single thread for sync code;
+- asgi async: the ASGI application of softdesk.asgi, whose read
+  endpoints are async views, with as many coroutines on one event loop.
+
+Prints the requests per second of each.
+
+    python -m benchmarks.asgi --requests 2000 --concurrency 1 16 64
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from . import seed, setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=os.path.join(
+        tempfile.gettempdir(), 'softdesk-asgi.sqlite3'
+    ))
+    parser.add_argument('--issues', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 16, 64])
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--reseed', action='store_true',
+                        help='drop the database and seed it again')
+    args = parser.parse_args()
+
+    if args.reseed and os.path.exists(args.db):
+        os.remove(args.db)
+    seeded = os.path.exists(args.db)
+    setup(args.db)
+    if not seeded:
+        spent = seed(issues=args.issues, comments=0)
+        print(f'Seeded in {spent:.1f}s')
+
+    from django.conf import settings
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['localhost']
+
+    from django.core.handlers.asgi import ASGIHandler
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+    from authentication.models import User
+    from authentication.tokens import TokenObtainPairSerializer
+    from projects import models
+    from softdesk.asgi import application
+
+    # One poller per user, each on the issues of one of its projects.
+    pollers = []
+    for user in User.objects.order_by('id')[:max(args.concurrency)]:
+        project_id = models.Collaborator.objects.filter(
+            user=user
+        ).values_list('project_id', flat=True).first()
+        token = TokenObtainPairSerializer.get_token(user).access_token
+        pollers.append((f'/api/v0/projects/{project_id}/issues/',
+                        f'Bearer {token}'))
+    query = f'page_size={args.page_size}'
+
+    factory = RequestFactory(SERVER_NAME='localhost')
+    wsgi = WSGIHandler()
+
+    def wsgi_get(path, authorization):
+        environ = factory.get(f'{path}?{query}',
+                              HTTP_AUTHORIZATION=authorization).environ
+        result = {}
+
+        def start_response(status, headers, exc_info=None):
+            result['status'] = int(status.split()[0])
+
+        response = wsgi(environ, start_response)
+        b''.join(response)
+        response.close()
+        return result['status']
+
+    async def asgi_get(app, path, authorization):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'headers': [(b'host', b'localhost'),
+                        (b'authorization', authorization.encode())],
+            'server': ('localhost', 80),
+            'client': ('127.0.0.1', 0),
+        }
+        result = {}
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                result['status'] = message['status']
+
+        await app(scope, receive, send)
+        return result['status']
+
+    def run_threads(concurrency):
+        remaining = iter(range(args.requests))
+        lock = threading.Lock()
+        statuses = []
+
+        def worker(path, authorization):
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                statuses.append(wsgi_get(path, authorization))
+
+        threads = [threading.Thread(target=worker, args=pollers[i])
+                   for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses
+
+    def run_coroutines(app, concurrency):
+        remaining = iter(range(args.requests))
+        statuses = []
+
+        async def worker(path, authorization):
+            while next(remaining, None) is not None:
+                statuses.append(await asgi_get(app, path, authorization))
+
+        async def run():
+            await asyncio.gather(*[worker(*pollers[i])
+                                   for i in range(concurrency)])
+
+        asyncio.run(run())
+        return statuses
+
+    modes = {
+        'wsgi': run_threads,
+        'asgi sync': lambda n: run_coroutines(ASGIHandler(), n),
+        'asgi async': lambda n: run_coroutines(application, n),
+    }
+
+    print(f'{args.requests} requests for {args.page_size} issues')
+    print(f'{"mode":<12}{"clients":>8}{"req/s":>10}')
+    for name, run in modes.items():
+        for concurrency in args.concurrency:
+            started = time.perf_counter()
+            statuses = run(concurrency)
+            rate = len(statuses) / (time.perf_counter() - started)
+            if set(statuses) != {200}:
+                raise SystemExit(f'{name}: unexpected statuses '
+                                 f'{sorted(set(statuses))}')
+            print(f'{name:<12}{concurrency:>8}{rate:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Times the hot queries of the API before and after the index pack.
+
+Seeds (or reuses) a database at the latest schema, copies its rows into a
+second database migrated only up to projects 0006, the schema before the
+index pack, then runs the SQL issued by the permissions and the list
+views against both. Prints the median and p95 of each query in
+milliseconds, and SQLite's query plans with --plans.
+
+    python -m benchmarks.indexes --issues 1000000 --comments 1000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+
+from . import measure, percentile, seed, setup
+
+BEFORE = ('projects', '0006_rename_contributor_collaborator')
+
+TABLES = [
+    'authentication_user',
+    'projects_project',
+    'projects_collaborator',
+    'projects_issue',
+    'projects_comment',
+]
+
+# The SQL of the membership resolver and of the list views, restricted to
+# the columns both schemas have.
+QUERIES = {
+    'membership': (
+        'SELECT (SELECT c.role FROM projects_collaborator c'
+        ' WHERE c.project_id = p.id AND c.user_id = :user LIMIT 1)'
+        ' FROM projects_project p WHERE p.id = :project LIMIT 1',
+    ),
+    'project list': (
+        'SELECT COUNT(*) FROM projects_project p'
+        ' INNER JOIN projects_collaborator c ON c.project_id = p.id'
+        ' WHERE c.user_id = :user',
+        'SELECT p.id, p.title, p.description, p.type, c.role'
+        ' FROM projects_project p'
+        ' INNER JOIN projects_collaborator c ON c.project_id = p.id'
+        ' WHERE c.user_id = :user ORDER BY p.id LIMIT 50',
+    ),
+    'open issues by priority': (
+        'SELECT id, title, tag, priority, status, author_id, assignee_id'
+        ' FROM projects_issue WHERE project_id = :project'
+        " AND status = 'OPEN' ORDER BY priority LIMIT 50",
+    ),
+    'assigned open issues': (
+        'SELECT COUNT(*) FROM projects_issue'
+        " WHERE assignee_id = :user AND status = 'OPEN'",
+    ),
+    'issue comments': (
+        'SELECT id, description, author_id, issue_id, created'
+        ' FROM projects_comment WHERE issue_id = :issue'
+        ' ORDER BY created LIMIT 50',
+    ),
+}
+
+
+def build_before(source, target):
+    """Migrates `target` to the schema before the pack and copies the
+    rows of `source` into it."""
+    from django.core.management import call_command
+
+    if os.path.exists(target):
+        os.remove(target)
+    call_command('migrate', *BEFORE, database='before', verbosity=0)
+
+    db = sqlite3.connect(target)
+    db.execute('ATTACH DATABASE ? AS source', [source])
+    for table in TABLES:
+        columns = _columns(db, 'main', table) & _columns(db, 'source', table)
+        columns = ', '.join(f'"{column}"' for column in sorted(columns))
+        db.execute(f'INSERT INTO main.{table} ({columns}) '
+                   f'SELECT {columns} FROM source.{table}')
+    db.commit()
+    db.execute('DETACH DATABASE source')
+    db.execute('ANALYZE')
+    db.close()
+
+
+def _columns(db, schema, table):
+    rows = db.execute(f'PRAGMA {schema}.table_info({table})')
+    return {row[1] for row in rows}
+
+
+def run(path, repeat, plans):
+    db = sqlite3.connect(path)
+    users = [row[0] for row in
+             db.execute('SELECT id FROM authentication_user')]
+    projects = [row[0] for row in
+                db.execute('SELECT id FROM projects_project')]
+    issues = [row[0] for row in db.execute('SELECT id FROM projects_issue')]
+    rng = random.Random(0)
+
+    def params():
+        return {'user': rng.choice(users), 'project': rng.choice(projects),
+                'issue': rng.choice(issues)}
+
+    results = {}
+    for name, statements in QUERIES.items():
+        if plans:
+            print(f'  {name}')
+            for sql in statements:
+                for row in db.execute('EXPLAIN QUERY PLAN ' + sql, params()):
+                    print(f'    {row[-1]}')
+
+        def query():
+            values = params()
+            for sql in statements:
+                db.execute(sql, values).fetchall()
+
+        results[name] = measure(query, repeat)
+
+    db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=os.path.join(tempfile.gettempdir(),
+                                                     'softdesk-bench.sqlite3'))
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--members', type=int, default=10)
+    parser.add_argument('--issues', type=int, default=1000000)
+    parser.add_argument('--comments', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--reseed', action='store_true',
+                        help='drop the database and seed it again')
+    parser.add_argument('--plans', action='store_true',
+                        help='print the query plans')
+    args = parser.parse_args()
+
+    before = args.db + '.before'
+    if args.reseed and os.path.exists(args.db):
+        os.remove(args.db)
+    seeded = os.path.exists(args.db)
+    setup(args.db, before=before)
+    if not seeded:
+        spent = seed(args.users, args.projects, args.members, args.issues,
+                     args.comments)
+        print(f'Seeded in {spent:.1f}s')
+    build_before(args.db, before)
+
+    print('Before the index pack')
+    old = run(before, args.repeat, args.plans)
+    print('After the index pack')
+    new = run(args.db, args.repeat, args.plans)
+
+    print(f'\n{"query":<26}{"before p50":>12}{"p95":>10}'
+          f'{"after p50":>12}{"p95":>10}{"speedup":>10}')
+    for name in QUERIES:
+        speedup = percentile(old[name], .5) / max(percentile(new[name], .5),
+                                                  1e-6)
+        print(f'{name:<26}{percentile(old[name], .5):>12.3f}'
+              f'{percentile(old[name], .95):>10.3f}'
+              f'{percentile(new[name], .5):>12.3f}'
+              f'{percentile(new[name], .95):>10.3f}{speedup:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
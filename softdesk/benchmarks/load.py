@@ -0,0 +1,458 @@
+"""Load test of every route of the API over HTTP.
+
+Seeds a fresh database, serves the WSGI application on a local port
+from a threaded server, then sends --requests requests to each route of
+authentication/urls.py and projects/urls.py from --concurrency client
+threads. Every client is a seeded user authoring a project; the rows
+that the writes consume are created beforehand, out of the timings.
+
+Prints and writes to --output, as JSON meant to be diffed between
+commits, the p50/p95/p99 latency in milliseconds, the throughput and the
+SQL queries per request of each route.
+
+    python -m benchmarks.load --requests 200 --concurrency 8 \\
+        --output load.json
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+from . import percentile, seed, setup
+
+QUERIES_HEADER = 'X-Benchmark-Queries'
+
+
+class Client:
+    """A seeded user, its token and the rows its requests work on."""
+
+    def __init__(self, username, user, token, project, issue, outsider):
+        self.username = username
+        self.user = user
+        self.token = token
+        self.project = project
+        self.issue = issue
+        self.outsider = outsider
+        # Rows created beforehand for the requests deleting them.
+        self.rows = {}
+
+    def take(self, kind):
+        return self.rows[kind].pop()
+
+
+def issue_body(client, title='load test issue'):
+    return {'title': title, 'description': 'created by benchmarks.load',
+            'tag': 'TASK', 'priority': 2, 'status': 'OPEN',
+            'author': client.user, 'assignee': client.user}
+
+
+def comment_body(client):
+    return {'description': 'created by benchmarks.load',
+            'author': client.user}
+
+
+def project_form(client):
+    return {'title': 'load test project',
+            'description': 'created by benchmarks.load',
+            'type': 'BACKEND', 'author': client.user}
+
+
+# name: (method, path, body, rows consumed). Paths and bodies are
+# functions of the client and the index of the request; bodies sent as
+# forms are marked with 'form'.
+counter = itertools.count()
+ROUTES = {
+    'signup': (
+        'POST', lambda c, i: '/api/v0/signup/',
+        lambda c, i: ('form', {'username': f'load{next(counter)}',
+                               'first_name': 'Load', 'last_name': 'Test',
+                               'email': 'load@test.com',
+                               'password': 'load test'}),
+        None),
+    'login': (
+        'POST', lambda c, i: '/api/v0/login/',
+        lambda c, i: ('form', {'username': c.username,
+                               'password': 'load test'}),
+        None),
+    'projects-list': ('GET', lambda c, i: '/api/v0/projects/', None, None),
+    'projects-create': (
+        'POST', lambda c, i: '/api/v0/projects/',
+        lambda c, i: ('form', project_form(c)), None),
+    'projects-detail': (
+        'GET', lambda c, i: f'/api/v0/projects/{c.project}/', None, None),
+    'projects-update': (
+        'PUT', lambda c, i: f'/api/v0/projects/{c.project}/',
+        lambda c, i: ('json', {'title': f'Project {i}',
+                               'description': 'updated by benchmarks.load',
+                               'type': 'BACKEND'}),
+        None),
+    'projects-destroy': (
+        'DELETE', lambda c, i: f'/api/v0/projects/{c.take("project")}/',
+        None, 'project'),
+    'projects-stats': (
+        'GET', lambda c, i: f'/api/v0/projects/{c.project}/stats/',
+        None, None),
+    'projects-export': (
+        'GET', lambda c, i: f'/api/v0/projects/{c.project}/export/',
+        None, None),
+    'projects-search': (
+        'GET',
+        lambda c, i: f'/api/v0/projects/{c.project}/search/?q=seeded',
+        None, None),
+    'users-list': (
+        'GET', lambda c, i: f'/api/v0/projects/{c.project}/users/',
+        None, None),
+    'users-create': (
+        'POST', lambda c, i: f'/api/v0/projects/{c.take("member")}/users/',
+        lambda c, i: ('form', {'user': c.outsider, 'role': 'CONTRIBUTOR'}),
+        'member'),
+    'users-destroy': (
+        'DELETE',
+        lambda c, i: (f'/api/v0/projects/{c.take("collaborator")}/users/'
+                      f'{c.outsider}/'),
+        None, 'collaborator'),
+    'issues-list': (
+        'GET', lambda c, i: f'/api/v0/projects/{c.project}/issues/',
+        None, None),
+    'issues-list-filtered': (
+        'GET',
+        lambda c, i: (f'/api/v0/projects/{c.project}/issues/'
+                      f'?status=OPEN&ordering=-priority'),
+        None, None),
+    'issues-create': (
+        'POST', lambda c, i: f'/api/v0/projects/{c.project}/issues/',
+        lambda c, i: ('json', issue_body(c)), None),
+    'issues-bulk-create': (
+        'POST', lambda c, i: f'/api/v0/projects/{c.project}/issues/bulk/',
+        lambda c, i: ('json', [issue_body(c, f'bulk {n}')
+                               for n in range(50)]),
+        None),
+    'issues-bulk-update': (
+        'PATCH', lambda c, i: f'/api/v0/projects/{c.project}/issues/bulk/',
+        lambda c, i: ('json', {'filter': {'author': c.user},
+                               'patch': {'priority': 1 + i % 5}}),
+        None),
+    'issues-update': (
+        'PUT',
+        lambda c, i: f'/api/v0/projects/{c.project}/issues/{c.issue}/',
+        lambda c, i: ('json', issue_body(c, f'updated {i}')), None),
+    'issues-destroy': (
+        'DELETE',
+        lambda c, i: (f'/api/v0/projects/{c.project}/issues/'
+                      f'{c.take("issue")}/'),
+        None, 'issue'),
+    'comments-list': (
+        'GET',
+        lambda c, i: (f'/api/v0/projects/{c.project}/issues/{c.issue}/'
+                      f'comments/'),
+        None, None),
+    'comments-create': (
+        'POST',
+        lambda c, i: (f'/api/v0/projects/{c.project}/issues/{c.issue}/'
+                      f'comments/'),
+        lambda c, i: ('json', comment_body(c)), None),
+    'comments-detail': (
+        'GET',
+        lambda c, i: (f'/api/v0/projects/{c.project}/issues/{c.issue}/'
+                      f'comments/{c.rows["comments"][0]}/'),
+        None, None),
+    'comments-update': (
+        'PUT',
+        lambda c, i: (f'/api/v0/projects/{c.project}/issues/{c.issue}/'
+                      f'comments/{c.rows["comments"][0]}/'),
+        lambda c, i: ('json', comment_body(c)), None),
+    'comments-destroy': (
+        'DELETE',
+        lambda c, i: (f'/api/v0/projects/{c.project}/issues/{c.issue}/'
+                      f'comments/{c.take("comment")}/'),
+        None, 'comment'),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=os.path.join(
+        tempfile.gettempdir(), 'softdesk-load.sqlite3'
+    ))
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--members', type=int, default=10)
+    parser.add_argument('--issues', type=int, default=100000)
+    parser.add_argument('--comments', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--routes', nargs='+', choices=sorted(ROUTES),
+                        help='only load these routes')
+    parser.add_argument('--output', help='JSON file of the results')
+    args = parser.parse_args()
+
+    # Every run starts over: the writes of a run change the dataset.
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    setup(args.db)
+    spent = seed(users=args.users, projects=args.projects,
+                 members=args.members, issues=args.issues,
+                 comments=args.comments)
+    print(f'Seeded in {spent:.1f}s')
+
+    from django.conf import settings
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+    settings.LOGIN_THROTTLE_RATES = {'address': None, 'username': None}
+
+    routes = {name: ROUTES[name] for name in args.routes or ROUTES}
+    clients = prepare(args, routes)
+    server, port = serve()
+
+    results = {}
+    print(f'{"route":<22}{"p50":>9}{"p95":>9}{"p99":>9}{"req/s":>9}'
+          f'{"queries":>9}{"errors":>8}')
+    for name, route in routes.items():
+        result = results[name] = load(port, clients, route, args)
+        print(f'{name:<22}{result["p50"]:>9.2f}{result["p95"]:>9.2f}'
+              f'{result["p99"]:>9.2f}{result["throughput"]:>9.1f}'
+              f'{result["queries"]:>9.1f}{result["errors"]:>8}')
+    server.shutdown()
+
+    if args.output:
+        report = {
+            'commit': commit(),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'dataset': {name: getattr(args, name) for name in
+                        ['users', 'projects', 'members', 'issues',
+                         'comments']},
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'routes': results,
+        }
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+            file.write('\n')
+
+
+def prepare(args, routes):
+    """Returns the clients, with the rows their writes will consume."""
+    from django.contrib.auth.hashers import make_password
+    from authentication.models import User
+    from authentication.tokens import TokenObtainPairSerializer
+    from projects import models
+
+    count = min(args.concurrency, args.users)
+    share = -(-args.requests // count)
+    kinds = {consumed for *_, consumed in routes.values() if consumed}
+    password = make_password('load test')
+    authors = models.Collaborator.objects.filter(
+        role=models.Collaborator.AUTHOR_ROLE
+    )
+
+    def projects(user):
+        # New projects authored by the user, for the requests deleting
+        # them or changing their members.
+        rows = models.Project.objects.bulk_create(
+            models.Project(title='load test project',
+                           description='created by benchmarks.load',
+                           type=models.Project.BACKEND_TYPE)
+            for _ in range(share)
+        )
+        models.Collaborator.objects.bulk_create(
+            models.Collaborator(user=user, project=project,
+                                role=models.Collaborator.AUTHOR_ROLE)
+            for project in rows
+        )
+        return [project.id for project in rows]
+
+    # The first project each client authors.
+    owned = {}
+    for user_id, project_id in authors.order_by(
+        'user_id', 'project_id'
+    ).values_list('user_id', 'project_id').iterator():
+        owned.setdefault(user_id, project_id)
+        if len(owned) == count:
+            break
+    if len(owned) < count:
+        raise SystemExit(f'Only {len(owned)} users author a project: seed '
+                         f'more projects')
+    users = User.objects.in_bulk(list(owned))
+
+    clients = []
+    for index, (user_id, project) in enumerate(owned.items()):
+        user = users[user_id]
+        user.password = password
+        user.save()
+
+        issue_row = {'project_id': project, 'author_id': user.id,
+                     'assignee_id': user.id, 'title': 'load test issue',
+                     'description': 'created by benchmarks.load',
+                     'tag': models.Issue.TASK_TAG, 'priority': 2,
+                     'status': models.Issue.OPEN_STATUS}
+        issue = models.Issue.objects.create(**issue_row)
+        comment_row = {'issue': issue, 'author': user,
+                       'description': 'created by benchmarks.load'}
+        outsider = User.objects.create(username=f'outsider{index}',
+                                       password='!')
+        token = TokenObtainPairSerializer.get_token(user).access_token
+
+        client = Client(user.username, user.id, str(token), project,
+                        issue.id, outsider.id)
+        client.rows['comments'] = [
+            models.Comment.objects.create(**comment_row).id
+        ]
+        if 'project' in kinds:
+            client.rows['project'] = projects(user)
+        if 'member' in kinds:
+            client.rows['member'] = projects(user)
+        if 'collaborator' in kinds:
+            client.rows['collaborator'] = projects(user)
+            models.Collaborator.objects.bulk_create(
+                models.Collaborator(user=outsider, project_id=project_id,
+                                    role=models.Collaborator.CONTRIBUTOR_ROLE)
+                for project_id in client.rows['collaborator']
+            )
+        if 'issue' in kinds:
+            client.rows['issue'] = [
+                models.Issue.objects.create(**issue_row).id
+                for _ in range(share)
+            ]
+        if 'comment' in kinds:
+            client.rows['comment'] = [
+                models.Comment.objects.create(**comment_row).id
+                for _ in range(share)
+            ]
+        clients.append(client)
+    return clients
+
+
+def serve():
+    """Serves the WSGI application on a free local port, from a thread.
+
+    Each response tells in QUERIES_HEADER how many SQL queries it took.
+    """
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import (WSGIRequestHandler, WSGIServer,
+                                       make_server)
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+
+    handler = WSGIHandler()
+
+    def application(environ, start_response):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = []
+        with connection.execute_wrapper(count):
+            response = handler(environ,
+                               lambda *args: started.append(args))
+            # Streamed responses run their queries while they are read.
+            body = b''.join(response)
+            response.close()
+
+        status, headers = started[0][:2]
+        start_response(status, headers + [(QUERIES_HEADER, str(queries))])
+        return [body]
+
+    class Server(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+    class Handler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = make_server('127.0.0.1', 0, application, Server, Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_port
+
+
+def load(port, clients, route, args):
+    """Sends the requests of a route; returns their statistics."""
+    method, path, body, consumed = route
+    lock = threading.Lock()
+    timings = []
+    queries = []
+    errors = []
+
+    def run(client, first):
+        # Each client sends its share of the requests, which is as many
+        # as the rows created for it.
+        for i in range(first, args.requests, len(clients)):
+            headers = {'Authorization': f'Bearer {client.token}'}
+            content = None
+            if body is not None:
+                kind, data = body(client, i)
+                if kind == 'form':
+                    content = urlencode(data)
+                    headers['Content-Type'] = \
+                        'application/x-www-form-urlencoded'
+                else:
+                    content = json.dumps(data)
+                    headers['Content-Type'] = 'application/json'
+            url = path(client, i)
+
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            started = time.perf_counter()
+            try:
+                connection.request(method, url, content, headers)
+                response = connection.getresponse()
+                response.read()
+            except OSError as error:
+                with lock:
+                    errors.append(type(error).__name__)
+                continue
+            finally:
+                connection.close()
+            elapsed = (time.perf_counter() - started) * 1000
+
+            with lock:
+                timings.append(elapsed)
+                queries.append(int(response.headers[QUERIES_HEADER] or 0))
+                if response.status >= 400:
+                    errors.append(response.status)
+
+    threads = [threading.Thread(target=run, args=(client, first))
+               for first, client in enumerate(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        'requests': len(timings),
+        'p50': round(percentile(timings, .5), 3),
+        'p95': round(percentile(timings, .95), 3),
+        'p99': round(percentile(timings, .99), 3),
+        'throughput': round(len(timings) / elapsed, 1),
+        'queries': round(sum(queries) / max(len(queries), 1), 2),
+        'max_queries': max(queries, default=0),
+        'errors': len(errors),
+        'statuses': sorted(set(map(str, errors))),
+    }
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Measures the throughput of the login endpoint.
+
+Creates users sharing one password hash, then logs them in from
+--concurrency threads at once, through the process pool of
+authentication/hashing.py and through Django's ModelBackend, which
+verifies the password on the request thread. The throttle is disabled.
+Prints the logins per second, overall and per CPU.
+
+    python -m benchmarks.login --logins 200 --concurrency 1 4 16
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from . import setup
+
+BACKENDS = {
+    'pool': 'authentication.backends.PooledModelBackend',
+    'thread': 'django.contrib.auth.backends.ModelBackend'
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=os.path.join(
+        tempfile.gettempdir(), 'softdesk-login.sqlite3'
+    ))
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 4, 16])
+    parser.add_argument('--iterations', type=int,
+                        help='PBKDF2 iterations (Django\'s by default)')
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    setup(args.db)
+
+    from django.conf import settings
+    from django.contrib.auth.hashers import get_hasher, get_hashers
+    from django.db import connections
+    from django.test import Client
+    from django.urls import reverse
+    from authentication import hashing
+    from authentication.models import User
+
+    settings.LOGIN_THROTTLE_RATES = {'address': None, 'username': None}
+    settings.PASSWORD_HASH_ITERATIONS = args.iterations
+    get_hashers.cache_clear()
+
+    password = 'benchmark'
+    encoded = get_hasher().encode(password, get_hasher().salt())
+    User.objects.bulk_create(
+        User(username=f'user{i}', password=encoded)
+        for i in range(args.users)
+    )
+    url = reverse('authentication:login')
+    # Starts the processes of the pool before timing anything.
+    hashing.check_password(password, encoded)
+
+    def run(concurrency):
+        remaining = iter(range(args.logins))
+        lock = threading.Lock()
+        failures = []
+
+        def worker():
+            client = Client(SERVER_NAME='localhost')
+            while True:
+                with lock:
+                    i = next(remaining, None)
+                if i is None:
+                    break
+                response = client.post(url, {
+                    'username': f'user{i % args.users}',
+                    'password': password
+                })
+                if response.status_code != 200:
+                    failures.append(response.status_code)
+            connections.close_all()
+
+        threads = [threading.Thread(target=worker)
+                   for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if failures:
+            raise SystemExit(f'{len(failures)} logins failed: {failures[0]}')
+        return args.logins / (time.perf_counter() - started)
+
+    cpus = os.cpu_count()
+    print(f'{get_hasher().iterations} iterations, {cpus} CPUs')
+    print(f'{"backend":<10}{"threads":>8}{"logins/s":>10}{"per CPU":>10}')
+    for name, backend in BACKENDS.items():
+        settings.AUTHENTICATION_BACKENDS = [backend]
+        for concurrency in args.concurrency:
+            rate = run(concurrency)
+            print(f'{name:<10}{concurrency:>8}{rate:>10.1f}'
+                  f'{rate / cpus:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Measures the overhead of the metrics of softdesk/metrics.py.
+
+Seeds (or reuses) a database, then times the same requests through two
+WSGI handlers, in process and in turns: one with the MetricsMiddleware
+of the settings and one without it, which leaves the timers of the
+views idle. Prints the p50 and p95 latency of each, and the difference.
+
+    python -m benchmarks.metrics --requests 2000
+"""
+import argparse
+import os
+import tempfile
+
+from . import measure, percentile, seed, setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=os.path.join(
+        tempfile.gettempdir(), 'softdesk-metrics.sqlite3'
+    ))
+    parser.add_argument('--issues', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--reseed', action='store_true',
+                        help='drop the database and seed it again')
+    args = parser.parse_args()
+
+    if args.reseed and os.path.exists(args.db):
+        os.remove(args.db)
+    seeded = os.path.exists(args.db)
+    setup(args.db)
+    if not seeded:
+        spent = seed(issues=args.issues, comments=0)
+        print(f'Seeded in {spent:.1f}s')
+
+    from django.conf import settings
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['localhost']
+
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+    from projects import models
+    from authentication.tokens import TokenObtainPairSerializer
+
+    author = models.Collaborator.objects.filter(
+        role=models.Collaborator.AUTHOR_ROLE
+    ).select_related('user').order_by('id').first()
+    token = TokenObtainPairSerializer.get_token(author.user).access_token
+    factory = RequestFactory(SERVER_NAME='localhost',
+                             HTTP_AUTHORIZATION=f'Bearer {token}')
+    paths = {
+        'project': f'/api/v0/projects/{author.project_id}/',
+        'issues': f'/api/v0/projects/{author.project_id}/issues/',
+    }
+
+    instrumented = WSGIHandler()
+    settings.MIDDLEWARE = [name for name in settings.MIDDLEWARE
+                           if name != 'softdesk.metrics.MetricsMiddleware']
+    plain = WSGIHandler()
+
+    def get(handler, path):
+        environ = factory.get(path).environ
+
+        def start_response(status, headers, exc_info=None):
+            if not status.startswith('200'):
+                raise SystemExit(f'{path}: {status}')
+
+        response = handler(environ, start_response)
+        b''.join(response)
+        response.close()
+
+    print(f'{"route":<10}{"handler":<14}{"p50 ms":>8}{"p95 ms":>8}')
+    for name, path in paths.items():
+        timings = {'plain': [], 'instrumented': []}
+        for _ in range(args.requests):
+            for handler_name, handler in (('plain', plain),
+                                          ('instrumented', instrumented)):
+                timings[handler_name] += measure(
+                    lambda: get(handler, path), 1
+                )
+
+        for handler_name, spent in timings.items():
+            spent.sort()
+            print(f'{name:<10}{handler_name:<14}'
+                  f'{percentile(spent, .5):>8.3f}'
+                  f'{percentile(spent, .95):>8.3f}')
+        overhead = (percentile(timings['instrumented'], .5)
+                    - percentile(timings['plain'], .5))
+        print(f'{name:<10}{"overhead":<14}{overhead:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Times the full-text search of a project.
+
+Seeds (or reuses) a database whose issues and comments are made of words
+following Zipf's law, then searches random projects for words of
+decreasing frequency through projects.fulltext. Prints the median and
+p95 of each search in milliseconds.
+
+    python -m benchmarks.search --comments 5000000
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from . import measure, percentile, seed, setup, vocabulary
+
+# Ranks of the words searched, in the vocabulary of seed().
+SEARCHES = {
+    'frequent word': [0],
+    'common word': [50],
+    'rare word': [3000],
+    'two words': [10, 200],
+    'three words': [5, 100, 1000],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=os.path.join(
+        tempfile.gettempdir(), 'softdesk-search.sqlite3'
+    ))
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--issues', type=int, default=200000)
+    parser.add_argument('--comments', type=int, default=2000000)
+    parser.add_argument('--words', type=int, default=20,
+                        help='words per description')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--reseed', action='store_true',
+                        help='drop the database and seed it again')
+    args = parser.parse_args()
+
+    if args.reseed and os.path.exists(args.db):
+        os.remove(args.db)
+    seeded = os.path.exists(args.db)
+    setup(args.db)
+    if not seeded:
+        spent = seed(args.users, args.projects, 10, args.issues,
+                     args.comments, words=args.words)
+        print(f'Seeded in {spent:.1f}s')
+
+    from projects import fulltext, models
+
+    projects = list(models.Project.objects.values_list('id', flat=True))
+    words = vocabulary()
+    rng = random.Random(0)
+
+    print(f'{"search":<16}{"p50":>10}{"p95":>10}{"hits":>8}')
+    for name, ranks in SEARCHES.items():
+        text = ' '.join(words[rank] for rank in ranks)
+        hits = []
+
+        def search():
+            hits.append(len(fulltext.search(rng.choice(projects), text)))
+
+        timings = measure(search, args.repeat)
+        print(f'{name:<16}{percentile(timings, .5):>10.3f}'
+              f'{percentile(timings, .95):>10.3f}'
+              f'{sum(hits) / len(hits):>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Times the serialization of a page of issues.
+
+Seeds (or reuses) a database, then turns pages of issues into their API
+representation with IssueSerializer over model instances and with the
+values() fast path of the list views, queries included. Then renders
+and parses that representation as JSON with REST framework's stdlib
+renderer and parser, and with those of softdesk.fastjson. Prints the
+median and p95 of each in milliseconds.
+
+    python -m benchmarks.serialization --page-size 1000
+"""
+import argparse
+import os
+import tempfile
+
+from . import measure, percentile, seed, setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=os.path.join(
+        tempfile.gettempdir(), 'softdesk-serialization.sqlite3'
+    ))
+    parser.add_argument('--issues', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--reseed', action='store_true',
+                        help='drop the database and seed it again')
+    args = parser.parse_args()
+
+    if args.reseed and os.path.exists(args.db):
+        os.remove(args.db)
+    seeded = os.path.exists(args.db)
+    setup(args.db)
+    if not seeded:
+        spent = seed(projects=10, issues=args.issues, comments=0, words=20)
+        print(f'Seeded in {spent:.1f}s')
+
+    import io
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from projects import models, serializers
+    from projects.values import ValuesPlan
+    from softdesk.fastjson import UJSONParser, UJSONRenderer
+
+    project_id = models.Project.objects.values_list('id', flat=True)[0]
+    issues = models.Issue.objects.filter(
+        project_id=project_id
+    ).order_by('created', 'id')[:args.page_size]
+    plan = ValuesPlan.for_serializer(serializers.IssueSerializer)
+
+    def instances():
+        return serializers.IssueSerializer(issues, many=True).data
+
+    def values():
+        return plan.represent(issues.values(*plan.values()))
+
+    results = {'serializer': measure(instances, args.repeat),
+               'values': measure(values, args.repeat)}
+
+    data = values()
+    content = JSONRenderer().render(data)
+    for name, renderer, parser in [('json', JSONRenderer(), JSONParser()),
+                                   ('ujson', UJSONRenderer(), UJSONParser())]:
+        results[f'render {name}'] = measure(lambda: renderer.render(data),
+                                            args.repeat)
+        results[f'parse {name}'] = measure(
+            lambda: parser.parse(io.BytesIO(content)), args.repeat
+        )
+
+    print(f'{args.page_size} issues')
+    print(f'{"path":<14}{"p50":>10}{"p95":>10}')
+    for name, timings in results.items():
+        print(f'{name:<14}{percentile(timings, .5):>10.3f}'
+              f'{percentile(timings, .95):>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Compares mixed read/write loads with and without the SQLite profile.
+
+Seeds (or reuses) a database, then has --concurrency client threads call
+the WSGI handler in process, each with its own user and project: a
+--writes share of their requests create an issue, the others read the
+issue list. Every request opens its own connection, as in production.
+The load runs twice, on the same file:
+
+- default: the rollback journal and the pragmas of SQLite;
+- tuned: the SQLITE_PRAGMAS of the settings (see softdesk/sqlite.py).
+
+Prints the requests per second, the p50 and p99 latency in milliseconds
+of the reads and writes, and the failed requests, such as those getting
+"database is locked".
+
+    python -m benchmarks.sqlite --requests 2000 --concurrency 1 8 32 \\
+        --writes 0.1 0.5
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from . import percentile, seed, setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=os.path.join(
+        tempfile.gettempdir(), 'softdesk-sqlite.sqlite3'
+    ))
+    parser.add_argument('--issues', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 8, 32])
+    parser.add_argument('--writes', type=float, nargs='+',
+                        default=[0.1, 0.5],
+                        help='shares of the requests creating an issue')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--reseed', action='store_true',
+                        help='drop the database and seed it again')
+    args = parser.parse_args()
+
+    if args.reseed and os.path.exists(args.db):
+        os.remove(args.db)
+    seeded = os.path.exists(args.db)
+    setup(args.db)
+    if not seeded:
+        spent = seed(issues=args.issues, comments=0)
+        print(f'Seeded in {spent:.1f}s')
+
+    from django.conf import settings
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['localhost']
+    # The failures are counted, not logged.
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+    from django.test import RequestFactory
+    from projects import models
+    from authentication.models import User
+    from authentication.tokens import TokenObtainPairSerializer
+
+    clients = []
+    authors = models.Collaborator.objects.filter(
+        role=models.Collaborator.AUTHOR_ROLE
+    ).order_by('project_id')
+    for user_id, project_id in authors.values_list('user_id', 'project_id'):
+        if user_id in {client[0] for client in clients}:
+            continue
+        token = TokenObtainPairSerializer.get_token(
+            User.objects.get(id=user_id)
+        ).access_token
+        clients.append((user_id, project_id, f'Bearer {token}'))
+        if len(clients) == max(args.concurrency):
+            break
+    connections.close_all()
+
+    factory = RequestFactory(SERVER_NAME='localhost')
+    handler = WSGIHandler()
+
+    def call(environ):
+        result = {}
+
+        def start_response(status, headers, exc_info=None):
+            result['status'] = int(status.split()[0])
+
+        response = handler(environ, start_response)
+        b''.join(response)
+        response.close()
+        return result['status']
+
+    def read(user_id, project_id, authorization):
+        return call(factory.get(
+            f'/api/v0/projects/{project_id}/issues/',
+            {'page_size': args.page_size}, HTTP_AUTHORIZATION=authorization
+        ).environ)
+
+    def write(user_id, project_id, authorization):
+        body = {'title': 'benchmark issue',
+                'description': 'created by benchmarks.sqlite',
+                'tag': 'TASK', 'priority': 2, 'status': 'OPEN',
+                'author': user_id, 'assignee': user_id}
+        return call(factory.post(
+            f'/api/v0/projects/{project_id}/issues/', json.dumps(body),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=authorization
+        ).environ)
+
+    def run(concurrency, writes):
+        # Request i is a write when it crosses a multiple of 1 / writes.
+        remaining = iter(range(args.requests))
+        lock = threading.Lock()
+        timings = {'read': [], 'write': []}
+        failures = []
+
+        def worker(client):
+            while True:
+                with lock:
+                    index = next(remaining, None)
+                if index is None:
+                    break
+                kind = ('write' if int((index + 1) * writes)
+                        > int(index * writes) else 'read')
+                started = time.perf_counter()
+                status = (write if kind == 'write' else read)(*client)
+                timings[kind].append((time.perf_counter() - started) * 1000)
+                if status >= 400:
+                    failures.append(status)
+            connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(clients[i],))
+                   for i in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        spent = time.perf_counter() - started
+        for values in timings.values():
+            values.sort()
+        return args.requests / spent, timings, failures
+
+    def journal(mode):
+        db = sqlite3.connect(args.db)
+        db.execute(f'PRAGMA journal_mode = {mode}')
+        db.close()
+
+    pragmas = settings.SQLITE_PRAGMAS
+    profiles = {
+        'default': lambda: (journal('DELETE'),
+                            setattr(settings, 'SQLITE_PRAGMAS', None)),
+        'tuned': lambda: setattr(settings, 'SQLITE_PRAGMAS', pragmas),
+    }
+
+    print(f'{args.requests} requests, issue lists of {args.page_size}')
+    print(f'{"profile":<9}{"writes":>7}{"clients":>8}{"req/s":>9}'
+          f'{"read p50":>10}{"read p99":>10}{"write p50":>10}'
+          f'{"write p99":>10}{"failed":>8}')
+    for name, apply in profiles.items():
+        apply()
+        for writes in args.writes:
+            for concurrency in args.concurrency:
+                rate, timings, failures = run(concurrency, writes)
+                print(f'{name:<9}{writes:>7.0%}{concurrency:>8}'
+                      f'{rate:>9.1f}'
+                      f'{percentile(timings["read"], .5):>10.2f}'
+                      f'{percentile(timings["read"], .99):>10.2f}'
+                      f'{percentile(timings["write"], .5):>10.2f}'
+                      f'{percentile(timings["write"], .99):>10.2f}'
+                      f'{len(failures):>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,445 @@
+"""Export and import of a project as newline-delimited JSON.
+
+Each line holds one record, keyed by its kind:
+
+    {"project": {...}}
+    {"user": {...}}          id and username of every user the project
+                             refers to
+    {"collaborator": {...}}
+    {"issue": {...}}         each issue followed by its comments
+    {"comment": {...}}
+
+Rows are read with .values() through chunked iterators, so the memory
+used does not depend on the size of the project. The Importer loads the
+same records back, or those of a CSV dump with a `record` column naming
+their kind.
+"""
+import contextlib
+import csv
+import datetime
+import io
+import itertools
+import json
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from authentication.models import User
+from softdesk import sqlite
+from . import counters
+from . import models
+from . import roles
+
+CHUNK_SIZE = 2000
+
+PROJECT_FIELDS = ['id', 'title', 'description', 'type']
+# Any collaborator may export: no contact details of the users.
+USER_FIELDS = ['id', 'username']
+COLLABORATOR_FIELDS = ['id', 'user', 'project', 'role']
+ISSUE_FIELDS = ['id', 'title', 'description', 'tag', 'priority', 'project',
+                'status', 'author', 'assignee', 'created']
+COMMENT_FIELDS = ['id', 'description', 'author', 'issue', 'created']
+
+
+def _default(value):
+    # Same format as the API.
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _line(kind, row):
+    return json.dumps({kind: row}, default=_default,
+                      separators=(',', ':')) + '\n'
+
+
+def _rows(queryset, fields, chunk_size):
+    # The foreign keys are exported under the names of the API.
+    columns = [f'{field}_id' if field in ('user', 'project', 'author',
+                                          'assignee', 'issue') else field
+               for field in fields]
+    for values in queryset.values_list(*columns).iterator(chunk_size):
+        yield dict(zip(fields, values))
+
+
+@contextlib.contextmanager
+def _snapshot():
+    # A single transaction, whose statements all read the same state of
+    # the database: REPEATABLE READ on PostgreSQL, where each statement
+    # of a READ COMMITTED one reads its own, and deferred on SQLite, so
+    # that it takes no write lock.
+    with contextlib.ExitStack() as stack:
+        if connection.vendor == 'sqlite':
+            stack.enter_context(sqlite.deferred(connection))
+        outermost = not connection.in_atomic_block
+        stack.enter_context(transaction.atomic())
+        if outermost and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL '
+                               'REPEATABLE READ, READ ONLY')
+        yield
+
+
+def lines(project_id, chunk_size=CHUNK_SIZE):
+    """Yields the lines of the export of a project, which must exist."""
+    with _snapshot():
+        yield from _lines(project_id, chunk_size)
+
+
+def _lines(project_id, chunk_size):
+    project = models.Project.objects.filter(pk=project_id)
+    for row in _rows(project, PROJECT_FIELDS, chunk_size):
+        yield _line('project', row)
+
+    issues = models.Issue.objects.filter(project_id=project_id)
+    comments = models.Comment.objects.filter(issue__project_id=project_id)
+    collaborators = models.Collaborator.objects.filter(project_id=project_id)
+
+    users = User.objects.filter(
+        Q(pk__in=collaborators.values('user_id'))
+        | Q(pk__in=issues.values('author_id'))
+        | Q(pk__in=issues.values('assignee_id'))
+        | Q(pk__in=comments.values('author_id'))
+    ).order_by('id')
+    for row in _rows(users, USER_FIELDS, chunk_size):
+        yield _line('user', row)
+
+    for row in _rows(collaborators.order_by('id'), COLLABORATOR_FIELDS,
+                     chunk_size):
+        yield _line('collaborator', row)
+
+    yield from _issues_and_comments(
+        _rows(issues.order_by('id'), ISSUE_FIELDS, chunk_size),
+        _rows(comments.order_by('issue_id', 'created', 'id'),
+              COMMENT_FIELDS, chunk_size)
+    )
+
+
+def _issues_and_comments(issues, comments):
+    # Both are ordered by issue, so a single pass over the comments
+    # places each of them after its issue. Those of an issue that is not
+    # there are skipped.
+    comment = next(comments, None)
+    for issue in issues:
+        yield _line('issue', issue)
+        while comment is not None and comment['issue'] <= issue['id']:
+            if comment['issue'] == issue['id']:
+                yield _line('comment', comment)
+            comment = next(comments, None)
+
+
+def read_ndjson(file):
+    """Yields the (kind, row) records of an export."""
+    for number, line in enumerate(file, 1):
+        if line.strip():
+            record = json.loads(line)
+            if (not isinstance(record, dict) or len(record) != 1
+                    or not isinstance(next(iter(record.values())), dict)):
+                raise ArchiveError(f'Line {number} is not a record.')
+            [(kind, row)] = record.items()
+            yield kind, row
+
+
+def read_csv(file):
+    """Yields the (kind, row) records of a CSV dump, where each row holds
+    its kind in the `record` column and leaves the columns of the other
+    kinds empty."""
+    for row in csv.DictReader(file):
+        kind = row.pop('record')
+        yield kind, {name: value for name, value in row.items()
+                     if value not in ('', None)}
+
+
+@contextlib.contextmanager
+def _keep_dates():
+    # The creation dates are auto_now, which would overwrite the imported
+    # ones.
+    fields = [models.Issue._meta.get_field('created'),
+              models.Comment._meta.get_field('created')]
+    for field in fields:
+        field.auto_now = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now = True
+
+
+# Escapes of the text format of COPY.
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n',
+                              '\r': '\\r'})
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+def copy(objs):
+    """bulk_create() of new model instances with a COPY, on PostgreSQL.
+
+    Their ids are drawn from the sequence of the table beforehand and set
+    on them. The fields are saved as bulk_create() saves them, without
+    the signals either.
+    """
+    if not objs:
+        return
+
+    meta = objs[0]._meta
+    fields = [field for field in meta.concrete_fields
+              if field is not meta.pk]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) '
+            'FROM generate_series(1, %s)',
+            [meta.db_table, meta.pk.column, len(objs)]
+        )
+        for obj, (pk,) in zip(objs, cursor.fetchall()):
+            obj.pk = pk
+
+        data = io.StringIO()
+        for obj in objs:
+            values = [obj.pk] + [
+                field.get_db_prep_save(field.pre_save(obj, True), connection)
+                for field in fields
+            ]
+            data.write('\t'.join(map(_copy_value, values)) + '\n')
+        data.seek(0)
+
+        columns = ', '.join(connection.ops.quote_name(field.column)
+                            for field in [meta.pk] + fields)
+        cursor.copy_expert(f'COPY {connection.ops.quote_name(meta.db_table)} '
+                           f'({columns}) FROM STDIN', data)
+
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = connection.alias
+
+
+class ArchiveError(Exception):
+    pass
+
+
+class Importer:
+    """Loads records into a project with batched bulk_create().
+
+    Records are buffered by kind and inserted `batch_size` at a time (with
+    COPY for the issues and comments on PostgreSQL, see copy()), and
+    every `chunk_size` records are committed together. The ids of the
+    records are mapped in memory to the ids of the rows they became,
+    which resolves the foreign keys of the next records: records must
+    come after those they refer to, as in an export. Users are matched by
+    username, and created with an unusable password when missing. The
+    values with choices (type, role, tag and status) must be among them.
+
+    `checkpoint`, when given, is called after each commit with the
+    position of the next record, the project id and the user and issue
+    ids mapped since the previous call, so that an interrupted import can
+    resume() from there.
+    """
+    FOREIGN_KEYS = {'user': 'users', 'author': 'users',
+                    'assignee': 'users', 'issue': 'issues'}
+
+    def __init__(self, project_id=None, batch_size=1000, chunk_size=50000,
+                 checkpoint=None, use_copy=None):
+        self.project_id = project_id
+        if use_copy is None:
+            use_copy = connection.vendor == 'postgresql'
+        self.use_copy = use_copy
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.checkpoint = checkpoint
+        self.position = 0
+        self.users = {}
+        self.issues = {}
+        self._mapped = {'users': {}, 'issues': {}}
+        self._buffers = {'user': [], 'collaborator': [], 'issue': [],
+                         'comment': []}
+        # The creation date of the records that have none.
+        self._now = timezone.now()
+
+    def resume(self, position, project_id, users, issues):
+        """Restores the state given to the checkpoints so far."""
+        self.position = position
+        self.project_id = project_id
+        self.users.update(users)
+        self.issues.update(issues)
+
+    def run(self, records):
+        """Imports the records, from the current position on."""
+        records = itertools.islice(records, self.position, None)
+
+        with _keep_dates():
+            while True:
+                count = 0
+                with transaction.atomic():
+                    for kind, row in itertools.islice(records,
+                                                      self.chunk_size):
+                        self.add(kind, row)
+                        count += 1
+                    self.flush()
+
+                if not count:
+                    break
+                self.position += count
+                self._save_checkpoint()
+
+        if self.project_id is not None:
+            counters.rebuild([self.project_id])
+            models.Project.objects.filter(pk=self.project_id).touch()
+
+    def add(self, kind, row):
+        if kind == 'project':
+            self._add_project(row)
+        elif kind in self._buffers:
+            buffer = self._buffers[kind]
+            buffer.append(row)
+            if len(buffer) >= self.batch_size:
+                self.flush(kind)
+        else:
+            raise ArchiveError(f'Unknown kind of record {kind!r}.')
+
+    def flush(self, until='comment'):
+        """Inserts the buffered records of `until` and, first, those of
+        the kinds they may refer to."""
+        for kind in self._buffers:
+            if self._buffers[kind]:
+                getattr(self, f'_insert_{kind}s')(self._buffers[kind])
+                self._buffers[kind] = []
+            if kind == until:
+                break
+
+    def _save_checkpoint(self):
+        if self.checkpoint is not None:
+            self.checkpoint(self.position, self.project_id,
+                            self._mapped['users'], self._mapped['issues'])
+        self._mapped = {'users': {}, 'issues': {}}
+
+    def _map(self, name, source_ids, target_ids):
+        mapping = getattr(self, name)
+        for source_id, target_id in zip(source_ids, target_ids):
+            mapping[source_id] = target_id
+            self._mapped[name][source_id] = target_id
+
+    def _resolve(self, row, field):
+        """Returns the id of the row the `field` of a record refers to."""
+        value = row.get(field)
+        try:
+            return getattr(self, self.FOREIGN_KEYS[field])[str(value)]
+        except KeyError:
+            raise ArchiveError(f'Unknown {field} {value!r}.')
+
+    @staticmethod
+    def _choice(row, field, choices):
+        """Returns the `field` of a record, one of the choices."""
+        value = row.get(field)
+        if value not in {choice for choice, _ in choices}:
+            raise ArchiveError(f'Invalid {field} {value!r}.')
+        return value
+
+    def _project(self):
+        if self.project_id is None:
+            raise ArchiveError('No project record before the first '
+                               'record of the project.')
+        return self.project_id
+
+    def _add_project(self, row):
+        if self.project_id is None:
+            self.project_id = models.Project.objects.create(
+                title=row['title'], description=row['description'],
+                type=self._choice(row, 'type', models.Project.TYPES)
+            ).id
+
+    def _insert_users(self, rows):
+        rows = {row['username']: row for row in rows}
+        existing = dict(User.objects.filter(
+            username__in=list(rows)
+        ).values_list('username', 'id'))
+
+        users = [
+            User(password=make_password(None), **{
+                field: row[field] for field in USER_FIELDS
+                if field != 'id' and field in row
+            })
+            for username, row in rows.items() if username not in existing
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        if users and users[0].pk is None:
+            # The database does not return the ids of bulk inserts.
+            existing = dict(User.objects.filter(
+                username__in=list(rows)
+            ).values_list('username', 'id'))
+        else:
+            existing.update((user.username, user.pk) for user in users)
+
+        self._map('users', [str(row['id']) for row in rows.values()],
+                  [existing[username] for username in rows])
+
+    def _insert_collaborators(self, rows):
+        collaborators = [
+            models.Collaborator(
+                project_id=self._project(),
+                user_id=self._resolve(row, 'user'),
+                role=self._choice(row, 'role', models.Collaborator.ROLES)
+            )
+            for row in rows
+        ]
+        models.Collaborator.objects.bulk_create(
+            collaborators, batch_size=self.batch_size, ignore_conflicts=True
+        )
+
+        # bulk_create() sends no signal: the roles the users were cached
+        # with are forgotten here (see signals.invalidate_role).
+        def invalidate():
+            for collaborator in collaborators:
+                roles.invalidate(collaborator.user_id,
+                                 collaborator.project_id)
+        transaction.on_commit(invalidate)
+
+    def _insert_issues(self, rows):
+        issues = [
+            models.Issue(
+                project_id=self._project(),
+                author_id=self._resolve(row, 'author'),
+                assignee_id=self._resolve(row, 'assignee'),
+                created=row.get('created') or self._now,
+                tag=self._choice(row, 'tag', models.Issue.TAGS),
+                status=self._choice(row, 'status', models.Issue.STATUS),
+                **{field: row[field] for field in
+                   ['title', 'description', 'priority']}
+            )
+            for row in rows
+        ]
+        self._insert(issues)
+        if issues and issues[0].pk is None:
+            raise ArchiveError('Issues can only be imported into a database '
+                               'returning the ids of bulk inserts.')
+
+        self._map('issues', [str(row['id']) for row in rows],
+                  [issue.pk for issue in issues])
+
+    def _insert_comments(self, rows):
+        self._insert([
+            models.Comment(
+                issue_id=self._resolve(row, 'issue'),
+                author_id=self._resolve(row, 'author'),
+                created=row.get('created') or self._now,
+                description=row['description']
+            )
+            for row in rows
+        ])
+
+    def _insert(self, objs):
+        if self.use_copy:
+            copy(objs)
+        else:
+            type(objs[0]).objects.bulk_create(objs,
+                                              batch_size=self.batch_size)
@@ -0,0 +1,124 @@
+"""Maintenance of IssueCounter, the table behind the project dashboard.
+
+Single issues are counted by the Issue signals (see signals.py); the bulk
+endpoints, which bypass them, call count() or update() themselves.
+"""
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from . import models
+
+
+def _lookup(key):
+    project_id, tag, status, assignee_id = key
+    return {'project_id': project_id, 'tag': tag, 'status': status,
+            'assignee_id': assignee_id}
+
+
+def add(deltas):
+    """Adds each delta of {counter key: delta} to its counter."""
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+
+        counter = models.IssueCounter.objects.filter(**_lookup(key))
+        if counter.update(count=F('count') + delta) or delta < 0:
+            continue
+
+        try:
+            with transaction.atomic():
+                models.IssueCounter.objects.create(count=delta,
+                                                   **_lookup(key))
+        except IntegrityError:
+            # Created concurrently since the UPDATE above.
+            counter.update(count=F('count') + delta)
+
+
+def count(issues):
+    """Counts the given issues, created by bulk_create."""
+    add(Counter(issue.counter_key() for issue in issues))
+
+
+def move(issue, old_key):
+    """Moves a saved issue from the counter of old_key to its own."""
+    new_key = issue.counter_key()
+    if old_key != new_key:
+        add({old_key: -1, new_key: 1})
+
+
+def update(issues, patch):
+    """Moves the issues of a queryset from their counters to those of the
+    values of patch, with one GROUP BY of the issues: call it before the
+    UPDATE of the issues."""
+    changes = {field: patch[field] for field in ['tag', 'status', 'assignee']
+               if field in patch}
+    if not changes:
+        return
+    if 'assignee' in changes:
+        changes['assignee_id'] = changes.pop('assignee').pk
+
+    rows = issues.order_by().values(
+        'project_id', 'tag', 'status', 'assignee_id'
+    ).annotate(count=Count('id'))
+
+    deltas = Counter()
+    for row in rows:
+        number = row.pop('count')
+        old_key = tuple(row.values())
+        row.update(changes)
+        new_key = tuple(row.values())
+        if old_key != new_key:
+            deltas[old_key] -= number
+            deltas[new_key] += number
+    add(deltas)
+
+
+def rebuild(project_ids=None):
+    """Recounts the issues of the given projects, or of every project,
+    with a single GROUP BY."""
+    issues = models.Issue.objects.all()
+    counters = models.IssueCounter.objects.all()
+    if project_ids is not None:
+        issues = issues.filter(project_id__in=project_ids)
+        counters = counters.filter(project_id__in=project_ids)
+
+    rows = issues.order_by().values(
+        'project_id', 'tag', 'status', 'assignee_id'
+    ).annotate(count=Count('id'))
+
+    with transaction.atomic():
+        counters.delete()
+        models.IssueCounter.objects.bulk_create(
+            (models.IssueCounter(**row) for row in rows.iterator()),
+            batch_size=500
+        )
+
+
+def stats(project_id):
+    """Returns the dashboard of a project, read from its counters."""
+    rows = models.IssueCounter.objects.filter(
+        project_id=project_id, count__gt=0
+    ).values_list('tag', 'status', 'assignee_id', 'count')
+
+    statuses = dict.fromkeys([status for status, _ in models.Issue.STATUS],
+                             0)
+    tags = {tag: dict(statuses) for tag, _ in models.Issue.TAGS}
+    assignees = {}
+    for tag, status, assignee_id, number in rows:
+        by_status = tags.setdefault(tag, dict(statuses))
+        by_status[status] = by_status.get(status, 0) + number
+        if status == models.Issue.OPEN_STATUS:
+            assignees[assignee_id] = assignees.get(assignee_id, 0) + number
+
+    return {
+        'issues': {
+            status: sum(by_status.get(status, 0)
+                        for by_status in tags.values())
+            for status in statuses
+        },
+        'tags': tags,
+        'open_by_assignee': assignees,
+        'collaborators': models.Collaborator.objects.filter(
+            project_id=project_id
+        ).count()
+    }
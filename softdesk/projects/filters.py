@@ -0,0 +1,47 @@
+from rest_framework.filters import BaseFilterBackend
+from . import serializers
+
+# Maps each filter to the lookup it runs. Every lookup is made on top of
+# the project of the issues, so each one reaches an index leading with
+# the project column (see the indexes of models.Issue).
+ISSUE_LOOKUPS = {
+    'status': 'status',
+    'tag': 'tag',
+    'assignee': 'assignee_id',
+    'author': 'author_id',
+    'priority_min': 'priority__gte',
+    'priority_max': 'priority__lte',
+    'created_after': 'created__gte',
+    'created_before': 'created__lt',
+}
+
+
+def filter_issues(queryset, params):
+    """Filters and orders issues according to the given parameters.
+
+    Raises ValidationError on any unknown value; the ordering is one of
+    IssueFilterSerializer.ORDERINGS, always broken by the id.
+    """
+    serializer = serializers.IssueFilterSerializer(data=params)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    queryset = queryset.filter(**{
+        ISSUE_LOOKUPS[name]: value
+        for name, value in data.items() if name in ISSUE_LOOKUPS
+    })
+
+    ordering = data.get('ordering')
+    if ordering:
+        tie_breaker = '-id' if ordering.startswith('-') else 'id'
+        queryset = queryset.order_by(ordering, tie_breaker)
+
+    return queryset
+
+
+class IssueFilter(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        if view.action != 'list':
+            return queryset
+
+        return filter_issues(queryset, request.query_params)
@@ -0,0 +1,105 @@
+"""Full-text search over the issues and comments of a project.
+
+The index is created by the 0012_search migration: an FTS5 table kept in
+sync by triggers on SQLite, expression GIN indexes on PostgreSQL. Note
+that SQLite drops the triggers with the table whenever a migration
+rebuilds projects_issue or projects_comment: such a migration must
+create them again.
+"""
+import html
+import re
+from django.db import connection
+
+# Marks the matches in the snippets, before the text is escaped.
+START, STOP = '\ue000', '\ue001'
+
+# The rowids of the index pack the project above this bit (see the
+# migration).
+PROJECT_SHIFT = 33
+
+SQLITE_QUERY = f"""
+    SELECT rowid & ((1 << {PROJECT_SHIFT}) - 1), issue_id, title,
+           snippet(projects_search, 1, char({ord(START)}), char({ord(STOP)}),
+                   '…', 16),
+           bm25(projects_search, 10, 1) AS rank
+    FROM projects_search
+    WHERE projects_search MATCH %s AND rowid BETWEEN %s AND %s
+    ORDER BY rank
+    LIMIT %s
+"""
+
+# The expressions are those of the indexes, so that they are used.
+POSTGRESQL_QUERY = f"""
+    WITH query AS (
+        SELECT websearch_to_tsquery('english'::regconfig, %s) AS query
+    )
+    SELECT * FROM (
+        SELECT 2 * i.id, i.id, i.title,
+               ts_headline('english'::regconfig, i.description, query,
+                           'StartSel={START}, StopSel={STOP}, MaxWords=16'),
+               -ts_rank(to_tsvector('english'::regconfig,
+                                    COALESCE(i.title, '') || ' '
+                                    || COALESCE(i.description, '')), query)
+               AS rank
+        FROM projects_issue i, query
+        WHERE i.project_id = %s
+          AND to_tsvector('english'::regconfig,
+                          COALESCE(i.title, '') || ' '
+                          || COALESCE(i.description, '')) @@ query
+        UNION ALL
+        SELECT 2 * c.id + 1, c.issue_id, '',
+               ts_headline('english'::regconfig, c.description, query,
+                           'StartSel={START}, StopSel={STOP}, MaxWords=16'),
+               -ts_rank(to_tsvector('english'::regconfig,
+                                    COALESCE(c.description, '')), query)
+        FROM projects_comment c JOIN projects_issue i ON i.id = c.issue_id,
+             query
+        WHERE i.project_id = %s
+          AND to_tsvector('english'::regconfig,
+                          COALESCE(c.description, '')) @@ query
+    ) hits
+    ORDER BY rank
+    LIMIT %s
+"""
+
+
+def _terms(text):
+    return re.findall(r'\w+', text)
+
+
+def _highlight(snippet):
+    return html.escape(snippet).replace(START, '<mark>') \
+                               .replace(STOP, '</mark>')
+
+
+def search(project_id, text, limit=20):
+    """Returns the issues and comments of a project matching every word of
+    `text`, best first, with an HTML snippet of their text where the
+    matches are marked."""
+    terms = _terms(text)
+    if not terms:
+        return []
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(POSTGRESQL_QUERY,
+                           [' '.join(terms), project_id, project_id, limit])
+        else:
+            first = int(project_id) << PROJECT_SHIFT
+            match = ' '.join(f'"{term}"' for term in terms)
+            cursor.execute(SQLITE_QUERY, [
+                match, first, first + (1 << PROJECT_SHIFT) - 1, limit
+            ])
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'type': 'comment' if key % 2 else 'issue',
+            'id': key // 2,
+            'issue': issue_id,
+            'title': title or None,
+            'snippet': _highlight(snippet),
+            'rank': -rank
+        }
+        for key, issue_id, title, snippet, rank in rows
+    ]
@@ -0,0 +1,93 @@
+import json
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from projects import archive
+
+
+class Command(BaseCommand):
+    help = ('Imports a project from an export (NDJSON) or a CSV dump, '
+            'resuming an interrupted import of the same file.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='NDJSON or CSV file to import')
+        parser.add_argument('--format', choices=['ndjson', 'csv'],
+                            help='Format of the file (by default, guessed '
+                                 'from its extension)')
+        parser.add_argument('--project', type=int,
+                            help='ID of an existing project to import into, '
+                                 'instead of the project of the file')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per INSERT')
+        parser.add_argument('--chunk-size', type=int, default=50000,
+                            help='Records per transaction')
+        parser.add_argument('--checkpoint',
+                            help='Checkpoint file (FILE.checkpoint by '
+                                 'default)')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        file_format = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'ndjson'
+        )
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+
+        importer = archive.Importer(project_id=options['project'],
+                                    batch_size=options['batch_size'],
+                                    chunk_size=options['chunk_size'])
+        if os.path.exists(checkpoint):
+            self.resume(importer, checkpoint)
+
+        started = time.monotonic()
+        first = importer.position
+
+        def save(position, project_id, users, issues):
+            with open(checkpoint, 'a') as log:
+                log.write(json.dumps({
+                    'position': position, 'project': project_id,
+                    'users': users, 'issues': issues
+                }) + '\n')
+                log.flush()
+                os.fsync(log.fileno())
+
+            rate = (position - first) / (time.monotonic() - started)
+            if options['verbosity'] > 0:
+                self.stdout.write(f'{position} records ({rate:.0f}/s)')
+
+        importer.checkpoint = save
+
+        try:
+            with open(path, newline='') as file:
+                if file_format == 'csv':
+                    records = archive.read_csv(file)
+                else:
+                    records = archive.read_ndjson(file)
+                importer.run(records)
+        except (archive.ArchiveError, ValueError, KeyError) as error:
+            raise CommandError(f'{path}, after record {importer.position}: '
+                               f'{error}')
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'{importer.position} records imported into project '
+            f'{importer.project_id}.'
+        ))
+
+    def resume(self, importer, checkpoint):
+        state = {'position': 0, 'project': None, 'users': {}, 'issues': {}}
+        with open(checkpoint) as log:
+            for line in log:
+                try:
+                    saved = json.loads(line)
+                except ValueError:
+                    # Cut short by the interruption.
+                    break
+                state['position'] = saved['position']
+                state['project'] = saved['project']
+                state['users'].update(saved['users'])
+                state['issues'].update(saved['issues'])
+
+        importer.resume(state['position'], state['project'],
+                        state['users'], state['issues'])
+        self.stdout.write(f'Resuming after record {state["position"]}.')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from projects import counters
+
+
+class Command(BaseCommand):
+    help = 'Recounts the issues of the projects dashboards from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('projects', nargs='*', type=int,
+                            help='IDs of the projects to recount '
+                                 '(all of them by default)')
+
+    def handle(self, *args, **options):
+        counters.rebuild(options['projects'] or None)
+        self.stdout.write(self.style.SUCCESS('Issue counters rebuilt.'))
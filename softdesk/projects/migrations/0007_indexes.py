@@ -0,0 +1,75 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def remove_duplicate_collaborators(apps, schema_editor):
+    # Keeps a single row per (user, project) before the unique constraint
+    # is added: the author row when there is one, otherwise the oldest.
+    Collaborator = apps.get_model('projects', 'Collaborator')
+    same_membership = Collaborator.objects.filter(
+        user=models.OuterRef('user'),
+        project=models.OuterRef('project')
+    ).exclude(pk=models.OuterRef('pk'))
+
+    Collaborator.objects.exclude(role='AUTHOR').filter(
+        models.Exists(same_membership.filter(role='AUTHOR'))
+    ).delete()
+    Collaborator.objects.filter(
+        models.Exists(same_membership.filter(pk__lt=models.OuterRef('pk')))
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0006_rename_contributor_collaborator'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='collaborator',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='issue',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='projects.issue'),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='assignee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='assignee', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='project',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='projects.project'),
+        ),
+        migrations.AddIndex(
+            model_name='collaborator',
+            index=models.Index(fields=['user', 'project', 'role'], name='collaborator_user_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['issue', 'created'], name='comment_issue_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'status', 'priority'], name='issue_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['assignee', 'status'], name='issue_assignee_status_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_collaborators,
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='collaborator',
+            constraint=models.UniqueConstraint(fields=('user', 'project'), name='unique_collaborator'),
+        ),
+    ]
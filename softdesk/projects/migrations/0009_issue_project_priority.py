@@ -0,0 +1,17 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_issue_project_created'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'priority'], name='issue_project_priority_idx'),
+        ),
+    ]
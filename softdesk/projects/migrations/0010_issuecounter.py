@@ -0,0 +1,45 @@
+# Generated by Django 4.1.3 on 2026-10-18 17:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_issues(apps, schema_editor):
+    Issue = apps.get_model('projects', 'Issue')
+    IssueCounter = apps.get_model('projects', 'IssueCounter')
+
+    rows = Issue.objects.order_by().values(
+        'project_id', 'tag', 'status', 'assignee_id'
+    ).annotate(count=models.Count('id'))
+    IssueCounter.objects.bulk_create(
+        (IssueCounter(**row) for row in rows.iterator()),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0009_issue_project_priority'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(choices=[('BUG', 'bug'), ('IMPROVEMENT', 'improvement'), ('TASK', 'task')], max_length=128)),
+                ('status', models.CharField(choices=[('OPEN', 'open'), ('CLOSED', 'closed')], max_length=128)),
+                ('count', models.IntegerField(default=0)),
+                ('assignee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='projects.project')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='issuecounter',
+            constraint=models.UniqueConstraint(fields=('project', 'tag', 'status', 'assignee'), name='unique_issue_counter'),
+        ),
+        migrations.RunPython(count_issues, migrations.RunPython.noop),
+    ]
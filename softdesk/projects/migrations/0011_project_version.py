@@ -0,0 +1,25 @@
+# Generated by Django 4.1.3 on 2026-10-18 18:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_issuecounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='version',
+            field=models.IntegerField(default=1),
+        ),
+    ]
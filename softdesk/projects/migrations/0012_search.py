@@ -0,0 +1,142 @@
+# Generated by Django 4.1.3 on 2026-10-18 19:02
+
+from django.db import migrations
+
+# The full-text index of the issues and comments, kept in sync by
+# triggers so that bulk inserts and updates are indexed as well.
+#
+# On SQLite it is an FTS5 table whose rowid packs the project (above bit
+# 33) with twice the id of an issue, or twice the id of a comment plus
+# one: the rows of a project form a rowid range, which FTS5 seeks into
+# instead of reading every match. See projects/fulltext.py.
+ROWID = '(({project} << 33) | (2 * {id} + {kind}))'
+ISSUE_ROWID = ROWID.format(project='{row}.project_id', id='{row}.id', kind=0)
+COMMENT_ROWID = ROWID.format(
+    project='(SELECT project_id FROM projects_issue '
+            'WHERE id = {row}.issue_id)',
+    id='{row}.id', kind=1
+)
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE projects_search USING fts5(
+        title, body, issue_id UNINDEXED,
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    INSERT INTO projects_search(rowid, title, body, issue_id)
+    SELECT {ISSUE_ROWID.format(row='i')}, title, description, id
+    FROM projects_issue i
+    """,
+    f"""
+    INSERT INTO projects_search(rowid, title, body, issue_id)
+    SELECT {COMMENT_ROWID.format(row='c')}, '', description, issue_id
+    FROM projects_comment c
+    """,
+    f"""
+    CREATE TRIGGER projects_search_issue_insert
+    AFTER INSERT ON projects_issue BEGIN
+        INSERT INTO projects_search(rowid, title, body, issue_id)
+        VALUES ({ISSUE_ROWID.format(row='new')}, new.title, new.description,
+                new.id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER projects_search_issue_update
+    AFTER UPDATE OF title, description, project_id ON projects_issue BEGIN
+        DELETE FROM projects_search
+        WHERE rowid = {ISSUE_ROWID.format(row='old')};
+        INSERT INTO projects_search(rowid, title, body, issue_id)
+        VALUES ({ISSUE_ROWID.format(row='new')}, new.title, new.description,
+                new.id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER projects_search_issue_delete
+    AFTER DELETE ON projects_issue BEGIN
+        DELETE FROM projects_search
+        WHERE rowid = {ISSUE_ROWID.format(row='old')};
+    END
+    """,
+    f"""
+    CREATE TRIGGER projects_search_comment_insert
+    AFTER INSERT ON projects_comment BEGIN
+        INSERT INTO projects_search(rowid, title, body, issue_id)
+        VALUES ({COMMENT_ROWID.format(row='new')}, '', new.description,
+                new.issue_id);
+    END
+    """,
+    # The foreign keys guarantee that the issue of a comment still exists.
+    f"""
+    CREATE TRIGGER projects_search_comment_update
+    AFTER UPDATE OF description, issue_id ON projects_comment BEGIN
+        DELETE FROM projects_search
+        WHERE rowid = {COMMENT_ROWID.format(row='old')};
+        INSERT INTO projects_search(rowid, title, body, issue_id)
+        VALUES ({COMMENT_ROWID.format(row='new')}, '', new.description,
+                new.issue_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER projects_search_comment_delete
+    AFTER DELETE ON projects_comment BEGIN
+        DELETE FROM projects_search
+        WHERE rowid = {COMMENT_ROWID.format(row='old')};
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER projects_search_comment_delete',
+    'DROP TRIGGER projects_search_comment_update',
+    'DROP TRIGGER projects_search_comment_insert',
+    'DROP TRIGGER projects_search_issue_delete',
+    'DROP TRIGGER projects_search_issue_update',
+    'DROP TRIGGER projects_search_issue_insert',
+    'DROP TABLE projects_search',
+]
+
+# PostgreSQL maintains expression indexes by itself: the queries of
+# fulltext.py must use the very same expressions.
+POSTGRESQL_FORWARD = [
+    """
+    CREATE INDEX projects_issue_search_idx ON projects_issue USING GIN (
+        to_tsvector('english'::regconfig,
+                    COALESCE(title, '') || ' ' || COALESCE(description, ''))
+    )
+    """,
+    """
+    CREATE INDEX projects_comment_search_idx ON projects_comment USING GIN (
+        to_tsvector('english'::regconfig, COALESCE(description, ''))
+    )
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX projects_comment_search_idx',
+    'DROP INDEX projects_issue_search_idx',
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_project_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD,
+                 'postgresql': POSTGRESQL_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD,
+                 'postgresql': POSTGRESQL_BACKWARD})
+        ),
+    ]
@@ -1,7 +1,16 @@
 from django.db import models
+from django.utils import timezone
 from authentication.models import User
 
 
+class ProjectQuerySet(models.QuerySet):
+    def touch(self):
+        """Marks the projects as changed, which invalidates the validators
+        of their conditional GETs (see views.ConditionalGetMixin)."""
+        return self.update(version=models.F('version') + 1,
+                           updated=timezone.now())
+
+
 class Project(models.Model):
     ANDROID_TYPE = 'ANDROID'
     IOS_TYPE = 'IOS'
@@ -18,6 +27,11 @@ class Project(models.Model):
     title = models.CharField(max_length=256)
     description = models.CharField(max_length=4096)
     type = models.CharField(max_length=64, choices=TYPES)
+    # Bumped on every change to the project, its issues or its comments.
+    version = models.IntegerField(default=1)
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = ProjectQuerySet.as_manager()
 
 
 class Collaborator(models.Model):
@@ -31,10 +45,23 @@ class Collaborator(models.Model):
         (AUTHOR_ROLE, 'author')
     ]
     
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # The user column is served by the composite indexes below.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     role = models.CharField(max_length=256, choices=ROLES)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project'],
+                                    name='unique_collaborator')
+        ]
+        indexes = [
+            # Covers the membership lookups of the permissions and the
+            # project list join without reading the table.
+            models.Index(fields=['user', 'project', 'role'],
+                         name='collaborator_user_role_idx')
+        ]
+
 
 class Issue(models.Model):
     BUG_TAG = 'BUG'
@@ -60,7 +87,8 @@ class Issue(models.Model):
     tag = models.CharField(max_length=128, choices=TAGS)
     priority = models.IntegerField()
     status = models.CharField(max_length=128, choices=STATUS)
-    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE,
+                                db_index=False)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -69,15 +97,70 @@ class Issue(models.Model):
     assignee = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='assignee'
+        related_name='assignee',
+        db_index=False
     )
     created = models.DateTimeField(auto_now=True)
-    
+
+    class Meta:
+        # The project and assignee columns lead these indexes, which also
+        # serve their foreign key lookups.
+        indexes = [
+            models.Index(fields=['project', 'created'],
+                         name='issue_project_created_idx'),
+            models.Index(fields=['project', 'status', 'priority'],
+                         name='issue_project_status_idx'),
+            models.Index(fields=['project', 'priority'],
+                         name='issue_project_priority_idx'),
+            models.Index(fields=['assignee', 'status'],
+                         name='issue_assignee_status_idx')
+        ]
+
+    COUNTED_FIELDS = {'project_id', 'tag', 'status', 'assignee_id'}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        issue = super().from_db(db, field_names, values)
+        # Remembers what the issue is counted as in IssueCounter, so that
+        # saving it only has to move it from one counter to another.
+        if not cls.COUNTED_FIELDS & issue.get_deferred_fields():
+            issue._counted_as = issue.counter_key()
+        return issue
+
+    def counter_key(self):
+        return (self.project_id, self.tag, self.status, self.assignee_id)
+
 
 class Comment(models.Model):
     description = models.CharField(max_length=4096)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
-    issue = models.ForeignKey(Issue, on_delete=models.CASCADE)
+    issue = models.ForeignKey(Issue, on_delete=models.CASCADE, db_index=False)
     created = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['issue', 'created'],
+                         name='comment_issue_created_idx')
+        ]
+
+
+class IssueCounter(models.Model):
+    """The number of issues of a project with a given tag, status and
+    assignee, kept up to date by counters.py."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE,
+                                db_index=False)
+    tag = models.CharField(max_length=128, choices=Issue.TAGS)
+    status = models.CharField(max_length=128, choices=Issue.STATUS)
+    assignee = models.ForeignKey(User, on_delete=models.CASCADE,
+                                 related_name='+')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'tag', 'status', 'assignee'],
+                name='unique_issue_counter'
+            )
+        ]
+
 # PDE
@@ -0,0 +1,169 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class ProjectPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() through the async ORM."""
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Counted here: the paginator would count synchronously.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.request = request
+        return [row async for row in self.page.object_list]
+
+
+class KeysetPagination(BasePagination):
+    """Paginates a queryset with opaque cursors over its ordering.
+
+    The cursor holds the ordering values of the last row of a page, and
+    the next page starts with a WHERE clause on them instead of an
+    OFFSET: deep pages cost the same as the first one. The ordering is
+    the queryset's own, or `ordering` when it has none, and must end with
+    a unique column.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    ordering = ('created', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() through the async ORM."""
+        queryset = self.page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset])
+
+    def page_queryset(self, queryset, request):
+        """Returns the rows of the page plus one, which tells whether
+        there is a next page."""
+        self.request = request
+        self.ordering = tuple(queryset.query.order_by) or self.ordering
+        self.current_page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        return queryset[:self.current_page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.current_page_size
+        self.page = rows[:self.current_page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        last = self.page[-1]
+        position = [self._value(last, field) for field in self.ordering]
+        return replace_query_param(self.request.build_absolute_uri(),
+                                   self.cursor_query_param,
+                                   self.encode_cursor(position))
+
+    def after(self, position):
+        """Returns the condition selecting the rows past `position`.
+
+        It reads `a > x OR (a = x AND b > y)`, plus a redundant `a >= x`
+        which lets the database start an index range scan on `a`.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+
+        first = self.ordering[0]
+        lookup = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{lookup}': position[0]}) & condition
+
+    def encode_cursor(self, position):
+        payload = json.dumps({'o': self.ordering, 'p': position},
+                             default=str, separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(padded.encode()))
+            if tuple(payload['o']) != self.ordering:
+                raise ValueError
+            position = payload['p']
+            if (len(position) != len(self.ordering)
+                    or any(value is None for value in position)):
+                raise ValueError
+
+            return [self._to_python(model, field, value)
+                    for field, value in zip(self.ordering, position)]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_html(self):
+        return ''
+
+    @staticmethod
+    def _value(row, field):
+        name = field.lstrip('-')
+        if isinstance(row, dict):
+            return row[name]
+        return getattr(row, name)
+
+    @staticmethod
+    def _to_python(model, field, value):
+        try:
+            return model._meta.get_field(field.lstrip('-')).to_python(value)
+        except FieldDoesNotExist:
+            return value
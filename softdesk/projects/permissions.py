@@ -1,45 +1,118 @@
-from django.shortcuts import get_object_or_404
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
 from rest_framework.permissions import BasePermission
 from . import models
+from . import roles
 
 
-def get_project(view):
+def get_project_pk(view):
     if 'project_pk' in view.kwargs.keys():
-        return get_object_or_404(models.Project, pk=view.kwargs['project_pk'])
+        return view.kwargs['project_pk']
     else:
-        return view.get_object()
+        return view.kwargs[view.lookup_url_kwarg or view.lookup_field]
+
+
+def get_role(request, view):
+    """Returns the role of the user in the project targeted by the view.
+
+    The role is read from the role cache; on a miss the project and the
+    role are fetched together in a single query. Either way the answer is
+    memoized on the request so every other permission of the request
+    answers from memory. Returns None when the user is not related to the
+    project and raises Http404 when the project does not exist.
+    """
+    memo = getattr(request, '_project_roles', None)
+    if memo is None:
+        memo = request._project_roles = {}
+
+    try:
+        project_pk = int(get_project_pk(view))
+    except ValueError:
+        raise Http404
+
+    if project_pk not in memo:
+        user_id = request.user.id
+        role = roles.get(user_id, project_pk)
+
+        if role is roles.MISSING:
+            rows = role_query(user_id, project_pk)
+            if not rows:
+                raise Http404
+            role = rows[0][0]
+            roles.put(user_id, project_pk, role)
+
+        memo[project_pk] = role
+
+    return memo[project_pk]
+
+
+async def aget_role(request, view):
+    """get_role() for async views: the query runs through the async ORM."""
+    memo = getattr(request, '_project_roles', None)
+    if memo is None:
+        memo = request._project_roles = {}
+
+    try:
+        project_pk = int(get_project_pk(view))
+    except ValueError:
+        raise Http404
+
+    if project_pk not in memo:
+        user_id = request.user.id
+        role = roles.get(user_id, project_pk)
+
+        if role is roles.MISSING:
+            rows = [row async for row in role_query(user_id, project_pk)]
+            if not rows:
+                raise Http404
+            role = rows[0][0]
+            roles.put(user_id, project_pk, role)
+
+        memo[project_pk] = role
+
+    return memo[project_pk]
+
+
+def role_query(user_id, project_pk):
+    """The project, if it exists, annotated with the role of the user."""
+    membership = models.Collaborator.objects.filter(
+        project=OuterRef('pk'),
+        user=user_id
+    ).values('role')[:1]
+
+    return models.Project.objects.filter(pk=project_pk).annotate(
+        role=Subquery(membership)
+    ).values_list('role')[:1]
+
 
-    
 class IsProjectAuthor(BasePermission):
     def has_permission(self, request, view):
-        user = request.user
-        project = get_project(view)
-        
-        role = models.Collaborator.AUTHOR_ROLE
-        return models.Collaborator.objects.filter(user=user,
-                                                  project=project,
-                                                  role=role).count() > 0
+        return get_role(request, view) == models.Collaborator.AUTHOR_ROLE
+
+    async def ahas_permission(self, request, view):
+        role = await aget_role(request, view)
+        return role == models.Collaborator.AUTHOR_ROLE
 
 
 class IsProjectRelated(BasePermission):
-    def has_permission(self, request, view):        
-        user = request.user
-        project = get_project(view)
-        return models.Collaborator.objects.filter(user=user,
-                                                  project=project).count() > 0
+    def has_permission(self, request, view):
+        return get_role(request, view) is not None
+
+    async def ahas_permission(self, request, view):
+        return await aget_role(request, view) is not None
 
 
 class IsIssueAuthor(BasePermission):
     def has_permission(self, request, view):
         user = request.user
         issue = view.get_object()
-        
-        return issue.author.id == user.id
+
+        return issue.author_id == user.id
 
 
 class IsCommentAuthor(BasePermission):
     def has_permission(self, request, view):
         user = request.user
         comment = view.get_object()
-        
-        return comment.author.id == user.id
+
+        return comment.author_id == user.id
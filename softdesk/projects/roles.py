@@ -0,0 +1,75 @@
+"""Cross-request cache of the role of a user in a project.
+
+Roles are looked up in a small in-process LRU first, then in the Django
+cache named by the ROLE_CACHE_ALIAS setting. Both tiers are invalidated
+by the Collaborator signals (see signals.py), which are the only way a
+role can change.
+
+The signals only reach the caches of the process that changed the role:
+when the shared tier is process-local too (LocMemCache), its entries
+live no longer than those of the LRU, so that the other workers see the
+change within ROLE_CACHE_LOCAL_TIMEOUT seconds.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from softdesk.lru import LRUCache
+
+MISSING = object()
+
+# Marks a user known not to be related to an existing project, so that
+# it can be told apart from a cache miss by every cache backend.
+_NOT_RELATED = ''
+
+_local = LRUCache(getattr(settings, 'ROLE_CACHE_LOCAL_SIZE', 10000),
+                  getattr(settings, 'ROLE_CACHE_LOCAL_TIMEOUT', 5))
+
+
+def _shared():
+    return caches[getattr(settings, 'ROLE_CACHE_ALIAS', 'default')]
+
+
+def _shared_timeout():
+    timeout = getattr(settings, 'ROLE_CACHE_TIMEOUT', 300)
+    if isinstance(_shared(), LocMemCache) and _local.timeout is not None:
+        return min(timeout, _local.timeout)
+    return timeout
+
+
+def _key(user_id, project_id):
+    return f'softdesk:role:{user_id}:{project_id}'
+
+
+def get(user_id, project_id):
+    """Returns the cached role, None if the user is not related to the
+    project, or MISSING if nothing is known yet."""
+    key = _key(user_id, project_id)
+
+    role = _local.get(key, MISSING)
+    if role is MISSING:
+        role = _shared().get(key, MISSING)
+        if role is MISSING:
+            return MISSING
+        _local.set(key, role)
+
+    return role or None
+
+
+def put(user_id, project_id, role):
+    key = _key(user_id, project_id)
+    value = role or _NOT_RELATED
+
+    _shared().set(key, value, _shared_timeout())
+    _local.set(key, value)
+
+
+def invalidate(user_id, project_id):
+    key = _key(user_id, project_id)
+
+    _shared().delete(key)
+    _local.delete(key)
+
+
+def clear():
+    _local.clear()
+    _shared().clear()
@@ -2,6 +2,11 @@ from rest_framework.serializers import ModelSerializer
 from . import models
 from rest_framework import serializers
 
+# Bounds of the id (BigAutoField) and priority (IntegerField) columns:
+# the databases fail on a value beyond them instead of matching nothing.
+ID_BOUNDS = {'min_value': 1, 'max_value': 2 ** 63 - 1}
+PRIORITY_BOUNDS = {'min_value': -2 ** 31, 'max_value': 2 ** 31 - 1}
+
 
 class ProjectSerializer(ModelSerializer):
     class Meta:
@@ -14,6 +19,13 @@ class ProjectSerializer(ModelSerializer):
         ]
 
 
+class ProjectListSerializer(ProjectSerializer):
+    role = serializers.CharField(read_only=True)
+
+    class Meta(ProjectSerializer.Meta):
+        fields = ProjectSerializer.Meta.fields + ['role']
+
+
 class CollaboratorSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Collaborator
@@ -25,7 +37,33 @@ class CollaboratorSerializer(serializers.ModelSerializer):
         ]
 
 
+class UserField(serializers.PrimaryKeyRelatedField):
+    """A user primary key, looked up in the `users` map of the context.
+
+    Bulk requests fetch every user they mention in one query and pass them
+    as `users` ({id: user}); without that map each value is fetched from
+    the database as usual.
+    """
+    def to_internal_value(self, data):
+        users = self.context.get('users')
+        if users is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            user = users.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        if user is None:
+            self.fail('does_not_exist', pk_value=data)
+        return user
+
+
 class IssueSerializer(serializers.ModelSerializer):
+    serializer_related_field = UserField
+
     project = serializers.PrimaryKeyRelatedField(read_only=True)
     
     class Meta:
@@ -40,6 +78,52 @@ class IssueSerializer(serializers.ModelSerializer):
         ]
 
 
+class IssuePatchSerializer(serializers.ModelSerializer):
+    serializer_related_field = UserField
+
+    class Meta:
+        model = models.Issue
+        fields = [
+            'tag', 'priority',
+            'status', 'assignee'
+        ]
+        extra_kwargs = {field: {'required': False} for field in fields}
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('Nothing to update.')
+        return attrs
+
+
+class BulkUpdateSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(**ID_BOUNDS),
+                                required=False, max_length=10000)
+    filter = serializers.DictField(required=False)
+    patch = IssuePatchSerializer()
+
+    def validate_filter(self, value):
+        # A misspelled or missing criterion would select every issue of
+        # the project; the ordering selects nothing.
+        criteria = set(IssueFilterSerializer().fields) - {'ordering'}
+        unknown = sorted(set(value) - criteria)
+        if unknown:
+            raise serializers.ValidationError(
+                f'Unknown filters: {", ".join(unknown)}.'
+            )
+        if not value:
+            raise serializers.ValidationError(
+                'Select the issues with at least one filter.'
+            )
+        return value
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError(
+                'Select the issues with either ids or filter.'
+            )
+        return attrs
+
+
 class CommentSerializer(serializers.ModelSerializer):
     issue = serializers.PrimaryKeyRelatedField(read_only=True)
     
@@ -52,4 +136,24 @@ class CommentSerializer(serializers.ModelSerializer):
             'issue',
             'created'
         ]
-        
+
+
+class IssueFilterSerializer(serializers.Serializer):
+    ORDERINGS = ['created', '-created', 'priority', '-priority']
+
+    status = serializers.ChoiceField(choices=models.Issue.STATUS,
+                                     required=False)
+    tag = serializers.ChoiceField(choices=models.Issue.TAGS, required=False)
+    assignee = serializers.IntegerField(required=False, **ID_BOUNDS)
+    author = serializers.IntegerField(required=False, **ID_BOUNDS)
+    priority_min = serializers.IntegerField(required=False, **PRIORITY_BOUNDS)
+    priority_max = serializers.IntegerField(required=False, **PRIORITY_BOUNDS)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    ordering = serializers.ChoiceField(choices=ORDERINGS, required=False)
+
+
+class SearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=256)
+    page_size = serializers.IntegerField(min_value=1, max_value=100,
+                                         default=20)
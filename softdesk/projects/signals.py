@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from . import counters
+from . import models
+from . import roles
+
+
+@receiver(post_save, sender=models.Collaborator)
+@receiver(post_delete, sender=models.Collaborator)
+def invalidate_role(sender, instance, **kwargs):
+    # Invalidate right away for this connection, then again on commit in
+    # case a concurrent request cached the old role in the meantime.
+    roles.invalidate(instance.user_id, instance.project_id)
+    transaction.on_commit(
+        lambda: roles.invalidate(instance.user_id, instance.project_id)
+    )
+
+
+@receiver(pre_save, sender=models.Issue)
+def find_counted_issue(sender, instance, **kwargs):
+    if instance.pk is not None and getattr(instance, '_counted_as',
+                                           None) is None:
+        # Saved without being loaded first: its old state is read by its
+        # primary key.
+        instance._counted_as = models.Issue.objects.filter(
+            pk=instance.pk
+        ).values_list('project_id', 'tag', 'status', 'assignee_id').first()
+
+
+@receiver(post_save, sender=models.Issue)
+def count_saved_issue(sender, instance, created, **kwargs):
+    if created:
+        counters.add({instance.counter_key(): 1})
+    else:
+        counters.move(instance, instance._counted_as)
+
+    instance._counted_as = instance.counter_key()
+
+
+@receiver(post_delete, sender=models.Issue)
+def uncount_deleted_issue(sender, instance, origin=None, **kwargs):
+    # The counters of a deleted project go away with it.
+    if isinstance(origin, models.Project):
+        return
+
+    key = getattr(instance, '_counted_as', None) or instance.counter_key()
+    counters.add({key: -1})
+
+
+@receiver(post_save, sender=models.Project)
+def touch_saved_project(sender, instance, created, **kwargs):
+    if not created:
+        models.Project.objects.filter(pk=instance.pk).touch()
+
+
+@receiver(post_save, sender=models.Issue)
+@receiver(post_delete, sender=models.Issue)
+def touch_issue_project(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, models.Project):
+        models.Project.objects.filter(pk=instance.project_id).touch()
+
+
+@receiver(post_save, sender=models.Comment)
+@receiver(post_delete, sender=models.Comment)
+def touch_comment_project(sender, instance, origin=None, **kwargs):
+    # Deleting an issue or a project touches it once for all its comments.
+    if not isinstance(origin, (models.Project, models.Issue)):
+        models.Project.objects.filter(issue=instance.issue_id).touch()
@@ -2,4 +2,11 @@ from .collaborators import *
 from .comments import *
 from .projects import *
 from .issues import *
-
+from .stats import *
+from .archive import *
+from .imports import *
+from .search import *
+from .values import *
+from .asynchronous import *
+from .budgets import *
+from .metrics import *
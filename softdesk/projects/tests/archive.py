@@ -0,0 +1,143 @@
+import json
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+from rest_framework.test import APIClient
+from rest_framework import status
+from .base import APITestCase
+from projects import archive, models
+from authentication.models import User
+
+
+class ExportProjectTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+
+        self.assignee = User.objects.create_user(
+            username='dan',
+            password='dan'
+        )
+
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+
+        self.issues = [
+            models.Issue.objects.create(
+                title=f'my issue{i}',
+                description='this is my issue',
+                tag=models.Issue.BUG_TAG,
+                priority=1,
+                project=self.project,
+                status=models.Issue.OPEN_STATUS,
+                author=self.user,
+                assignee=self.assignee
+            ) for i in range(3)
+        ]
+
+        # Written in another order than their issues.
+        for issue in reversed(self.issues):
+            for i in range(2):
+                models.Comment.objects.create(
+                    description=f'comment {i}',
+                    author=self.assignee,
+                    issue=issue
+                )
+
+        self.url = reverse_lazy('projects:projects-export',
+                                args=[self.project.id])
+
+    def read(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_ok_collaborator(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('application/x-ndjson', response['Content-Type'])
+
+        records = self.read(response)
+        kinds = [next(iter(record)) for record in records]
+        self.assertEqual(
+            ['project', 'user', 'user', 'collaborator']
+            + ['issue', 'comment', 'comment'] * 3,
+            kinds
+        )
+        self.assertEqual('A Project', records[0]['project']['title'])
+        self.assertEqual([{'id': self.user.id, 'username': 'bob'},
+                          {'id': self.assignee.id, 'username': 'dan'}],
+                         sorted([records[1]['user'], records[2]['user']],
+                                key=lambda user: user['id']))
+
+        issue = None
+        for record in records[4:]:
+            if 'issue' in record:
+                issue = record['issue']
+            else:
+                self.assertEqual(issue['id'], record['comment']['issue'])
+
+    def test_ok_same_format_as_the_api(self):
+        self.client.force_authenticate(self.user)
+
+        issues = self.client.get(reverse_lazy('projects:issues-list', kwargs={
+            'project_pk': self.project.id
+        })).data['results']
+        records = self.read(self.client.get(self.url))
+
+        self.assertEqual(
+            json.loads(json.dumps(issues)),
+            [record['issue'] for record in records if 'issue' in record]
+        )
+
+    def test_ok_comments_of_missing_issues_skipped(self):
+        # The comments of issue 2, gone from the issues.
+        issues = iter([{'id': 1}, {'id': 3}])
+        comments = iter([{'id': 10, 'issue': 1}, {'id': 11, 'issue': 2},
+                         {'id': 12, 'issue': 3}, {'id': 13, 'issue': 3}])
+
+        records = [json.loads(line) for line in
+                   archive._issues_and_comments(issues, comments)]
+
+        self.assertEqual([{'issue': {'id': 1}},
+                          {'comment': {'id': 10, 'issue': 1}},
+                          {'issue': {'id': 3}},
+                          {'comment': {'id': 12, 'issue': 3}},
+                          {'comment': {'id': 13, 'issue': 3}}], records)
+
+    def test_ok_single_transaction(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(archive.lines(self.project.id))
+
+        statements = [query['sql'].split()[0] for query in queries]
+        self.assertEqual(['SAVEPOINT', 'RELEASE'],
+                         [statements[0], statements[-1]])
+
+    def test_ok_accepts_ndjson(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(self.url,
+                                   HTTP_ACCEPT='application/x-ndjson')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    def test_err_not_a_collaborator(self):
+        self.client.force_authenticate(self.assignee)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
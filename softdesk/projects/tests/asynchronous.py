@@ -0,0 +1,178 @@
+from .base import APITestCase
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from projects import models
+from authentication.models import User
+from authentication.tokens import TokenObtainPairSerializer
+
+
+@override_settings(ROOT_URLCONF='softdesk.asgi_urls')
+class AsyncReadTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+
+        self.other = User.objects.create_user(
+            username='dan',
+            password='dan'
+        )
+
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+
+        self.issues = [
+            models.Issue.objects.create(
+                title=f'my issue{i}',
+                description='this is my issue',
+                tag=models.Issue.BUG_TAG,
+                priority=i,
+                project=self.project,
+                status=models.Issue.OPEN_STATUS,
+                author=self.user,
+                assignee=self.other
+            )
+            for i in range(3)
+        ]
+
+        for i in range(3):
+            models.Comment.objects.create(
+                description=f'comment {i}',
+                author=self.user,
+                issue=self.issues[0]
+            )
+
+        self.client = AsyncClient()
+        self.sync_client = APIClient()
+        self.sync_client.credentials(HTTP_AUTHORIZATION=self.bearer(self.user))
+
+    @staticmethod
+    def bearer(user):
+        token = TokenObtainPairSerializer.get_token(user).access_token
+        return f'Bearer {token}'
+
+    def get(self, url, data=None, user=None, **headers):
+        # The async client of Django 4.1 takes the headers by name.
+        user = user or self.user
+        return self.client.get(url, data, authorization=self.bearer(user),
+                               **headers)
+
+    def urls(self):
+        return {
+            'projects': reverse('projects:projects-list'),
+            'project': reverse('projects:projects-detail',
+                               args=[self.project.id]),
+            'issues': reverse('projects:issues-list',
+                              kwargs={'project_pk': self.project.id}),
+            'comments': reverse('projects:comments-list', kwargs={
+                'project_pk': self.project.id,
+                'issue_pk': self.issues[0].id
+            })
+        }
+
+    async def test_ok_same_as_sync(self):
+        for name, url in self.urls().items():
+            response = await self.get(url)
+            expected = await sync_to_async(self.sync_get)(url)
+
+            self.assertEqual(status.HTTP_200_OK, response.status_code, name)
+            self.assertEqual(expected.json(), response.json(), name)
+            self.assertEqual(expected.headers['ETag'],
+                             response.headers['ETag'], name)
+
+    def sync_get(self, url):
+        with override_settings(ROOT_URLCONF='softdesk.urls'):
+            return self.sync_client.get(url)
+
+    async def test_ok_paginated_and_filtered(self):
+        url = self.urls()['issues']
+
+        response = await self.get(url, {'ordering': '-priority',
+                                        'page_size': 2})
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        page = response.json()
+        self.assertEqual(['my issue2', 'my issue1'],
+                         [issue['title'] for issue in page['results']])
+
+        response = await self.get(page['next'])
+        self.assertEqual(['my issue0'],
+                         [issue['title'] for issue in
+                          response.json()['results']])
+        self.assertIsNone(response.json()['next'])
+
+        response = await self.get(url, {'status': 'NOPE'})
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    async def test_ok_not_modified(self):
+        url = self.urls()['project']
+        response = await self.get(url)
+
+        response = await self.get(
+            url, if_none_match=response.headers['ETag']
+        )
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+    async def test_ok_writes_served_synchronously(self):
+        response = await self.client.post(self.urls()['issues'], {
+            'title': 'new issue',
+            'description': 'written through the async route',
+            'tag': models.Issue.TASK_TAG,
+            'priority': 1,
+            'status': models.Issue.OPEN_STATUS,
+            'author': self.user.id,
+            'assignee': self.other.id
+        }, content_type='application/json',
+            authorization=self.bearer(self.user))
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(4, await models.Issue.objects.acount())
+
+    async def test_ok_browsable_api_served_synchronously(self):
+        response = await self.get(self.urls()['issues'], {'format': 'api'})
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertTrue(response.headers['Content-Type'].startswith(
+            'text/html'
+        ))
+
+    async def test_err_not_authenticated(self):
+        for name, url in self.urls().items():
+            response = await self.client.get(url)
+            self.assertEqual(status.HTTP_401_UNAUTHORIZED,
+                             response.status_code, name)
+
+    async def test_err_not_a_collaborator(self):
+        urls = self.urls()
+        del urls['projects']
+        for name, url in urls.items():
+            response = await self.get(url, user=self.other)
+            self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code,
+                             name)
+
+    async def test_err_unknown_project(self):
+        response = await self.get(
+            reverse('projects:projects-detail', args=[self.project.id + 1])
+        )
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    async def test_err_no_issue_detail(self):
+        response = await self.get(reverse(
+            'projects:issues-detail', kwargs={
+                'project_pk': self.project.id,
+                'pk': self.issues[0].id
+            }))
+        self.assertEqual(status.HTTP_405_METHOD_NOT_ALLOWED,
+                         response.status_code)
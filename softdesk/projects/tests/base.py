@@ -0,0 +1,136 @@
+import json
+import os
+from contextlib import ExitStack
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.test import TestCase
+from django.urls import Resolver404, resolve
+from authentication import throttling, tokens
+from projects import roles
+
+BUDGETS_FILE = os.path.join(os.path.dirname(__file__), 'query_budgets.json')
+
+
+def load_budgets():
+    with open(BUDGETS_FILE) as file:
+        return json.load(file)
+
+
+def route_of(path, method):
+    """Returns the '<route name>:<action>' of a request, the action being
+    the method for the views that are not viewsets."""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+
+    method = method.lower()
+    actions = getattr(match.func, 'actions', None) or {}
+    if method == 'head':
+        method = 'get'
+    return f'{match.url_name}:{actions.get(method, method)}'
+
+
+class QueryBudgetMixin:
+    """Checks the SQL queries of every request of a test against the
+    budget of its route in query_budgets.json.
+
+    With QUERY_BUDGETS=record in the environment, the budgets are raised
+    to what the tests use instead, and written back to the file.
+    """
+    recording = os.environ.get('QUERY_BUDGETS') == 'record'
+    budgets = None
+
+    def _pre_setup(self):
+        super()._pre_setup()
+        if QueryBudgetMixin.budgets is None:
+            QueryBudgetMixin.budgets = load_budgets()
+
+        self.request_queries = []
+        self._request = None
+        request_started.connect(self._request_started)
+        request_finished.connect(self._request_finished)
+        self.addCleanup(request_started.disconnect, self._request_started)
+        self.addCleanup(request_finished.disconnect, self._request_finished)
+        self.addCleanup(self.check_query_budgets)
+
+    def _request_started(self, sender, environ=None, scope=None, **kwargs):
+        if environ is not None:
+            path, method = environ['PATH_INFO'], environ['REQUEST_METHOD']
+        else:
+            path, method = scope['path'], scope['method']
+
+        route = route_of(path, method)
+        if route is None:
+            return
+
+        count = [0]
+
+        def counter(execute, sql, params, many, context):
+            count[0] += 1
+            return execute(sql, params, many, context)
+
+        stack = ExitStack()
+        stack.enter_context(connection.execute_wrapper(counter))
+        self._request = (route, count, stack)
+
+    def _request_finished(self, sender, **kwargs):
+        if self._request is None:
+            return
+
+        route, count, stack = self._request
+        stack.close()
+        self._request = None
+        self.request_queries.append((route, count[0]))
+
+    def check_query_budgets(self):
+        budgets = QueryBudgetMixin.budgets
+        if self.recording:
+            for route, count in self.request_queries:
+                budgets[route] = max(budgets.get(route, 0), count)
+            with open(BUDGETS_FILE, 'w') as file:
+                json.dump(budgets, file, indent=2, sort_keys=True)
+                file.write('\n')
+            return
+
+        for route, count in self.request_queries:
+            if route not in budgets:
+                self.fail(f'No query budget for {route} in '
+                          f'{os.path.basename(BUDGETS_FILE)}')
+            if count > budgets[route]:
+                self.fail(f'{route} ran {count} queries, over its budget '
+                          f'of {budgets[route]}')
+
+    def assertConstantQueries(self, request, grow, scales=(1, 10, 100)):
+        """Asserts that `request()` runs as many queries, within the
+        budget of its route, after each call to `grow(scale)`, which adds
+        `scale` times more of the rows the request reads.
+
+        A first request, left out of the comparison, fills the caches.
+        """
+        grow(1)
+        request()
+
+        counts = {}
+        for scale in scales:
+            grow(scale)
+            start = len(self.request_queries)
+            request()
+            measured = self.request_queries[start:]
+            self.assertEqual(1, len(measured))
+            counts[scale] = measured[0][1]
+
+        route = measured[0][0]
+        self.assertEqual(1, len(set(counts.values())),
+                         f'The queries of {route} grow with the data: '
+                         f'{counts}')
+
+
+class APITestCase(QueryBudgetMixin, TestCase):
+    def _pre_setup(self):
+        super()._pre_setup()
+        # Rows of previous tests are rolled back without any signal, so
+        # their cached roles and users must not leak into this test.
+        roles.clear()
+        tokens.clear()
+        throttling.clear()
@@ -0,0 +1,195 @@
+from .base import APITestCase
+from django.urls import reverse_lazy
+from rest_framework.test import APIClient
+from rest_framework import status
+from projects import counters, models
+from authentication.models import User
+
+
+class QueryScalingTest(APITestCase):
+    """The queries of the routes must not grow with the rows they read."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+
+        self.issue = self.add_issues(1)[0]
+        self.client.force_authenticate(self.user)
+
+    def add_users(self, count):
+        first = User.objects.count()
+        return User.objects.bulk_create(
+            User(username=f'user{first + i}', password='!')
+            for i in range(count)
+        )
+
+    def add_issues(self, count, project=None):
+        issues = models.Issue.objects.bulk_create(
+            models.Issue(
+                title=f'issue {i}',
+                description='a crash at login',
+                tag=models.Issue.BUG_TAG,
+                priority=1 + i % 5,
+                project=project or self.project,
+                status=models.Issue.OPEN_STATUS,
+                author=self.user,
+                assignee=self.user
+            )
+            for i in range(count)
+        )
+        counters.count(issues)
+        return issues
+
+    def add_comments(self, count):
+        models.Comment.objects.bulk_create(
+            models.Comment(description='it crashes again',
+                           author=self.user, issue=self.issue)
+            for _ in range(count)
+        )
+
+    def add_projects(self, count):
+        projects = models.Project.objects.bulk_create(
+            models.Project(title='Another project',
+                           description='Where bob contributes',
+                           type=models.Project.FRONTEND_TYPE)
+            for _ in range(count)
+        )
+        models.Collaborator.objects.bulk_create(
+            models.Collaborator(user=self.user, project=project,
+                                role=models.Collaborator.CONTRIBUTOR_ROLE)
+            for project in projects
+        )
+
+    def add_collaborators(self, count):
+        models.Collaborator.objects.bulk_create(
+            models.Collaborator(user=user, project=self.project,
+                                role=models.Collaborator.CONTRIBUTOR_ROLE)
+            for user in self.add_users(count)
+        )
+
+    def get(self, name, **kwargs):
+        def request():
+            response = self.client.get(reverse_lazy(f'projects:{name}',
+                                                    kwargs=kwargs))
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+            b''.join(response.streaming_content) \
+                if response.streaming else response.content
+        return request
+
+    def test_projects_list(self):
+        self.assertConstantQueries(self.get('projects-list'),
+                                   self.add_projects)
+
+    def test_projects_detail(self):
+        def grow(scale):
+            self.add_issues(scale)
+            self.add_collaborators(scale)
+
+        self.assertConstantQueries(
+            self.get('projects-detail', pk=self.project.id), grow
+        )
+
+    def test_projects_stats(self):
+        def grow(scale):
+            self.add_issues(scale)
+
+        self.assertConstantQueries(
+            self.get('projects-stats', pk=self.project.id), grow
+        )
+
+    def test_projects_export(self):
+        def grow(scale):
+            self.add_issues(scale)
+            self.add_comments(scale)
+            self.add_collaborators(scale)
+
+        self.assertConstantQueries(
+            self.get('projects-export', pk=self.project.id), grow
+        )
+
+    def test_users_list(self):
+        self.assertConstantQueries(
+            self.get('users-list', project_pk=self.project.id),
+            self.add_collaborators
+        )
+
+    def test_issues_list(self):
+        self.assertConstantQueries(
+            self.get('issues-list', project_pk=self.project.id),
+            self.add_issues
+        )
+
+    def test_comments_list(self):
+        self.assertConstantQueries(
+            self.get('comments-list', project_pk=self.project.id,
+                     issue_pk=self.issue.id),
+            self.add_comments
+        )
+
+    def test_issues_bulk_update(self):
+        def request():
+            response = self.client.patch(
+                reverse_lazy('projects:issues-bulk-create',
+                             kwargs={'project_pk': self.project.id}),
+                {'filter': {'status': 'OPEN'}, 'patch': {'priority': 5}},
+                format='json'
+            )
+            self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+        self.assertConstantQueries(request, self.add_issues)
+
+    def test_projects_destroy(self):
+        projects = []
+
+        def grow(scale):
+            project = models.Project.objects.create(
+                title='Doomed', description='To be deleted',
+                type=models.Project.BACKEND_TYPE
+            )
+            models.Collaborator.objects.create(
+                user=self.user, project=project,
+                role=models.Collaborator.AUTHOR_ROLE
+            )
+            self.add_issues(scale, project)
+            projects.append(project)
+
+        def request():
+            response = self.client.delete(reverse_lazy(
+                'projects:projects-detail', kwargs={'pk': projects[-1].id}
+            ))
+            self.assertEqual(status.HTTP_204_NO_CONTENT,
+                             response.status_code)
+
+        self.assertConstantQueries(request, grow)
+
+
+class QueryBudgetTest(APITestCase):
+    def test_err_over_budget(self):
+        budget = self.budgets['projects-list:list']
+        self.request_queries.append(('projects-list:list', budget + 1))
+
+        with self.assertRaisesRegex(AssertionError, 'over its budget'):
+            self.check_query_budgets()
+        self.request_queries.clear()
+
+    def test_err_no_budget(self):
+        self.request_queries.append(('projects-unknown:list', 1))
+
+        with self.assertRaisesRegex(AssertionError, 'No query budget'):
+            self.check_query_budgets()
+        self.request_queries.clear()
@@ -1,4 +1,5 @@
-from django.test import TestCase
+from django.db import IntegrityError, transaction
+from .base import APITestCase
 from django.urls import reverse_lazy
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -6,7 +7,7 @@ from projects import models
 from authentication.models import User
 
 
-class CreateCollaboratorTest(TestCase):
+class CreateCollaboratorTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(username='bob',
@@ -24,12 +25,15 @@ class CreateCollaboratorTest(TestCase):
                                            project=self.project,
                                            role=models.Collaborator.AUTHOR_ROLE)
 
-        num_contrib = models.Collaborator.objects.filter(user=self.user).count()
+        other = User.objects.create_user(username='sam', password='hello')
+        num_contrib = models.Collaborator.objects.filter(
+            project=self.project
+        ).count()
 
         response = self.client.post(
             reverse_lazy('projects:users-list', kwargs={'project_pk':
                                                         self.project.id}), {
-                'user': self.user.id,
+                'user': other.id,
                 'role': models.Collaborator.SUPERVISOR_ROLE
             }
         )
@@ -37,6 +41,27 @@ class CreateCollaboratorTest(TestCase):
         self.assertEqual(status.HTTP_201_CREATED, response.status_code)
         self.assertEqual(
             num_contrib + 1,
+            models.Collaborator.objects.filter(project=self.project).count()
+        )
+
+    def test_ko_already_collaborator(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(user=self.user,
+                                           project=self.project,
+                                           role=models.Collaborator.AUTHOR_ROLE)
+
+        response = self.client.post(
+            reverse_lazy('projects:users-list', kwargs={'project_pk':
+                                                        self.project.id}), {
+                'user': self.user.id,
+                'role': models.Collaborator.SUPERVISOR_ROLE
+            }
+        )
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(
+            1,
             models.Collaborator.objects.filter(user=self.user).count()
         )
 
@@ -89,7 +114,7 @@ class CreateCollaboratorTest(TestCase):
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
 
-class DestroyCollaboratorTest(TestCase):
+class DestroyCollaboratorTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(username='bob',
@@ -129,7 +154,7 @@ class DestroyCollaboratorTest(TestCase):
             models.Collaborator.objects.filter(user=self.collaborator).count()
         )
 
-    def test_ok_author_and_contributor(self):
+    def test_ok_author_cannot_also_be_contributor(self):
         self.client.force_authenticate(self.user)
 
         models.Collaborator.objects.create(
@@ -138,11 +163,12 @@ class DestroyCollaboratorTest(TestCase):
             role=models.Collaborator.AUTHOR_ROLE
         )
 
-        models.Collaborator.objects.create(
-            user=self.user,
-            project=self.project,
-            role=models.Collaborator.CONTRIBUTOR_ROLE
-        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            models.Collaborator.objects.create(
+                user=self.user,
+                project=self.project,
+                role=models.Collaborator.CONTRIBUTOR_ROLE
+            )
 
         response = self.client.delete(
             reverse_lazy('projects:users-detail',
@@ -197,7 +223,7 @@ class DestroyCollaboratorTest(TestCase):
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
 
-class ListCollaboratorsTest(TestCase):
+class ListCollaboratorsTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(username='bob',
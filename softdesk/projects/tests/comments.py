@@ -1,4 +1,4 @@
-from django.test import TestCase
+from .base import APITestCase
 from django.urls import reverse_lazy
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -6,7 +6,7 @@ from projects import models
 from authentication.models import User
 
 
-class CreateCommentTest(TestCase):
+class CreateCommentTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
@@ -113,7 +113,7 @@ class CreateCommentTest(TestCase):
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
 
-class UpdateCommentTest(TestCase):
+class UpdateCommentTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
@@ -194,6 +194,33 @@ class UpdateCommentTest(TestCase):
         self.assertEqual(self.user.id, comment.author.id)
         self.assertEqual(self.issue.id, comment.issue.id)
 
+    def test_ok_permissions_resolved_once(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.SUPERVISOR_ROLE
+        )
+
+        # Membership, comment lookup, author validation, UPDATE and the
+        # new version of the project.
+        with self.assertNumQueries(5):
+            response = self.client.put(
+                reverse_lazy(
+                    'projects:comments-detail', kwargs={
+                        'project_pk': self.project.id,
+                        'issue_pk': self.issue.id,
+                        'pk': self.my_comment.id
+                    }
+                ), {
+                    'description': 'my comment 2',
+                    'author': self.user.id
+                }
+            )
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
     def test_err_not_a_collaborator(self):
         self.client.force_authenticate(self.user)
 
@@ -259,7 +286,7 @@ class UpdateCommentTest(TestCase):
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
 
-class DestroyCommentTest(TestCase):
+class DestroyCommentTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
@@ -375,7 +402,7 @@ class DestroyCommentTest(TestCase):
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
 
-class ListCommentsTest(TestCase):
+class ListCommentsTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
@@ -448,7 +475,35 @@ class ListCommentsTest(TestCase):
         )
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(6, len(response.data))
+        self.assertEqual(6, len(response.data['results']))
+
+    def test_ok_only_comments_of_the_issue(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.SUPERVISOR_ROLE
+        )
+
+        models.Comment.objects.create(
+            description='another comment',
+            author=self.user,
+            issue=self.issue_not_author
+        )
+
+        response = self.client.get(
+            reverse_lazy('projects:comments-list', kwargs={
+                'project_pk': self.project.id,
+                'issue_pk': self.issue_not_author.id
+            })
+        )
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            ['another comment'],
+            [comment['description'] for comment in response.data['results']]
+        )
 
     def test_err_not_collaborator(self):
         self.client.force_authenticate(self.user)
@@ -479,7 +534,7 @@ class ListCommentsTest(TestCase):
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
 
-class RetrieveCommentTest(TestCase):
+class RetrieveCommentTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
@@ -0,0 +1,188 @@
+import datetime
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.urls import reverse_lazy
+from rest_framework.test import APIClient
+from .base import APITestCase
+from projects import archive, models, roles
+from authentication.models import User
+
+
+class ImportProjectTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+
+        self.assignee = User.objects.create_user(
+            username='dan',
+            password='dan'
+        )
+
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+
+        for i in range(3):
+            issue = models.Issue.objects.create(
+                title=f'my issue{i}',
+                description='this is my issue',
+                tag=models.Issue.BUG_TAG,
+                priority=i,
+                project=self.project,
+                status=models.Issue.OPEN_STATUS,
+                author=self.user,
+                assignee=self.assignee
+            )
+            for j in range(2):
+                models.Comment.objects.create(
+                    description=f'comment {j}',
+                    author=self.assignee,
+                    issue=issue
+                )
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def export(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse_lazy('projects:projects-export',
+                                                args=[self.project.id]))
+        return b''.join(response.streaming_content).decode()
+
+    def load(self, path, **options):
+        call_command('import_project', path, stdout=StringIO(),
+                     batch_size=2, chunk_size=3, **options)
+
+    def test_ok_export_imported_back(self):
+        path = self.write('project.ndjson', self.export())
+
+        self.load(path)
+
+        project = models.Project.objects.exclude(pk=self.project.pk).get()
+        self.assertEqual('A Project', project.title)
+        # The users already exist.
+        self.assertEqual(2, User.objects.count())
+        self.assertEqual(
+            list(models.Issue.objects.filter(
+                project=self.project
+            ).values_list('title', 'priority', 'author', 'created')),
+            list(models.Issue.objects.filter(
+                project=project
+            ).values_list('title', 'priority', 'author', 'created'))
+        )
+        self.assertEqual(6, models.Comment.objects.filter(
+            issue__project=project
+        ).count())
+        self.assertEqual(3, models.IssueCounter.objects.get(
+            project=project
+        ).count)
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_ok_csv(self):
+        path = self.write('dump.csv', '\n'.join([
+            'record,id,title,description,type,username,user,role,tag,'
+            'priority,status,author,assignee,issue',
+            'project,P,Tracker,From elsewhere,BACKEND,,,,,,,,,',
+            'user,u1,,,,carol,,,,,,,,',
+            'collaborator,,,,,,u1,AUTHOR,,,,,,',
+            'issue,T-1,Crash,It crashes,,,,,BUG,2,OPEN,u1,u1,',
+            'comment,,,Confirmed,,,,,,,,u1,,T-1',
+        ]) + '\n')
+
+        self.load(path)
+
+        issue = models.Issue.objects.get(title='Crash')
+        self.assertEqual('carol', issue.assignee.username)
+        self.assertEqual('Tracker', issue.project.title)
+        self.assertFalse(issue.author.has_usable_password())
+        self.assertEqual('Confirmed', issue.comment_set.get().description)
+
+    def test_ok_roles_invalidated(self):
+        path = self.write('collaborators.ndjson', '\n'.join([
+            '{"user": {"id": 1, "username": "dan"}}',
+            '{"collaborator": {"user": 1, "role": "CONTRIBUTOR"}}',
+        ]) + '\n')
+        roles.put(self.assignee.id, self.project.id, None)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.load(path, project=self.project.id)
+
+        self.assertIs(roles.MISSING,
+                      roles.get(self.assignee.id, self.project.id))
+
+    def test_err_invalid_choice(self):
+        content = self.export()
+        for field, value in [('tag', 'FEATURE'), ('status', 'DONE'),
+                             ('role', 'OWNER'), ('type', 'COBOL')]:
+            path = self.write('project.ndjson', content.replace(
+                f'"{field}":"', f'"{field}":"{value}', 1
+            ))
+
+            with self.assertRaisesMessage(CommandError, f'Invalid {field}'):
+                self.load(path, checkpoint=f'{path}.{field}')
+
+    def test_err_not_a_record(self):
+        for line in ['[1, 2]', '"project"', '{}',
+                     '{"project": {}, "user": {}}', '{"user": 1}']:
+            path = self.write('project.ndjson', line + '\n')
+
+            with self.assertRaisesMessage(CommandError,
+                                          'Line 1 is not a record.'):
+                self.load(path, checkpoint=f'{path}.checkpoint')
+
+    def test_ok_resumed_from_checkpoint(self):
+        content = self.export()
+        path = self.write('project.ndjson', content)
+        # Stops after the second issue (the ninth record).
+        broken = self.write('broken.ndjson', '\n'.join(
+            content.splitlines()[:9] + ['{"issue": {}}']
+        ) + '\n')
+
+        with self.assertRaises(CommandError):
+            self.load(broken, checkpoint=f'{path}.checkpoint')
+        self.load(path)
+
+        project = models.Project.objects.exclude(pk=self.project.pk).get()
+        self.assertEqual(
+            ['my issue0', 'my issue1', 'my issue2'],
+            list(models.Issue.objects.filter(
+                project=project
+            ).order_by('id').values_list('title', flat=True))
+        )
+        self.assertEqual(6, models.Comment.objects.filter(
+            issue__project=project
+        ).count())
+
+    def test_copy_values(self):
+        self.assertEqual(
+            ['\\N', 't', '12', 'a\\tb\\\\c\\nd\\re',
+             '2022-11-03T10:05:00+00:00'],
+            [archive._copy_value(value) for value in [
+                None, True, 12, 'a\tb\\c\nd\re',
+                datetime.datetime(2022, 11, 3, 10, 5,
+                                  tzinfo=datetime.timezone.utc)
+            ]]
+        )
+        self.assertEqual(connection.vendor == 'postgresql',
+                         archive.Importer().use_copy)
@@ -1,4 +1,8 @@
-from django.test import TestCase
+import json
+from base64 import urlsafe_b64encode
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .base import APITestCase
 from django.urls import reverse_lazy
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -6,7 +10,7 @@ from projects import models
 from authentication.models import User
 
 
-class CreateIssueTest(TestCase):
+class CreateIssueTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
@@ -124,7 +128,7 @@ class CreateIssueTest(TestCase):
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
 
-class UpdateIssueTest(TestCase):
+class UpdateIssueTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
@@ -271,7 +275,7 @@ class UpdateIssueTest(TestCase):
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
 
-class DestroyIssueTest(TestCase):
+class DestroyIssueTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
@@ -357,7 +361,7 @@ class DestroyIssueTest(TestCase):
         self.assertEqual(count, models.Issue.objects.count())
 
 
-class ListIssuesTest(TestCase):
+class ListIssuesTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user(
@@ -407,7 +411,231 @@ class ListIssuesTest(TestCase):
             }))
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(3, len(response.data))
+        self.assertEqual(3, len(response.data['results']))
+        self.assertIsNone(response.data['next'])
+
+    def test_ok_only_issues_of_the_project(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        other = models.Project.objects.create(
+            title='Another Project',
+            description='This is another project',
+            type=models.Project.BACKEND_TYPE
+        )
+        models.Issue.objects.create(
+            title='not my issue',
+            description='this is another issue',
+            tag=models.Issue.BUG_TAG,
+            priority=1,
+            project=other,
+            status=models.Issue.OPEN_STATUS,
+            author=self.user,
+            assignee=self.assignee
+        )
+
+        response = self.client.get(reverse_lazy(
+            'projects:issues-list', kwargs={
+                'project_pk': self.project.id
+            }))
+
+        self.assertEqual(
+            [issue.id for issue in self.issues],
+            [issue['id'] for issue in response.data['results']]
+        )
+
+    def test_ok_paginated_with_cursors(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        # Same creation date for every issue: the id breaks the tie.
+        models.Issue.objects.filter(project=self.project).update(
+            created=self.issues[0].created
+        )
+
+        url = reverse_lazy('projects:issues-list', kwargs={
+            'project_pk': self.project.id
+        })
+        response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(
+            [self.issues[0].id, self.issues[1].id],
+            [issue['id'] for issue in response.data['results']]
+        )
+
+        # The role is cached and there is no COUNT: the validators and one
+        # query per page, whatever its depth.
+        with self.assertNumQueries(2):
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [self.issues[2].id],
+            [issue['id'] for issue in response.data['results']]
+        )
+        self.assertIsNone(response.data['next'])
+
+    def test_ok_filtered(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        self.issues[1].status = models.Issue.CLOSED_STATUS
+        self.issues[1].save()
+        self.issues[2].priority = 3
+        self.issues[2].save()
+
+        url = reverse_lazy('projects:issues-list', kwargs={
+            'project_pk': self.project.id
+        })
+
+        response = self.client.get(url, {'status': models.Issue.OPEN_STATUS})
+        self.assertEqual(
+            [self.issues[0].id, self.issues[2].id],
+            [issue['id'] for issue in response.data['results']]
+        )
+
+        response = self.client.get(url, {'priority_min': 2,
+                                         'assignee': self.assignee.id})
+        self.assertEqual(
+            [self.issues[2].id],
+            [issue['id'] for issue in response.data['results']]
+        )
+
+        response = self.client.get(url, {'author': self.assignee.id})
+        self.assertEqual([], response.data['results'])
+
+    def test_ok_ordered_and_paginated(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        for priority, issue in zip([2, 3, 2], self.issues):
+            issue.priority = priority
+            issue.save()
+
+        url = reverse_lazy('projects:issues-list', kwargs={
+            'project_pk': self.project.id
+        })
+
+        response = self.client.get(url, {'ordering': '-priority',
+                                         'page_size': 2})
+        ids = [issue['id'] for issue in response.data['results']]
+        response = self.client.get(response.data['next'])
+        ids += [issue['id'] for issue in response.data['results']]
+
+        self.assertEqual(
+            [self.issues[1].id, self.issues[2].id, self.issues[0].id],
+            ids
+        )
+
+    def test_err_invalid_filter(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        url = reverse_lazy('projects:issues-list', kwargs={
+            'project_pk': self.project.id
+        })
+
+        for params in [{'status': 'SLEEPING'}, {'ordering': 'title'},
+                       {'priority_min': 'high'},
+                       {'assignee': '99999999999999999999999'},
+                       {'author': '99999999999999999999999'},
+                       {'priority_min': '99999999999999999999999'},
+                       {'priority_max': '-99999999999999999999999'}]:
+            response = self.client.get(url, params)
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_err_invalid_cursor(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        response = self.client.get(reverse_lazy(
+            'projects:issues-list', kwargs={
+                'project_pk': self.project.id
+            }), {'cursor': 'garbage'})
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+        # Well formed, but not the position of a row.
+        cursor = urlsafe_b64encode(json.dumps({
+            'o': ['created', 'id'], 'p': [None, None]
+        }).encode()).decode()
+        response = self.client.get(reverse_lazy(
+            'projects:issues-list', kwargs={
+                'project_pk': self.project.id
+            }), {'cursor': cursor})
+
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_ok_not_modified(self):
+        self.client.force_authenticate(self.user)
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+        url = reverse_lazy('projects:issues-list', kwargs={
+            'project_pk': self.project.id
+        })
+
+        response = self.client.get(url)
+        etag = response.headers['ETag']
+        self.assertIn('Last-Modified', response.headers)
+
+        # The role is cached: only the validators are read.
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        self.assertEqual(etag, response.headers['ETag'])
+        self.assertEqual(b'', response.content)
+
+    def test_ok_modified_by_a_deletion(self):
+        self.client.force_authenticate(self.user)
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+        url = reverse_lazy('projects:issues-list', kwargs={
+            'project_pk': self.project.id
+        })
+
+        etag = self.client.get(url).headers['ETag']
+        self.issues[0].delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(2, len(response.data['results']))
+        self.assertNotEqual(etag, response.headers['ETag'])
 
     def test_err_not_a_collaborator(self):
         self.client.force_authenticate(self.user)
@@ -433,4 +661,259 @@ class ListIssuesTest(TestCase):
 
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
+    def test_err_no_detail(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        response = self.client.get(reverse_lazy(
+            'projects:issues-detail', kwargs={
+                'project_pk': self.project.id,
+                'pk': self.issues[0].id
+            }))
+
+        self.assertEqual(status.HTTP_405_METHOD_NOT_ALLOWED,
+                         response.status_code)
+        allowed = response.headers['Allow'].split(', ')
+        self.assertNotIn('GET', allowed)
+        self.assertNotIn('HEAD', allowed)
+
+
+class BulkCreateIssuesTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+
+        self.assignee = User.objects.create_user(
+            username='dan',
+            password='dan'
+        )
+
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+
+        self.url = reverse_lazy('projects:issues-bulk-create', kwargs={
+            'project_pk': self.project.id
+        })
+
+    def issues(self, count):
+        return [{
+            'title': f'my issue {i}',
+            'description': 'this is my issue',
+            'tag': models.Issue.BUG_TAG,
+            'priority': 1,
+            'status': models.Issue.OPEN_STATUS,
+            'author': self.user.id,
+            'assignee': self.assignee.id
+        } for i in range(count)]
+
+    def test_ok_collaborator(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        response = self.client.post(self.url, self.issues(3), format='json')
+
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(3, len(response.data))
+        self.assertEqual(
+            ['my issue 0', 'my issue 1', 'my issue 2'],
+            list(models.Issue.objects.filter(
+                project=self.project
+            ).order_by('id').values_list('title', flat=True))
+        )
+
+    def test_ok_queries_do_not_grow_with_issues(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        # Caches the membership and creates the issue counter first.
+        self.client.post(self.url, self.issues(1), format='json')
+
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(self.url, self.issues(2), format='json')
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(self.url, self.issues(100), format='json')
+
+        self.assertEqual(103, models.Issue.objects.count())
+        self.assertEqual(len(few), len(many))
+
+    def test_err_invalid_item(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        issues = self.issues(3)
+        issues[1]['status'] = 'SLEEPING'
+        issues[2]['assignee'] = 12345
+
+        response = self.client.post(self.url, issues, format='json')
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual({}, response.data[0])
+        self.assertIn('status', response.data[1])
+        self.assertIn('assignee', response.data[2])
+        self.assertEqual(0, models.Issue.objects.count())
+
+    def test_err_not_a_collaborator(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.post(self.url, self.issues(3), format='json')
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+        self.assertEqual(0, models.Issue.objects.count())
+
+
+class BulkUpdateIssuesTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+
+        self.assignee = User.objects.create_user(
+            username='dan',
+            password='dan'
+        )
+
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+
+        self.issues = [
+            models.Issue.objects.create(
+                title=f'my issue{i}',
+                description='this is my issue',
+                tag=models.Issue.BUG_TAG,
+                priority=i,
+                project=self.project,
+                status=models.Issue.OPEN_STATUS,
+                author=self.user,
+                assignee=self.user
+            ) for i in range(3)
+        ]
+
+        self.url = reverse_lazy('projects:issues-bulk-create', kwargs={
+            'project_pk': self.project.id
+        })
+
+    def test_ok_by_ids(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.patch(self.url, {
+            'ids': [self.issues[0].id, self.issues[2].id],
+            'patch': {
+                'status': models.Issue.CLOSED_STATUS,
+                'assignee': self.assignee.id
+            }
+        }, format='json')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(2, response.data['updated'])
+        self.assertEqual(
+            [models.Issue.CLOSED_STATUS, models.Issue.OPEN_STATUS,
+             models.Issue.CLOSED_STATUS],
+            list(models.Issue.objects.order_by('id').values_list(
+                'status', flat=True
+            ))
+        )
+        self.assertEqual(
+            2,
+            models.Issue.objects.filter(assignee=self.assignee).count()
+        )
+
+    def test_ok_by_filter(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.patch(self.url, {
+            'filter': {'priority_min': 1},
+            'patch': {'tag': models.Issue.TASK_TAG}
+        }, format='json')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(2, response.data['updated'])
+        self.assertEqual(
+            2,
+            models.Issue.objects.filter(tag=models.Issue.TASK_TAG).count()
+        )
+
+    def test_err_not_author_of_every_issue(self):
+        self.client.force_authenticate(self.user)
+
+        self.issues[1].author = self.assignee
+        self.issues[1].save()
+
+        response = self.client.patch(self.url, {
+            'filter': {'status': models.Issue.OPEN_STATUS},
+            'patch': {'status': models.Issue.CLOSED_STATUS}
+        }, format='json')
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
+        self.assertEqual(
+            0,
+            models.Issue.objects.filter(
+                status=models.Issue.CLOSED_STATUS
+            ).count()
+        )
+
+    def test_err_invalid_patch(self):
+        self.client.force_authenticate(self.user)
+
+        for data in [
+            {'ids': [self.issues[0].id], 'patch': {}},
+            {'ids': [self.issues[0].id], 'patch': {'status': 'SLEEPING'}},
+            {'patch': {'status': models.Issue.CLOSED_STATUS}},
+            {'ids': [99999999999999999999999],
+             'patch': {'status': models.Issue.CLOSED_STATUS}},
+        ]:
+            response = self.client.patch(self.url, data, format='json')
+            self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_err_invalid_filter(self):
+        self.client.force_authenticate(self.user)
 
+        for selection in [{'statuss': models.Issue.CLOSED_STATUS}, {},
+                          {'ordering': 'priority'}]:
+            response = self.client.patch(self.url, {
+                'filter': selection,
+                'patch': {'status': models.Issue.CLOSED_STATUS}
+            }, format='json')
+
+            self.assertEqual(status.HTTP_400_BAD_REQUEST,
+                             response.status_code)
+            self.assertIn('filter', response.data)
+        self.assertFalse(models.Issue.objects.filter(
+            status=models.Issue.CLOSED_STATUS
+        ).exists())
@@ -0,0 +1,106 @@
+from .base import APITestCase
+from django.test import AsyncClient, override_settings
+from django.urls import reverse, reverse_lazy
+from rest_framework.test import APIClient
+from rest_framework import status
+from projects import models
+from authentication.models import User
+from authentication.tokens import TokenObtainPairSerializer
+from softdesk import metrics
+
+
+class MetricsTest(APITestCase):
+    url = reverse_lazy('metrics')
+
+    def setUp(self):
+        metrics.registry.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+
+        self.client.force_authenticate(self.user)
+
+    @staticmethod
+    def timings(response):
+        entries = {}
+        for entry in response.headers['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    def test_ok_server_timing(self):
+        response = self.client.get(reverse('projects:projects-list'))
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        timings = self.timings(response)
+        self.assertEqual(['db', 'auth', 'permissions', 'serialization',
+                          'render', 'total'], list(timings))
+        self.assertRegex(timings['db']['desc'], r'^"\d+ queries"$')
+        for entry in timings.values():
+            self.assertGreaterEqual(float(entry['dur']), 0)
+
+    def test_ok_histograms(self):
+        self.client.get(reverse('projects:projects-list'))
+        self.client.get(reverse('projects:projects-list'))
+        response = self.client.get(self.url)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        lines = response.content.decode().splitlines()
+        self.assertIn('# TYPE softdesk_request_duration_seconds histogram',
+                      lines)
+        labels = 'route="projects-list",action="list"'
+        self.assertIn(f'softdesk_request_duration_seconds_bucket{{{labels},'
+                      f'le="+Inf"}} 2', lines)
+        self.assertIn(f'softdesk_request_duration_seconds_count{{{labels}}}'
+                      f' 2', lines)
+        self.assertIn(f'softdesk_request_phase_seconds_count{{{labels},'
+                      f'phase="render"}} 2', lines)
+        self.assertIn(f'softdesk_db_queries_count{{{labels}}} 2', lines)
+        self.assertIn(f'softdesk_response_size_bytes_count{{{labels}}} 2',
+                      lines)
+
+    def test_ok_unmatched(self):
+        self.client.get('/nope/')
+        response = self.client.get(self.url)
+
+        self.assertIn('softdesk_request_duration_seconds_count{route='
+                      '"unmatched",action=""} 1',
+                      response.content.decode().splitlines())
+
+    def test_err_not_local(self):
+        response = self.client.get(self.url, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+        with override_settings(METRICS_ALLOWED_ADDRESSES=['10.0.0.1']):
+            response = self.client.get(self.url, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    @override_settings(ROOT_URLCONF='softdesk.asgi_urls')
+    async def test_ok_async(self):
+        token = TokenObtainPairSerializer.get_token(self.user).access_token
+        response = await AsyncClient().get(
+            reverse('projects:projects-list'),
+            authorization=f'Bearer {token}'
+        )
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        timings = self.timings(response)
+        self.assertEqual(['db', 'auth', 'permissions', 'serialization',
+                          'render', 'total'], list(timings))
+        # Run by the async ORM in the thread of sync_to_async().
+        self.assertNotEqual('"0 queries"', timings['db']['desc'])
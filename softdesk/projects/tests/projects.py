@@ -1,12 +1,15 @@
-from django.test import TestCase
+import time
+from unittest import mock
+
+from .base import APITestCase
 from django.urls import reverse_lazy
 from rest_framework.test import APIClient
 from rest_framework import status
-from projects import models
+from projects import models, roles
 from authentication.models import User
 
 
-class CreateProjectTest(TestCase):
+class CreateProjectTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user('alice', 'azerty')
@@ -42,7 +45,7 @@ class CreateProjectTest(TestCase):
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
 
-class UpdateProjectTest(TestCase):
+class UpdateProjectTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user('alice', 'azerty')
@@ -110,7 +113,7 @@ class UpdateProjectTest(TestCase):
         self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
 
 
-class DestroyProjectTest(TestCase):
+class DestroyProjectTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user('alice', 'azerty')
@@ -168,7 +171,7 @@ class DestroyProjectTest(TestCase):
         self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
 
 
-class ListProjectsTest(TestCase):
+class ListProjectsTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user('alice', 'azerty')
@@ -210,7 +213,8 @@ class ListProjectsTest(TestCase):
         )
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(3, len(response.data))
+        self.assertEqual(3, response.data['count'])
+        self.assertEqual(3, len(response.data['results']))
 
     def test_ok_related_to_one_project(self):
         self.client.force_authenticate(self.user)
@@ -226,8 +230,10 @@ class ListProjectsTest(TestCase):
         )
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(1, len(response.data))
-        self.assertEqual('Project 1', response.data[0].get('title'))
+        self.assertEqual(1, len(response.data['results']))
+        self.assertEqual('Project 1', response.data['results'][0].get('title'))
+        self.assertEqual(models.Collaborator.CONTRIBUTOR_ROLE,
+                         response.data['results'][0].get('role'))
 
     def test_ok_not_related_to_any_project(self):
         self.client.force_authenticate(self.user)
@@ -237,7 +243,7 @@ class ListProjectsTest(TestCase):
         )
 
         self.assertEqual(status.HTTP_200_OK, response.status_code)
-        self.assertEqual(0, len(response.data))
+        self.assertEqual(0, len(response.data['results']))
 
     def test_err_not_authenticated(self):
         response = self.client.get(
@@ -246,8 +252,77 @@ class ListProjectsTest(TestCase):
 
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
 
+    def test_ok_paginated(self):
+        self.client.force_authenticate(self.user)
+
+        for project in self.projects:
+            models.Collaborator.objects.create(
+                user=self.user,
+                project=project,
+                role=models.Collaborator.CONTRIBUTOR_ROLE
+            )
+
+        response = self.client.get(
+            reverse_lazy('projects:projects-list'), {'page_size': 2}
+        )
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(3, response.data['count'])
+        self.assertEqual(['Project 0', 'Project 1'],
+                         [p['title'] for p in response.data['results']])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_queries_do_not_grow_with_membership(self):
+        self.client.force_authenticate(self.user)
+
+        for count in [1, 10, 100]:
+            models.Collaborator.objects.filter(user=self.user).delete()
+            models.Collaborator.objects.bulk_create([
+                models.Collaborator(
+                    user=self.user,
+                    project=models.Project.objects.create(
+                        title='Project',
+                        description='random stuff',
+                        type=models.Project.BACKEND_TYPE
+                    ),
+                    role=models.Collaborator.CONTRIBUTOR_ROLE
+                ) for _ in range(count)
+            ])
+
+            # The validators, one COUNT for the paginator and one joined
+            # SELECT for the page.
+            with self.assertNumQueries(3):
+                response = self.client.get(
+                    reverse_lazy('projects:projects-list')
+                )
+
+            self.assertEqual(count, response.data['count'])
+
+    def test_ok_modified_when_joining_a_project(self):
+        self.client.force_authenticate(self.user)
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.projects[0],
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+        url = reverse_lazy('projects:projects-list')
+
+        etag = self.client.get(url).headers['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.projects[1],
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(2, response.data['count'])
+
 
-class RetrieveProjectTest(TestCase):
+class RetrieveProjectTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create_user('alice', 'azerty')
@@ -295,3 +370,79 @@ class RetrieveProjectTest(TestCase):
         )
 
         self.assertEqual(status.HTTP_401_UNAUTHORIZED, response.status_code)
+
+    def test_ok_role_cached_across_requests(self):
+        self.client.force_authenticate(self.user)
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.projects[2],
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+        url = reverse_lazy('projects:projects-detail',
+                           args=[self.projects[2].id])
+
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+        # Only the project itself is fetched once the role is cached.
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+
+    def test_err_role_cache_invalidated(self):
+        self.client.force_authenticate(self.user)
+
+        contrib = models.Collaborator.objects.create(
+            user=self.user,
+            project=self.projects[2],
+            role=models.Collaborator.CONTRIBUTOR_ROLE
+        )
+        url = reverse_lazy('projects:projects-detail',
+                           args=[self.projects[2].id])
+
+        self.assertEqual(status.HTTP_200_OK, self.client.get(url).status_code)
+        contrib.delete()
+        self.assertEqual(status.HTTP_403_FORBIDDEN,
+                         self.client.get(url).status_code)
+
+    def test_ok_role_cache_bounded_when_process_local(self):
+        # Another worker cannot invalidate a LocMemCache: its entries live
+        # no longer than those of the local tier.
+        roles.put(self.user.id, self.projects[2].id,
+                  models.Collaborator.CONTRIBUTOR_ROLE)
+        roles._local.clear()
+        later = time.time() + roles._local.timeout + 1
+
+        with mock.patch('time.time', return_value=later):
+            self.assertIs(roles.MISSING,
+                          roles.get(self.user.id, self.projects[2].id))
+
+    def test_ok_not_modified_until_updated(self):
+        self.client.force_authenticate(self.user)
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.projects[0],
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+        url = reverse_lazy('projects:projects-detail',
+                           args=[self.projects[0].id])
+
+        response = self.client.get(url)
+        headers = {
+            'HTTP_IF_NONE_MATCH': response.headers['ETag'],
+            'HTTP_IF_MODIFIED_SINCE': response.headers['Last-Modified']
+        }
+        response = self.client.get(url, **headers)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+        self.client.put(url, {
+            'title': 'Project 0 renamed',
+            'description': 'random stuff',
+            'type': models.Project.FRONTEND_TYPE
+        })
+        response = self.client.get(url, **headers)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('Project 0 renamed', response.data['title'])
@@ -0,0 +1,125 @@
+from django.urls import reverse_lazy
+from rest_framework.test import APIClient
+from rest_framework import status
+from .base import APITestCase
+from projects import models
+from authentication.models import User
+
+
+class SearchProjectTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+
+        self.projects = [
+            models.Project.objects.create(
+                title=f'Project {i}',
+                description='This is a project',
+                type=models.Project.BACKEND_TYPE
+            ) for i in range(2)
+        ]
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.projects[0],
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+
+        self.issues = [
+            models.Issue.objects.create(
+                title=title,
+                description=description,
+                tag=models.Issue.BUG_TAG,
+                priority=1,
+                project=project,
+                status=models.Issue.OPEN_STATUS,
+                author=self.user,
+                assignee=self.user
+            ) for title, description, project in [
+                ('Crash at login', 'The app crashes', self.projects[0]),
+                ('Slow pages', 'Every page is slow', self.projects[0]),
+                ('Crash at login', 'Same title', self.projects[1]),
+            ]
+        ]
+
+        self.comment = models.Comment.objects.create(
+            description='It still crashes <sometimes> at login',
+            author=self.user,
+            issue=self.issues[1]
+        )
+
+        self.url = reverse_lazy('projects:projects-search',
+                                args=[self.projects[0].id])
+
+    def search(self, q):
+        return self.client.get(self.url, {'q': q})
+
+    def test_ok_issues_and_comments_of_the_project(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.search('crash login')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        hits = response.data['results']
+        # The match in the title ranks first.
+        self.assertEqual(
+            [('issue', self.issues[0].id), ('comment', self.comment.id)],
+            [(hit['type'], hit['id']) for hit in hits]
+        )
+        self.assertEqual(self.issues[1].id, hits[1]['issue'])
+        self.assertEqual(
+            'It still <mark>crashes</mark> &lt;sometimes&gt; at '
+            '<mark>login</mark>',
+            hits[1]['snippet']
+        )
+
+    def test_ok_follows_the_changes(self):
+        self.client.force_authenticate(self.user)
+
+        self.issues[0].title = 'Freeze at login'
+        self.issues[0].save()
+        self.comment.delete()
+        models.Issue.objects.filter(pk=self.issues[1].pk).update(
+            description='It crashes too'
+        )
+
+        hits = self.search('crash')
+        self.assertEqual(
+            [self.issues[0].id, self.issues[1].id],
+            sorted(hit['id'] for hit in hits.data['results'])
+        )
+        self.assertEqual([self.issues[1].id],
+                         [hit['id'] for hit in
+                          self.search('slow page').data['results']])
+        self.assertEqual([self.issues[0].id],
+                         [hit['id'] for hit in
+                          self.search('freeze').data['results']])
+
+    def test_ok_no_words(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.search('"*:(')
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([], response.data['results'])
+
+    def test_err_no_query(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_err_not_a_collaborator(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(
+            reverse_lazy('projects:projects-search',
+                         args=[self.projects[1].id]),
+            {'q': 'crash'}
+        )
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
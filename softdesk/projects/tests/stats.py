@@ -0,0 +1,192 @@
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse_lazy
+from rest_framework.test import APIClient
+from rest_framework import status
+from .base import APITestCase
+from projects import models
+from authentication.models import User
+
+
+class ProjectStatsTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+
+        self.assignee = User.objects.create_user(
+            username='dan',
+            password='dan'
+        )
+
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+
+        self.url = reverse_lazy('projects:projects-stats',
+                                args=[self.project.id])
+
+    def create_issue(self, tag, status, assignee):
+        return self.client.post(
+            reverse_lazy('projects:issues-list', kwargs={
+                'project_pk': self.project.id
+            }), {
+                'title': 'my issue',
+                'description': 'this is my issue',
+                'tag': tag,
+                'priority': 1,
+                'status': status,
+                'author': self.user.id,
+                'assignee': assignee.id
+            }
+        )
+
+    def test_ok_follows_the_issues(self):
+        self.client.force_authenticate(self.user)
+
+        self.create_issue(models.Issue.BUG_TAG, models.Issue.OPEN_STATUS,
+                          self.user)
+        self.create_issue(models.Issue.BUG_TAG, models.Issue.OPEN_STATUS,
+                          self.assignee)
+        response = self.create_issue(models.Issue.TASK_TAG,
+                                     models.Issue.OPEN_STATUS, self.user)
+
+        self.client.put(
+            reverse_lazy('projects:issues-detail', kwargs={
+                'project_pk': self.project.id,
+                'pk': response.data['id']
+            }), {
+                'title': 'my issue',
+                'description': 'this is my issue',
+                'tag': models.Issue.TASK_TAG,
+                'priority': 1,
+                'status': models.Issue.CLOSED_STATUS,
+                'author': self.user.id,
+                'assignee': self.user.id
+            }
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({'OPEN': 2, 'CLOSED': 1}, response.data['issues'])
+        self.assertEqual({'OPEN': 2, 'CLOSED': 0},
+                         response.data['tags'][models.Issue.BUG_TAG])
+        self.assertEqual({'OPEN': 0, 'CLOSED': 1},
+                         response.data['tags'][models.Issue.TASK_TAG])
+        self.assertEqual({self.user.id: 1, self.assignee.id: 1},
+                         response.data['open_by_assignee'])
+        self.assertEqual(1, response.data['collaborators'])
+
+        models.Issue.objects.filter(status=models.Issue.OPEN_STATUS)[0] \
+            .delete()
+        response = self.client.get(self.url)
+        self.assertEqual({'OPEN': 1, 'CLOSED': 1}, response.data['issues'])
+
+    def test_ok_follows_bulk_endpoints(self):
+        self.client.force_authenticate(self.user)
+
+        bulk = reverse_lazy('projects:issues-bulk-create', kwargs={
+            'project_pk': self.project.id
+        })
+        self.client.post(bulk, [{
+            'title': f'my issue {i}',
+            'description': 'this is my issue',
+            'tag': models.Issue.BUG_TAG,
+            'priority': i,
+            'status': models.Issue.OPEN_STATUS,
+            'author': self.user.id,
+            'assignee': self.assignee.id
+        } for i in range(4)], format='json')
+        self.client.patch(bulk, {
+            'filter': {'priority_min': 2},
+            'patch': {'status': models.Issue.CLOSED_STATUS}
+        }, format='json')
+
+        response = self.client.get(self.url)
+
+        self.assertEqual({'OPEN': 2, 'CLOSED': 2}, response.data['issues'])
+        self.assertEqual({self.assignee.id: 2},
+                         response.data['open_by_assignee'])
+
+    def test_ok_bulk_update_moves_counters(self):
+        self.client.force_authenticate(self.user)
+        for assignee in [self.user, self.assignee, self.assignee]:
+            self.create_issue(models.Issue.BUG_TAG, models.Issue.OPEN_STATUS,
+                              assignee)
+        untouched = models.IssueCounter.objects.get(assignee=self.user)
+
+        self.client.patch(reverse_lazy('projects:issues-bulk-create', kwargs={
+            'project_pk': self.project.id
+        }), {
+            'filter': {'assignee': self.assignee.id},
+            'patch': {'status': models.Issue.CLOSED_STATUS,
+                      'assignee': self.user.id}
+        }, format='json')
+
+        # The other counters are left as they were, not counted again.
+        self.assertTrue(models.IssueCounter.objects.filter(
+            pk=untouched.pk, count=1
+        ).exists())
+        response = self.client.get(self.url)
+        self.assertEqual({'OPEN': 1, 'CLOSED': 2}, response.data['issues'])
+        self.assertEqual({self.user.id: 1},
+                         response.data['open_by_assignee'])
+
+    def test_ok_follows_issues_saved_unloaded(self):
+        self.client.force_authenticate(self.user)
+        response = self.create_issue(models.Issue.BUG_TAG,
+                                     models.Issue.OPEN_STATUS, self.user)
+
+        issue = models.Issue.objects.get(pk=response.data['id'])
+        models.Issue(pk=issue.pk, title=issue.title,
+                     description=issue.description,
+                     tag=models.Issue.TASK_TAG, priority=issue.priority,
+                     project=self.project, status=models.Issue.CLOSED_STATUS,
+                     author=self.user, assignee=self.user,
+                     created=issue.created).save()
+
+        response = self.client.get(self.url)
+        self.assertEqual({'OPEN': 0, 'CLOSED': 1}, response.data['issues'])
+        self.assertEqual({'OPEN': 0, 'CLOSED': 1},
+                         response.data['tags'][models.Issue.TASK_TAG])
+
+    def test_ok_constant_queries(self):
+        self.client.force_authenticate(self.user)
+
+        for _ in range(2):
+            self.create_issue(models.Issue.BUG_TAG, models.Issue.OPEN_STATUS,
+                              self.user)
+            # The role is cached: the counters and the collaborators only.
+            with self.assertNumQueries(2):
+                self.client.get(self.url)
+
+    def test_ok_rebuild_command(self):
+        self.client.force_authenticate(self.user)
+
+        for assignee in [self.user, self.assignee, self.assignee]:
+            self.create_issue(models.Issue.IMPROVEMENT_TAG,
+                              models.Issue.OPEN_STATUS, assignee)
+        expected = self.client.get(self.url).data
+
+        models.IssueCounter.objects.update(count=42)
+        call_command('rebuild_counters', stdout=StringIO())
+
+        self.assertEqual(expected, self.client.get(self.url).data)
+
+    def test_err_not_a_collaborator(self):
+        self.client.force_authenticate(self.assignee)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(status.HTTP_403_FORBIDDEN, response.status_code)
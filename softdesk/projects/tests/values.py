@@ -0,0 +1,113 @@
+from django.db.models import F
+from django.test import SimpleTestCase
+from django.urls import reverse_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework import serializers as rest_serializers
+from .base import APITestCase
+from projects import models
+from projects import serializers
+from projects.values import ValuesPlan
+from authentication.models import User
+
+
+class ValuesParityTest(APITestCase):
+    """The lists, rendered from values(), must not drift from the
+    serializers."""
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bob',
+            password='bob'
+        )
+        self.client.force_authenticate(self.user)
+
+        self.project = models.Project.objects.create(
+            title='Un projet « accentué » 🚀',
+            description='with "quotes" and \\\\ backslashes',
+            type=models.Project.IOS_TYPE
+        )
+
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.SUPERVISOR_ROLE
+        )
+
+        for i in range(3):
+            issue = models.Issue.objects.create(
+                title=f'issue {i} ✓',
+                description='',
+                tag=models.Issue.TAGS[i][0],
+                priority=-i,
+                project=self.project,
+                status=models.Issue.STATUS[i % 2][0],
+                author=self.user,
+                assignee=self.user
+            )
+            models.Comment.objects.create(
+                description=f'comment\n{i}',
+                author=self.user,
+                issue=issue
+            )
+        self.issue = issue
+
+    def assertSameAsSerializer(self, url, serializer_class, queryset):
+        results = self.client.get(url).data['results']
+        expected = serializer_class(queryset, many=True).data
+
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(expected), renderer.render(results))
+
+    def test_projects(self):
+        self.assertSameAsSerializer(
+            reverse_lazy('projects:projects-list'),
+            serializers.ProjectListSerializer,
+            models.Project.objects.annotate(
+                role=F('collaborator__role')
+            ).order_by('id')
+        )
+
+    def test_issues(self):
+        self.assertSameAsSerializer(
+            reverse_lazy('projects:issues-list', kwargs={
+                'project_pk': self.project.id
+            }),
+            serializers.IssueSerializer,
+            models.Issue.objects.order_by('created', 'id')
+        )
+
+    def test_comments(self):
+        self.assertSameAsSerializer(
+            reverse_lazy('projects:comments-list', kwargs={
+                'project_pk': self.project.id,
+                'issue_pk': self.issue.id
+            }),
+            serializers.CommentSerializer,
+            models.Comment.objects.filter(issue=self.issue)
+        )
+
+
+class ValuesPlanTest(SimpleTestCase):
+    def test_every_field_of_the_lists(self):
+        for serializer_class in [serializers.ProjectListSerializer,
+                                 serializers.IssueSerializer,
+                                 serializers.CommentSerializer]:
+            plan = ValuesPlan.for_serializer(serializer_class)
+
+            self.assertEqual(list(serializer_class().fields),
+                             [name for name, _, _ in plan.columns])
+
+    def test_none_when_the_instance_is_needed(self):
+        class Serializer(serializers.IssueSerializer):
+            summary = rest_serializers.SerializerMethodField()
+
+            class Meta(serializers.IssueSerializer.Meta):
+                fields = serializers.IssueSerializer.Meta.fields + [
+                    'summary'
+                ]
+
+            def get_summary(self, issue):
+                return issue.title
+
+        self.assertIsNone(ValuesPlan.for_serializer(Serializer))
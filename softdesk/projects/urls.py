@@ -1,4 +1,4 @@
-from django.urls import path, include
+from django.urls import URLPattern, path, include
 from rest_framework_nested import routers
 from . import views
 
@@ -25,3 +25,25 @@ urlpatterns = [
     path('', include(issues.urls)),
     path('', include(comments.urls)),
 ]
+
+
+def asynchronous(patterns):
+    """Returns the patterns with the views of the viewsets having async
+    handlers replaced by their as_async_view() (see
+    views.AsyncViewSetMixin), for softdesk.asgi_urls."""
+    routes = []
+    for pattern in patterns:
+        if not isinstance(pattern, URLPattern):
+            routes.append(path('', include(
+                asynchronous(pattern.url_patterns)
+            )))
+            continue
+
+        view = pattern.callback
+        cls = getattr(view, 'cls', None)
+        if isinstance(cls, type) and issubclass(cls,
+                                                views.AsyncViewSetMixin):
+            view = cls.as_async_view(view.actions, **view.initkwargs)
+        routes.append(URLPattern(pattern.pattern, view,
+                                 pattern.default_args, pattern.name))
+    return routes
@@ -0,0 +1,119 @@
+"""Read-only representation of rows fetched with QuerySet.values().
+
+A ValuesPlan reads the declared fields of a model serializer and maps
+each of them to a column: lists are then fetched as dicts and turned
+into the representation of the serializer without building any model
+instance. Only the fields whose representation does not depend on the
+instance are supported; see ValuesPlan.for_serializer().
+"""
+from django.utils import timezone
+from rest_framework import ISO_8601, fields, relations, serializers
+from rest_framework.settings import api_settings
+
+# Representations that leave the values of the database as they are.
+IDENTITIES = {fields.CharField.to_representation,
+              fields.IntegerField.to_representation}
+
+
+def _converter(field):
+    """Returns a function making the converter of the values of a field
+    for one list, or None if they are represented as they are."""
+    if type(field).to_representation in IDENTITIES:
+        return None
+
+    if isinstance(field, fields.ChoiceField):
+        choices = field.choice_strings_to_values
+        return lambda: lambda value: choices.get(str(value), value)
+
+    if isinstance(field, fields.DateTimeField):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            return lambda: _datetime_converter(field)
+
+    return lambda: field.to_representation
+
+
+def _datetime_converter(field):
+    # DateTimeField.to_representation(), with the time zone of the field
+    # looked up once for the whole list.
+    field_timezone = (field.timezone if hasattr(field, 'timezone')
+                      else field.default_timezone())
+    if field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or not timezone.is_aware(value):
+            return field.to_representation(value)
+
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return convert
+
+
+class ValuesPlan:
+    def __init__(self, columns):
+        # [(field name, column, converter factory or None)]
+        self.columns = columns
+
+    _plans = {}
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        """Returns the plan of a serializer class, or None if one of its
+        fields needs the instance."""
+        if serializer_class not in cls._plans:
+            cls._plans[serializer_class] = cls._build(serializer_class())
+        return cls._plans[serializer_class]
+
+    @classmethod
+    def _build(cls, serializer):
+        if not isinstance(serializer, serializers.ModelSerializer):
+            return None
+
+        model = serializer.Meta.model
+        columns = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or '.' in field.source:
+                return None
+
+            if isinstance(field, relations.PrimaryKeyRelatedField):
+                if field.pk_field is not None:
+                    return None
+                column = model._meta.get_field(field.source).attname
+                converter = None
+            elif isinstance(field, (serializers.BaseSerializer,
+                                    relations.RelatedField,
+                                    relations.ManyRelatedField,
+                                    fields.SerializerMethodField,
+                                    fields.ListField, fields.DictField)):
+                return None
+            else:
+                column = field.source
+                converter = _converter(field)
+
+            columns.append((name, column, converter))
+
+        return cls(columns)
+
+    def values(self):
+        return [column for _, column, _ in self.columns]
+
+    def represent(self, rows):
+        """Returns the representation of the given values() rows, in the
+        same order and with the same types as the serializer's."""
+        columns = [(name, column, factory and factory())
+                   for name, column, factory in self.columns]
+        return [
+            {
+                name: (row[column] if converter is None
+                       or row[column] is None
+                       else converter(row[column]))
+                for name, column, converter in columns
+            }
+            for row in rows
+        ]
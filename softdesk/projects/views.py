@@ -1,14 +1,305 @@
+import calendar
+import hashlib
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import permissions as rest_permissions
 from . import serializers
+from . import counters
+from . import archive
+from . import filters
+from . import fulltext
 from . import models
+from . import pagination
+from . import renderers
 from . import permissions
+from .values import ValuesPlan
 from authentication.models import User
+from softdesk.fastjson import UJSONRenderer
+from softdesk.metrics import InstrumentedViewMixin
 
 
-class ProjectView(mixins.CreateModelMixin,
+class MemoizedObjectMixin:
+    """Fetches the object of a detail route only once per request.
+
+    The author permissions and the update/destroy handlers all need the
+    same object, so the first lookup is kept on the view instance, which
+    lives for a single request.
+    """
+    def get_object(self):
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+
+        return self._object
+
+    async def aget_object(self):
+        """get_object() through the async ORM."""
+        if not hasattr(self, '_object'):
+            queryset = self.filter_queryset(self.get_queryset())
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            try:
+                obj = await queryset.aget(
+                    **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+                )
+            except (queryset.model.DoesNotExist, TypeError, ValueError,
+                    DjangoValidationError):
+                raise Http404
+
+            self.check_object_permissions(self.request, obj)
+            self._object = obj
+
+        return self._object
+
+
+class AsyncViewSetMixin:
+    """Serves some actions of a viewset with async handlers, for ASGI.
+
+    The handler of an action is its name prefixed with `a` (alist for
+    list...): it runs on the event loop with the async ORM, as do the
+    permissions that have an async ahas_permission(). The other actions,
+    and the requests that are not rendered as JSON (like those of the
+    browsable API), go to the synchronous view in a thread, as they would
+    without this mixin. The routes are made async by
+    projects.urls.asynchronous().
+    """
+    @classmethod
+    def as_async_view(cls, actions, **initkwargs):
+        sync_view = sync_to_async(cls.as_view(actions, **initkwargs))
+
+        async def view(request, *args, **kwargs):
+            action = actions.get(request.method.lower())
+            if action is None or not hasattr(cls, f'a{action}'):
+                return await sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, name in actions.items():
+                setattr(self, method, getattr(self, name))
+
+            response = await self.adispatch(request, *args, **kwargs)
+            if response is None:
+                return await sync_view(request, *args, **kwargs)
+            return response
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """dispatch() with the async handler of the action, or None when
+        the response would not be JSON."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.format_kwarg = self.get_format_suffix(**kwargs)
+            renderer, media_type = self.perform_content_negotiation(request)
+            if not isinstance(renderer, JSONRenderer):
+                return None
+            request.accepted_renderer = renderer
+            request.accepted_media_type = media_type
+
+            version, scheme = self.determine_version(request, *args,
+                                                     **kwargs)
+            request.version, request.versioning_scheme = version, scheme
+
+            self.perform_authentication(request)
+            await self.acheck_permissions(request)
+            self.check_throttles(request)
+
+            handler = getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args,
+                                               **kwargs)
+        return self.response
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            if hasattr(permission, 'ahas_permission'):
+                allowed = await permission.ahas_permission(request, self)
+            else:
+                allowed = permission.has_permission(request, self)
+
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+
+class ValuesListMixin:
+    """Lists rows fetched with values() instead of model instances.
+
+    The columns are those of the fields of the serializer class, and the
+    representation is the same as the serializer's (see values.py).
+    Serializers that the values cannot represent are listed as usual.
+    """
+    def list(self, request, *args, **kwargs):
+        plan = ValuesPlan.for_serializer(self.get_serializer_class())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*plan.values())
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.represent(page))
+
+        return Response(plan.represent(rows))
+
+    async def alist(self, request, *args, **kwargs):
+        """list() through the async ORM."""
+        plan = ValuesPlan.for_serializer(self.get_serializer_class())
+        if plan is None:
+            return await sync_to_async(super().list)(request, *args,
+                                                     **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*plan.values())
+
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(rows, request,
+                                                           view=self)
+            if page is not None:
+                return self.get_paginated_response(plan.represent(page))
+
+        return Response(plan.represent([row async for row in rows]))
+
+
+class ConditionalGetMixin:
+    """Answers the list requests with 304 Not Modified when the client
+    already has the current representation.
+
+    The validators come from the version and the modification date of the
+    project (see models.Project), read with a single query after the
+    permissions are checked and before anything is serialized.
+    """
+    conditional_actions = ['list']
+
+    def get_validators(self):
+        """Returns the (version, last modification date) of the content,
+        or None when it cannot tell."""
+        return self.validators_query().first()
+
+    async def aget_validators(self):
+        return await self.validators_query().afirst()
+
+    def validators_query(self):
+        return models.Project.objects.filter(
+            pk=permissions.get_project_pk(self)
+        ).values_list('version', 'updated')
+
+    def get_etag(self, version):
+        # The same version is rendered differently for each URL and media
+        # type, and possibly for each user.
+        request = self.request
+        key = (f'{request.get_full_path()}:{request.accepted_media_type}:'
+               f'{request.user.id}')
+        digest = hashlib.md5(key.encode()).hexdigest()[:16]
+        return quote_etag(f'{version}-{digest}')
+
+    def is_conditional(self, request):
+        return (request.method in ('GET', 'HEAD')
+                and self.action in self.conditional_actions)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        validators = None
+        if self.is_conditional(request):
+            validators = self.get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_conditions(validators)
+        response = get_conditional_response(request, etag=etag,
+                                            last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        return self.set_conditions(response, etag, last_modified)
+
+    async def aconditional(self, handler, request, *args, **kwargs):
+        validators = None
+        if self.is_conditional(request):
+            validators = await self.aget_validators()
+        if validators is None:
+            return await handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_conditions(validators)
+        response = get_conditional_response(request, etag=etag,
+                                            last_modified=last_modified)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+
+        return self.set_conditions(response, etag, last_modified)
+
+    def get_conditions(self, validators):
+        version, updated = validators
+        last_modified = None
+        if updated is not None:
+            last_modified = calendar.timegm(updated.utctimetuple())
+        return self.get_etag(version), last_modified
+
+    @staticmethod
+    def set_conditions(response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional(super().alist, request, *args,
+                                       **kwargs)
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """ConditionalGetMixin for the retrieve requests too, in the views
+    with RetrieveModelMixin."""
+    conditional_actions = ['list', 'retrieve']
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aconditional(super().aretrieve, request, *args,
+                                       **kwargs)
+
+
+class ProjectView(InstrumentedViewMixin,
+                  ConditionalRetrieveMixin,
+                  ValuesListMixin,
+                  MemoizedObjectMixin,
+                  AsyncViewSetMixin,
+                  mixins.CreateModelMixin,
                   mixins.UpdateModelMixin,
                   mixins.DestroyModelMixin,
                   mixins.ListModelMixin,
@@ -16,22 +307,67 @@ class ProjectView(mixins.CreateModelMixin,
                   viewsets.GenericViewSet):
 
     serializer_class = serializers.ProjectSerializer
+    pagination_class = pagination.ProjectPagination
 
     def get_queryset(self):
         if self.action == 'list':
-            user = self.request.user
-            contribs = models.Collaborator.objects.filter(user=user)
-            return [contrib.project for contrib in contribs]
+            return models.Project.objects.filter(
+                collaborator__user=self.request.user.id
+            ).annotate(
+                role=F('collaborator__role')
+            ).order_by('id')
 
         return models.Project.objects.all()
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return serializers.ProjectListSerializer
+
+        return serializers.ProjectSerializer
+
+    def get_validators(self):
+        if self.action == 'retrieve':
+            # The project is about to be fetched anyway.
+            project = self.get_object()
+            return project.version, project.updated
+
+        return self.list_validators(
+            self.list_versions().aggregate(**self.LIST_VERSIONS)
+        )
+
+    async def aget_validators(self):
+        if self.action == 'retrieve':
+            project = await self.aget_object()
+            return project.version, project.updated
+
+        return self.list_validators(
+            await self.list_versions().aaggregate(**self.LIST_VERSIONS)
+        )
+
+    # A version summing those of the projects of the user, which also
+    # changes when they join or leave a project. Leaving a project leaves
+    # no modification date behind, so there is no Last-Modified for the
+    # list.
+    LIST_VERSIONS = {'count': Count('id'), 'versions': Sum('version'),
+                     'latest': Max('collaborator__id')}
+
+    def list_versions(self):
+        return models.Project.objects.filter(
+            collaborator__user=self.request.user.id
+        )
+
+    @staticmethod
+    def list_validators(projects):
+        return (f'{projects["count"]}.{projects["versions"]}.'
+                f'{projects["latest"]}', None)
+
     def get_permissions(self):
         if self.action in ['update', 'destroy']:
             return [
                 rest_permissions.IsAuthenticated(),
                 permissions.IsProjectAuthor()
             ]
-        elif self.action in ['retrieve']:
+        elif self.action in ['retrieve', 'stats', 'export', 'search']:
             return [
                 rest_permissions.IsAuthenticated(),
                 permissions.IsProjectRelated()
@@ -41,6 +377,33 @@ class ProjectView(mixins.CreateModelMixin,
             rest_permissions.IsAuthenticated()
         ]
 
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        return Response(counters.stats(pk))
+
+    @action(detail=True, renderer_classes=[renderers.NDJSONRenderer,
+                                           UJSONRenderer])
+    def export(self, request, pk=None):
+        """Streams the whole project as newline-delimited JSON."""
+        response = StreamingHttpResponse(
+            archive.lines(int(pk)),
+            content_type='application/x-ndjson'
+        )
+        response.headers['Content-Disposition'] = \
+            f'attachment; filename="project-{pk}.ndjson"'
+        return response
+
+    @action(detail=True)
+    def search(self, request, pk=None):
+        """Returns the issues and comments of the project matching the
+        words of `q`, best first."""
+        query = serializers.SearchSerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        return Response({'results': fulltext.search(
+            pk, query.validated_data['q'], query.validated_data['page_size']
+        )})
+
     def perform_create(self, serializer):
         project = serializer.save()
         models.Collaborator.objects.create(
@@ -50,7 +413,8 @@ class ProjectView(mixins.CreateModelMixin,
         )
 
 
-class UserView(mixins.CreateModelMixin,
+class UserView(InstrumentedViewMixin,
+               mixins.CreateModelMixin,
                mixins.DestroyModelMixin,
                mixins.ListModelMixin,
                viewsets.GenericViewSet):
@@ -84,7 +448,7 @@ class UserView(mixins.CreateModelMixin,
             contrib.full_clean()
             contrib.save()
         except Exception:
-            Response(status=status.HTTP_400_BAD_REQUEST)
+            return Response(status=status.HTTP_400_BAD_REQUEST)
 
         return Response(status=status.HTTP_201_CREATED)
 
@@ -103,13 +467,26 @@ class UserView(mixins.CreateModelMixin,
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class IssueView(mixins.CreateModelMixin,
+class IssueView(InstrumentedViewMixin,
+                ConditionalGetMixin,
+                ValuesListMixin,
+                MemoizedObjectMixin,
+                AsyncViewSetMixin,
+                mixins.CreateModelMixin,
                 mixins.UpdateModelMixin,
                 mixins.DestroyModelMixin,
                 mixins.ListModelMixin,
                 viewsets.GenericViewSet):
     serializer_class = serializers.IssueSerializer
-    queryset = models.Issue.objects.all()
+    pagination_class = pagination.KeysetPagination
+    filter_backends = [filters.IssueFilter]
+    bulk_max_size = 10000
+    bulk_batch_size = 500
+
+    def get_queryset(self):
+        return models.Issue.objects.filter(
+            project_id=self.kwargs['project_pk']
+        )
 
     def get_permissions(self):
         if self.action in ['update', 'destroy']:
@@ -124,20 +501,119 @@ class IssueView(mixins.CreateModelMixin,
         ]
 
     def perform_create(self, serializer):
-        serializer.save(project=get_object_or_404(
-            models.Project,
-            pk=self.kwargs.get('project_pk')
-        ))
+        # IsProjectRelated has already checked that the project exists.
+        serializer.save(project_id=self.kwargs.get('project_pk'))
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request, project_pk=None):
+        """Creates many issues at once, all or none of them.
+
+        The membership is checked once for the whole list, the users it
+        mentions are fetched in a single query, and the issues are
+        inserted in batches within one transaction. Answers 400 with one
+        error object per item when any of them is invalid.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError('Expected a list of issues.')
+        if len(request.data) > self.bulk_max_size:
+            raise ValidationError(
+                f'At most {self.bulk_max_size} issues per request.'
+            )
+
+        user_ids = set()
+        for item in request.data:
+            if isinstance(item, dict):
+                for name in ['author', 'assignee']:
+                    try:
+                        user_ids.add(int(item.get(name)))
+                    except (TypeError, ValueError):
+                        pass
+
+        context = self.get_serializer_context()
+        context['users'] = User.objects.only('id').in_bulk(user_ids)
+        serializer = self.get_serializer(data=request.data, many=True,
+                                         context=context)
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        issues = [models.Issue(project_id=project_pk, **item)
+                  for item in serializer.validated_data]
+        with transaction.atomic():
+            models.Issue.objects.bulk_create(issues,
+                                             batch_size=self.bulk_batch_size)
+            counters.count(issues)
+            models.Project.objects.filter(pk=project_pk).touch()
+
+        return Response(self.get_serializer(issues, many=True).data,
+                        status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request, project_pk=None):
+        """Applies the same change to many issues in a single UPDATE.
+
+        The issues are selected by `ids` or by a `filter` made of the
+        parameters of the list; `patch` holds the new tag, priority,
+        status and/or assignee. The authorship of the whole selection is
+        checked with one aggregate query: if any issue was written by
+        someone else, nothing is changed.
+        """
+        serializer = serializers.BulkUpdateSerializer(
+            data=request.data,
+            context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        issues = self.get_queryset()
+        if 'ids' in data:
+            issues = issues.filter(id__in=data['ids'])
+        else:
+            issues = filters.filter_issues(issues, data['filter'])
+
+        user_id = request.user.id
+        with transaction.atomic():
+            selection = issues.aggregate(
+                others=Count('id', filter=~Q(author_id=user_id))
+            )
+            if selection['others']:
+                self.permission_denied(
+                    request,
+                    message=f'{selection["others"]} of these issues were '
+                            f'written by someone else.'
+                )
+
+            issues = issues.filter(author_id=user_id)
+            counters.update(issues, data['patch'])
+            # Bumps the modification date like a save() would.
+            updated = issues.order_by().update(
+                created=timezone.now(),
+                **data['patch']
+            )
+            models.Project.objects.filter(pk=project_pk).touch()
+
+        return Response({'updated': updated})
 
     
-class CommentView(mixins.CreateModelMixin,
+class CommentView(InstrumentedViewMixin,
+                  ConditionalRetrieveMixin,
+                  ValuesListMixin,
+                  MemoizedObjectMixin,
+                  AsyncViewSetMixin,
+                  mixins.CreateModelMixin,
                   mixins.UpdateModelMixin,
                   mixins.DestroyModelMixin,
                   mixins.ListModelMixin,
                   mixins.RetrieveModelMixin,
                   viewsets.GenericViewSet):
     serializer_class = serializers.CommentSerializer
-    queryset = models.Comment.objects.all()
+    pagination_class = pagination.KeysetPagination
+
+    def get_queryset(self):
+        return models.Comment.objects.filter(
+            issue_id=self.kwargs['issue_pk'],
+            issue__project_id=self.kwargs['project_pk']
+        )
     
     def get_permissions(self):
         if self.action in ['update', 'destroy']:
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class SoftDeskConfig(AppConfig):
+    name = 'softdesk'
+
+    def ready(self):
+        from . import metrics, querylog, sqlite
+        connection_created.connect(sqlite.configure)
+        connection_created.connect(querylog.install)
+        connection_created.connect(metrics.install)
@@ -9,8 +9,23 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softdesk.settings')
 
-application = get_asgi_application()
+
+class SoftDeskASGIHandler(ASGIHandler):
+    """Routes the requests with asgi_urls, whose read endpoints are
+    async views."""
+    urlconf = 'softdesk.asgi_urls'
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = self.urlconf
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+application = SoftDeskASGIHandler()
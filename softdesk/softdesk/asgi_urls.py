@@ -0,0 +1,19 @@
+"""URL configuration of the ASGI application (see asgi.py).
+
+The same routes as urls.py, where the read endpoints of the projects
+application are served by async views.
+"""
+from django.contrib import admin
+from django.urls import path, include
+from softdesk.metrics import metrics_view
+from projects import urls as projects_urls
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
+    path('api/v0/', include('authentication.urls')),
+    path('api/v0/', include((
+        projects_urls.asynchronous(projects_urls.urlpatterns),
+        projects_urls.app_name
+    )))
+]
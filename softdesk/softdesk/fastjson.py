@@ -0,0 +1,78 @@
+"""JSON renderer and parser of the API, on top of ujson.
+
+They behave like those of REST framework, whose encoder still handles
+the values ujson does not know (dates, lazy strings, UUIDs...), and hand
+over to them for what ujson would get wrong: NaN and infinities, which
+strict JSON rejects.
+
+Only the renderer is used by the API: the checks the parser needs to
+reject what strict JSON does cost more than ujson saves on the small
+request bodies of the API, so the parser of REST framework is kept.
+"""
+import io
+
+import ujson
+from rest_framework.compat import (INDENT_SEPARATORS, LONG_SEPARATORS,
+                                   SHORT_SEPARATORS)
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+_default = encoders.JSONEncoder().default
+
+
+class UJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is None:
+            separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+        else:
+            separators = INDENT_SEPARATORS
+
+        try:
+            ret = ujson.dumps(data, ensure_ascii=self.ensure_ascii,
+                              escape_forward_slashes=False,
+                              allow_nan=not self.strict, reject_bytes=False,
+                              indent=indent or 0, separators=separators,
+                              default=_default)
+        except OverflowError:
+            # NaN or infinity: let the standard renderer decide.
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+
+        # Keeps the output a strict subset of JavaScript, as REST
+        # framework does.
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
+
+
+class UJSONParser(JSONParser):
+    renderer_class = UJSONRenderer
+
+    # The constants ujson would accept, unlike strict JSON.
+    CONSTANTS = (b'NaN', b'Infinity')
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        content = stream.read() if stream is not None else b''
+
+        if not (self.strict and any(constant in content
+                                    for constant in self.CONSTANTS)):
+            try:
+                return ujson.loads(self._decode(content, parser_context))
+            except (ValueError, UnicodeDecodeError):
+                pass
+
+        # Invalid, or out of ujson's reach: the standard parser tells why.
+        return super().parse(io.BytesIO(content), media_type,
+                             parser_context)
+
+    @staticmethod
+    def _decode(content, parser_context):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if encoding.lower().replace('-', '') == 'utf8':
+            return content
+        return content.decode(encoding)
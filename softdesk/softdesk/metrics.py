@@ -0,0 +1,284 @@
+"""Per-request performance metrics.
+
+MetricsMiddleware times every request and the SQL queries it runs; the
+views with InstrumentedViewMixin also time their authentication,
+permissions, handler (serialization, less its queries) and rendering.
+Each response gets them in a Server-Timing header, and they are added to
+histograms labelled with the route name and action, which metrics_view
+serves in the text format of Prometheus.
+
+The histograms belong to each process: scrape every worker, or run one
+per port. Recording costs a few dictionary updates per request.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+# Upper bounds of the buckets, in seconds, queries or bytes.
+DURATION_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5,
+                    5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current = contextvars.ContextVar('softdesk_metrics', default=None)
+
+
+class Histogram:
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # labels: [count per bucket..., +Inf], sum
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total = self.series.get(labels) or (
+            [0] * (len(self.buckets) + 1), 0
+        )
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.series[labels] = (counts, total + value)
+
+    def lines(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, (counts, total) in sorted(self.series.items()):
+            names = ','.join(f'{key}="{value}"' for key, value in labels)
+            cumulated = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulated += count
+                yield f'{self.name}_bucket{{{names},le="{bound}"}} {cumulated}'
+            yield f'{self.name}_sum{{{names}}} {total:g}'
+            yield f'{self.name}_count{{{names}}} {cumulated}'
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {
+            'duration': Histogram('softdesk_request_duration_seconds',
+                                  'Time spent serving the requests.',
+                                  DURATION_BUCKETS),
+            'phase': Histogram('softdesk_request_phase_seconds',
+                               'Time spent in each phase of the requests.',
+                               DURATION_BUCKETS),
+            'queries': Histogram('softdesk_db_queries',
+                                 'SQL queries run per request.',
+                                 QUERY_BUCKETS),
+            'db': Histogram('softdesk_db_duration_seconds',
+                            'Time spent in SQL queries per request.',
+                            DURATION_BUCKETS),
+            'size': Histogram('softdesk_response_size_bytes',
+                              'Size of the response bodies.',
+                              SIZE_BUCKETS),
+        }
+
+    def record(self, route, action, timings, duration, size):
+        labels = (('route', route), ('action', action))
+        with self._lock:
+            histograms = self.histograms
+            histograms['duration'].observe(labels, duration)
+            histograms['queries'].observe(labels, timings.queries)
+            histograms['db'].observe(labels, timings.db)
+            for phase, spent in timings.phases.items():
+                histograms['phase'].observe(labels + (('phase', phase),),
+                                            spent)
+            if size is not None:
+                histograms['size'].observe(labels, size)
+
+    def render(self):
+        with self._lock:
+            lines = [line for histogram in self.histograms.values()
+                     for line in histogram.lines()]
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.series.clear()
+
+
+registry = Registry()
+
+
+class Timings:
+    """What a request has spent so far."""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.queries = 0
+        self.db = 0.0
+        self.phases = {}
+        self.handler_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def add(self, phase, spent):
+        self.phases[phase] = self.phases.get(phase, 0.0) + spent
+
+
+@contextmanager
+def timer(phase):
+    """Adds the time spent in the block to the phase of the current
+    request, if it is measured."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+def current_request():
+    """Returns the request being measured, if any."""
+    timings = _current.get()
+    return timings and timings.request
+
+
+def server_timing(timings, duration):
+    entries = [f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} '
+               f'queries"']
+    entries += [f'{phase};dur={spent * 1000:.2f}'
+                for phase, spent in timings.phases.items()]
+    entries.append(f'total;dur={duration * 1000:.2f}')
+    return ', '.join(entries)
+
+
+def route_of(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return 'unmatched', ''
+
+    actions = getattr(match.func, 'actions', None) or {}
+    method = request.method.lower()
+    return match.url_name, actions.get(method, method)
+
+
+def time_query(execute, sql, params, many, context):
+    """Execute wrapper of the connections, see install()."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+def install(sender, connection, **kwargs):
+    """Receiver of connection_created: times the queries of the
+    connection run for a measured request, in whichever thread, such as
+    those of sync_to_async() under ASGI."""
+    if time_query not in connection.execute_wrappers:
+        # First, as the connection may be created under the
+        # execute_wrapper() of someone else, which pops the last one.
+        connection.execute_wrappers.insert(0, time_query)
+
+
+@contextmanager
+def measure(request):
+    """Measures the request served in the block."""
+    timings = Timings(request)
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asynchronous = iscoroutinefunction(get_response)
+        if self.asynchronous:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asynchronous:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        with measure(request) as timings:
+            response = self.get_response(request)
+        return self.process(request, response, timings, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with measure(request) as timings:
+            response = await self.get_response(request)
+        return self.process(request, response, timings, started)
+
+    def process(self, request, response, timings, started):
+        duration = time.perf_counter() - started
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+        response.headers['Server-Timing'] = server_timing(timings, duration)
+        registry.record(*route_of(request), timings, duration, size)
+        return response
+
+
+class InstrumentedViewMixin:
+    """Times the phases of a REST framework view for MetricsMiddleware.
+
+    The serialization is the time of the handler of the action, less its
+    SQL queries; the response is rendered here to be timed too.
+    """
+    def perform_authentication(self, request):
+        with timer('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with timer('permissions'):
+            super().check_permissions(request)
+
+    async def acheck_permissions(self, request):
+        with timer('permissions'):
+            await super().acheck_permissions(request)
+
+    def check_throttles(self, request):
+        super().check_throttles(request)
+        # The last check before the handler.
+        timings = _current.get()
+        if timings is not None:
+            timings.handler_started = (time.perf_counter(), timings.db)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        timings = _current.get()
+        if timings is not None and timings.handler_started is not None:
+            started, db = timings.handler_started
+            timings.add('serialization', time.perf_counter() - started
+                        - (timings.db - db))
+            timings.handler_started = None
+
+        response = super().finalize_response(request, response, *args,
+                                             **kwargs)
+        if timings is not None and callable(getattr(response, 'render',
+                                                    None)):
+            with timer('render'):
+                response.render()
+        return response
+
+
+def metrics_view(request):
+    """Serves the histograms to the local addresses only."""
+    allowed = settings.METRICS_ALLOWED_ADDRESSES
+    if request.META.get('REMOTE_ADDR') not in allowed:
+        raise Http404
+    return HttpResponse(registry.render(),
+                        content_type='text/plain; version=0.0.4')
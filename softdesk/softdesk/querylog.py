@@ -0,0 +1,187 @@
+"""Sampled log of the slow SQL queries.
+
+Every database connection gets an execute wrapper that times its
+queries. Those slower than the threshold of the SLOW_QUERY_LOG setting,
+and a random sample of the others, are recorded with the view and action
+of the request that ran them (see metrics.MetricsMiddleware), the
+fingerprint of their SQL, their number of parameters and their duration.
+
+Records go to a bounded buffer, which drops the oldest ones when full,
+and a background thread appends them to the log file as JSON lines: a
+query never waits for the file.
+"""
+import atexit
+import collections
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from . import metrics
+
+# Literals of SQL, names of savepoints, and the lists of placeholders or
+# literals of IN clauses, replaced to group the queries that only differ
+# by their values.
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|\"s\d+_x\d+\"")
+LISTS = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+SPACES = re.compile(r'\s+')
+
+_fingerprints = {}
+
+
+def fingerprint(sql):
+    """Returns the normalized SQL of a query and a short hash of it."""
+    entry = _fingerprints.get(sql)
+    if entry is None:
+        statement = LITERALS.sub('?', sql)
+        statement = LISTS.sub('(...)', statement)
+        statement = SPACES.sub(' ', statement).strip()
+        entry = (statement,
+                 hashlib.sha1(statement.encode()).hexdigest()[:16])
+        if len(_fingerprints) < 10000:
+            _fingerprints[sql] = entry
+    return entry
+
+
+def parameters_count(params, many):
+    if params is None:
+        return 0
+    if many:
+        # executemany(): the parameters of the first execution, which may
+        # be an iterator that must not be consumed here.
+        if isinstance(params, (list, tuple)):
+            return len(params[0]) if params else 0
+        return None
+    return len(params)
+
+
+def view_of(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view = getattr(match.func, 'cls', match.func)
+    return f'{view.__module__}.{view.__qualname__}'
+
+
+class Buffer:
+    """Bounded buffer of records, written by a background thread."""
+
+    def __init__(self, maxlen):
+        self.records = collections.deque(maxlen=maxlen)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def append(self, record):
+        if len(self.records) == self.records.maxlen:
+            self.dropped += 1
+        self.records.append(record)
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name='softdesk-querylog')
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(settings.SLOW_QUERY_LOG['flush_interval'])
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def flush(self):
+        """Writes the buffered records to the log file."""
+        with self._lock:
+            lines = []
+            while self.records:
+                lines.append(json.dumps(self.records.popleft(),
+                                        sort_keys=True))
+            if self.dropped:
+                lines.append(json.dumps({'dropped': self.dropped}))
+                self.dropped = 0
+            if not lines:
+                return
+
+            with open(settings.SLOW_QUERY_LOG['path'], 'a') as file:
+                file.write('\n'.join(lines) + '\n')
+
+
+buffer = None
+
+
+def record(entry):
+    global buffer
+    if buffer is None:
+        buffer = Buffer(settings.SLOW_QUERY_LOG['buffer_size'])
+    buffer.append(entry)
+
+
+def flush():
+    if buffer is not None:
+        buffer.flush()
+
+
+def clear():
+    """Forgets the buffered records, for the tests."""
+    if buffer is not None:
+        buffer.records = collections.deque(
+            maxlen=settings.SLOW_QUERY_LOG['buffer_size']
+        )
+        buffer.dropped = 0
+
+
+def log_query(execute, sql, params, many, context):
+    """Execute wrapper of the connections, see install()."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        config = settings.SLOW_QUERY_LOG
+        slow = duration * 1000 >= config['threshold']
+        if slow or random.random() < config['sample_rate']:
+            log(sql, params, many, context, duration, slow)
+
+
+def log(sql, params, many, context, duration, slow):
+    statement, digest = fingerprint(sql)
+    entry = {
+        'time': time.time(),
+        'database': context['connection'].alias,
+        'duration_ms': round(duration * 1000, 3),
+        'slow': slow,
+        'fingerprint': digest,
+        'sql': statement,
+        'params': parameters_count(params, many),
+        'many': many,
+        'route': None,
+        'action': None,
+        'view': None,
+    }
+
+    request = metrics.current_request()
+    if request is not None:
+        entry['route'], entry['action'] = metrics.route_of(request)
+        entry['view'] = view_of(request)
+    record(entry)
+
+
+def install(sender, connection, **kwargs):
+    """Receiver of connection_created: wraps the queries of the
+    connection, for as long as it lives."""
+    if (settings.SLOW_QUERY_LOG is not None
+            and log_query not in connection.execute_wrappers):
+        # First, as the connection may be created under the
+        # execute_wrapper() of someone else, which pops the last one.
+        connection.execute_wrappers.insert(0, log_query)
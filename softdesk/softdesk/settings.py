@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
+from .databases import from_environment
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -39,10 +43,12 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'authentication',
-    'projects'
+    'projects',
+    'softdesk.apps.SoftDeskConfig'
 ]
 
 MIDDLEWARE = [
+    'softdesk.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,13 +82,111 @@ WSGI_APPLICATION = 'softdesk.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# Set by DATABASE_URL, DATABASE_CONN_MAX_AGE and DATABASE_POOL (see
+# softdesk/databases.py).
 DATABASES = {
+    'default': from_environment(os.environ, BASE_DIR / 'db.sqlite3')
+}
+
+# Pragmas run on every new SQLite connection, how its transactions begin,
+# and the interval in seconds of the maintenance of the database files
+# (see softdesk/sqlite.py). None disables them.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # KiB
+    'temp_store': 'MEMORY',
+}
+SQLITE_TRANSACTION_MODE = 'IMMEDIATE'
+SQLITE_MAINTENANCE_INTERVAL = 300
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'roles': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'roles',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
 }
 
+# Cache of the role of each user in each project (see projects/roles.py).
+# The local tier is a per-process LRU whose entries live at most
+# ROLE_CACHE_LOCAL_TIMEOUT seconds; the shared tier is the cache above.
+# Its entries live ROLE_CACHE_TIMEOUT seconds when it is shared by the
+# workers (e.g. Redis), but no longer than those of the local tier when it
+# is a LocMemCache, which each process has its own copy of.
+ROLE_CACHE_ALIAS = 'roles'
+ROLE_CACHE_TIMEOUT = 300
+ROLE_CACHE_LOCAL_SIZE = 10000
+ROLE_CACHE_LOCAL_TIMEOUT = 5
+
+# Stateless JWT authentication (see authentication/tokens.py). The access
+# tokens are not checked against the database: a revocation takes effect
+# when they expire, at the latest after ACCESS_TOKEN_LIFETIME. The rows of
+# the users are cached by each process for USER_CACHE_TIMEOUT seconds.
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
+    'TOKEN_OBTAIN_SERIALIZER':
+        'authentication.tokens.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER':
+        'authentication.tokens.TokenRefreshSerializer',
+    'TOKEN_USER_CLASS': 'authentication.tokens.ClaimsUser',
+}
+USER_CACHE_SIZE = 1000
+USER_CACHE_TIMEOUT = 60
+
+# Processes hashing and verifying the passwords (see
+# authentication/hashing.py); defaults to the number of CPUs.
+PASSWORD_HASHING_WORKERS = None
+
+AUTHENTICATION_BACKENDS = ['authentication.backends.PooledModelBackend']
+
+# Stored hashes of another cost are replaced at the next login; None is
+# the default of Django.
+PASSWORD_HASH_ITERATIONS = None
+PASSWORD_HASHERS = [
+    'authentication.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Token buckets of the login endpoint, per client address and username
+# (see authentication/throttling.py).
+LOGIN_THROTTLE_RATES = {
+    'address': '100/min',
+    'username': '10/min'
+}
+
+# Client addresses allowed to read the /metrics endpoint (see
+# softdesk/metrics.py).
+METRICS_ALLOWED_ADDRESSES = ['127.0.0.1', '::1']
+
+# Log of the SQL queries slower than `threshold` milliseconds, and of a
+# sample of the others, appended as JSON lines to `path` every
+# `flush_interval` seconds (see softdesk/querylog.py). None disables it,
+# unless the SLOW_QUERY_LOG_PATH environment variable names the file.
+SLOW_QUERY_LOG = None
+if os.environ.get('SLOW_QUERY_LOG_PATH'):
+    SLOW_QUERY_LOG = {
+        'threshold': 100,
+        'sample_rate': 0.001,
+        'path': os.environ['SLOW_QUERY_LOG_PATH'],
+        'buffer_size': 10000,
+        'flush_interval': 1,
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -128,6 +232,21 @@ AUTH_USER_MODEL = 'authentication.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'authentication.tokens.StatelessJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'softdesk.fastjson.UJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # The JSON parser of REST framework: UJSONParser is no faster on the
+    # requests of the API (see benchmarks/serialization.py).
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'TEST_REQUEST_RENDERER_CLASSES': (
+        'rest_framework.renderers.MultiPartRenderer',
+        'softdesk.fastjson.UJSONRenderer',
+    ),
 }
@@ -0,0 +1,103 @@
+"""Tuning of the SQLite connections.
+
+configure() runs the SQLITE_PRAGMAS setting on every new connection:
+with the write-ahead log, readers no longer wait for the writer nor the
+writer for them, and the busy timeout makes the writers queue instead of
+failing with "database is locked". The transactions of Django also begin
+in the SQLITE_TRANSACTION_MODE setting, IMMEDIATE: a deferred one only
+takes the write lock at its first write, and fails right away instead of
+waiting when another connection took it in the meantime.
+
+A background thread also maintains each database file every
+SQLITE_MAINTENANCE_INTERVAL seconds: it refreshes the statistics of the
+query planner (PRAGMA optimize) and checkpoints the write-ahead log
+without waiting for the readers, so that it does not grow forever.
+"""
+import contextlib
+import sqlite3
+import threading
+import time
+import types
+
+from django.conf import settings
+
+_maintained = set()
+_lock = threading.Lock()
+
+
+def configure(sender, connection, **kwargs):
+    """Receiver of connection_created."""
+    if connection.vendor != 'sqlite' or settings.SQLITE_PRAGMAS is None:
+        return
+
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+    if settings.SQLITE_TRANSACTION_MODE is not None:
+        connection._start_transaction_under_autocommit = types.MethodType(
+            begin, connection
+        )
+
+    if not connection.is_in_memory_db():
+        maintain(str(connection.settings_dict['NAME']))
+
+
+def begin(connection):
+    # DatabaseWrapper._start_transaction_under_autocommit(), which runs
+    # a plain BEGIN, that is BEGIN DEFERRED.
+    mode = (getattr(connection, 'sqlite_transaction_mode', None)
+            or settings.SQLITE_TRANSACTION_MODE)
+    connection.cursor().execute(f'BEGIN {mode}')
+
+
+@contextlib.contextmanager
+def deferred(connection):
+    """Begins the transactions of the block in DEFERRED mode, for those
+    that only read: they then take no write lock."""
+    connection.sqlite_transaction_mode = 'DEFERRED'
+    try:
+        yield
+    finally:
+        connection.sqlite_transaction_mode = None
+
+
+def maintain(path):
+    """Starts the maintenance of the database file, once per process."""
+    if settings.SQLITE_MAINTENANCE_INTERVAL is None:
+        return
+
+    with _lock:
+        if path in _maintained:
+            return
+        _maintained.add(path)
+
+    threading.Thread(target=_run, args=(path,), daemon=True,
+                     name='softdesk-sqlite').start()
+
+
+def _run(path):
+    while True:
+        time.sleep(settings.SQLITE_MAINTENANCE_INTERVAL)
+        try:
+            optimize(path)
+        except sqlite3.Error:
+            pass
+
+
+def optimize(path):
+    """Refreshes the statistics of the query planner of the database
+    file, and checkpoints its write-ahead log."""
+    db = sqlite3.connect(path, isolation_level=None)
+    try:
+        busy_timeout = (settings.SQLITE_PRAGMAS or {}).get('busy_timeout')
+        if busy_timeout is not None:
+            db.execute(f'PRAGMA busy_timeout = {busy_timeout}')
+        # At most 400 rows read per index, as SQLite recommends.
+        db.execute('PRAGMA analysis_limit = 400')
+        if sqlite3.sqlite_version_info >= (3, 46):
+            # Checks every table, not only those this connection used.
+            db.execute('PRAGMA optimize = 0x10002')
+        else:
+            db.execute('ANALYZE')
+        return db.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+    finally:
+        db.close()
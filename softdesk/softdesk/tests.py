@@ -0,0 +1,269 @@
+import datetime
+import decimal
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import uuid
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from authentication.models import User
+from projects import models
+from . import databases, querylog, sqlite
+from .fastjson import UJSONParser, UJSONRenderer
+
+
+class UJSONRendererTest(SimpleTestCase):
+    DATA = {
+        'id': 12,
+        'title': 'Un « titre » /   "quoted" \\ 🚀',
+        'created': datetime.datetime(2022, 11, 3, 10, 5, 1, 123456,
+                                     tzinfo=datetime.timezone.utc),
+        'day': datetime.date(2022, 11, 3),
+        'amount': decimal.Decimal('12.5'),
+        'uuid': uuid.UUID(int=1),
+        'error': gettext_lazy('This field is required.'),
+        'tags': ('BUG', 'TASK'),
+        'nothing': None,
+        'flags': [True, False],
+        'big': 2 ** 70,
+    }
+
+    def test_same_as_rest_framework(self):
+        self.assertEqual(JSONRenderer().render(self.DATA),
+                         UJSONRenderer().render(self.DATA))
+
+    def test_same_as_rest_framework_indented(self):
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(JSONRenderer().render(self.DATA, media_type),
+                         UJSONRenderer().render(self.DATA, media_type))
+
+    def test_err_nan(self):
+        with self.assertRaises(ValueError):
+            UJSONRenderer().render({'value': float('nan')})
+
+
+class UJSONParserTest(SimpleTestCase):
+    def parse(self, content):
+        return UJSONParser().parse(io.BytesIO(content))
+
+    def test_same_as_rest_framework(self):
+        content = UJSONRendererTest.DATA['title'].encode()
+        content = b'{"a": [1, 2.5, null, true], "b": "' \
+            + content.replace(b'\\', b'\\\\').replace(b'"', b'\\"') + b'"}'
+
+        self.assertEqual(JSONParser().parse(io.BytesIO(content)),
+                         self.parse(content))
+
+    def test_err_invalid(self):
+        with self.assertRaises(ParseError):
+            self.parse(b'{"a": [1,]}')
+
+    def test_err_constants(self):
+        for content in [b'NaN', b'[Infinity]', b'{"a": -Infinity}']:
+            with self.assertRaises(ParseError):
+                self.parse(content)
+
+    def test_ok_constants_in_strings(self):
+        self.assertEqual({'a': 'NaN'}, self.parse(b'{"a": "NaN"}'))
+
+
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'slow.jsonl')
+        self.enterContext(override_settings(SLOW_QUERY_LOG={
+            'threshold': 0,
+            'sample_rate': 0,
+            'path': self.path,
+            'buffer_size': 5,
+            'flush_interval': 60,
+        }))
+
+        # The connection was created while the log was disabled.
+        querylog.install(None, connection)
+        self.addCleanup(connection.execute_wrappers.remove,
+                        querylog.log_query)
+
+        querylog.clear()
+        self.addCleanup(querylog.clear)
+        self.user = User.objects.create_user(username='bob', password='bob')
+        self.project = models.Project.objects.create(
+            title='A Project',
+            description='This is a project',
+            type=models.Project.BACKEND_TYPE
+        )
+        models.Collaborator.objects.create(
+            user=self.user,
+            project=self.project,
+            role=models.Collaborator.AUTHOR_ROLE
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        querylog.clear()
+
+    def flush(self):
+        querylog.flush()
+        with open(self.path) as file:
+            return [json.loads(line) for line in file]
+
+    def test_fingerprint(self):
+        statement, digest = querylog.fingerprint(
+            'SELECT "a"  FROM "t"\n WHERE "b" = \'it\'\'s\' AND "c" IN '
+            '(%s, %s, %s) LIMIT 21'
+        )
+        self.assertEqual('SELECT "a" FROM "t" WHERE "b" = ? AND "c" IN '
+                         '(...) LIMIT ?', statement)
+        self.assertEqual(digest, querylog.fingerprint(
+            'SELECT "a" FROM "t" WHERE "b" = \'x\' AND "c" IN (%s) LIMIT 2'
+        )[1])
+
+    def test_ok_view_attribution(self):
+        self.client.get(reverse('projects:projects-detail',
+                                args=[self.project.id]))
+
+        records = self.flush()
+        self.assertTrue(records)
+        for record in records:
+            self.assertTrue(record['slow'])
+            self.assertEqual('projects-detail', record['route'])
+            self.assertEqual('retrieve', record['action'])
+            self.assertEqual('projects.views.ProjectView', record['view'])
+            self.assertEqual('default', record['database'])
+            self.assertEqual(16, len(record['fingerprint']))
+            self.assertGreaterEqual(record['duration_ms'], 0)
+        self.assertIn(1, [record['params'] for record in records])
+
+    def test_ok_outside_request(self):
+        list(models.Project.objects.filter(id=self.project.id))
+
+        record, = self.flush()
+        self.assertIsNone(record['route'])
+        self.assertIsNone(record['view'])
+        self.assertEqual(1, record['params'])
+
+    def test_ok_sample(self):
+        with override_settings(SLOW_QUERY_LOG={
+            **settings.SLOW_QUERY_LOG, 'threshold': 10 ** 6
+        }):
+            list(models.Project.objects.all())
+            self.assertEqual(0, len(querylog.buffer.records))
+
+            with mock.patch('random.random', return_value=0):
+                with override_settings(SLOW_QUERY_LOG={
+                    **settings.SLOW_QUERY_LOG, 'sample_rate': .5
+                }):
+                    list(models.Project.objects.all())
+
+        record, = self.flush()
+        self.assertFalse(record['slow'])
+
+    def test_bounded(self):
+        for _ in range(7):
+            list(models.Project.objects.all())
+
+        records = self.flush()
+        self.assertEqual(6, len(records))
+        self.assertEqual({'dropped': 2}, records[-1])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite only')
+class SQLiteProfileTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_ok_pragmas(self):
+        # The test database is in memory, which has no write-ahead log.
+        self.assertEqual(1, self.pragma('synchronous'))
+        self.assertEqual(5000, self.pragma('busy_timeout'))
+        self.assertEqual(-64 * 1024, self.pragma('cache_size'))
+        self.assertEqual(2, self.pragma('temp_store'))
+
+    def test_ok_immediate_transactions(self):
+        self.assertIs(sqlite.begin,
+                      connection._start_transaction_under_autocommit.__func__)
+
+    def test_ok_optimize(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'db.sqlite3')
+        db = sqlite3.connect(path, isolation_level=None)
+        db.execute('PRAGMA journal_mode = WAL')
+        db.execute('CREATE TABLE t (a INTEGER)')
+        db.execute('CREATE INDEX t_a ON t (a)')
+        db.executemany('INSERT INTO t VALUES (?)', [(i,) for i in range(100)])
+
+        busy, frames, checkpointed = sqlite.optimize(path)
+        self.assertEqual(0, busy)
+        self.assertEqual(frames, checkpointed)
+        self.assertTrue(db.execute('SELECT * FROM sqlite_stat1').fetchall())
+        db.close()
+
+    @override_settings(SQLITE_MAINTENANCE_INTERVAL=None)
+    def test_no_maintenance(self):
+        with mock.patch('threading.Thread') as thread:
+            sqlite.maintain('/nowhere/db.sqlite3')
+        thread.assert_not_called()
+
+
+class DatabasesFromEnvironmentTest(SimpleTestCase):
+    def test_default(self):
+        self.assertEqual({
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': 'db.sqlite3',
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False,
+        }, databases.from_environment({}, 'db.sqlite3'))
+
+    def test_postgresql(self):
+        self.assertEqual({
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': 'softdesk',
+            'USER': 'soft',
+            'PASSWORD': 'p@ss',
+            'HOST': 'db',
+            'PORT': '5433',
+            'OPTIONS': {'sslmode': 'require'},
+            'CONN_MAX_AGE': 60,
+            'CONN_HEALTH_CHECKS': True,
+        }, databases.from_environment({
+            'DATABASE_URL': 'postgres://soft:p%40ss@db:5433/softdesk'
+                            '?sslmode=require'
+        }, 'db.sqlite3'))
+
+    def test_pooled(self):
+        config = databases.from_environment({
+            'DATABASE_URL': 'postgresql://soft@localhost/softdesk',
+            'DATABASE_CONN_MAX_AGE': '0',
+            'DATABASE_POOL': 'pgbouncer',
+        }, 'db.sqlite3')
+
+        self.assertEqual(0, config['CONN_MAX_AGE'])
+        self.assertFalse(config['CONN_HEALTH_CHECKS'])
+        self.assertTrue(config['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_sqlite_url(self):
+        self.assertEqual('/tmp/soft.sqlite3', databases.from_environment({
+            'DATABASE_URL': 'sqlite:////tmp/soft.sqlite3'
+        }, 'db.sqlite3')['NAME'])
+
+    def test_err(self):
+        for environ in [{'DATABASE_URL': 'mysql://soft@db/softdesk'},
+                        {'DATABASE_POOL': 'pgbouncer'},
+                        {'DATABASE_URL': 'postgres://db/softdesk',
+                         'DATABASE_POOL': 'pgpool'}]:
+            with self.assertRaises(ValueError):
+                databases.from_environment(environ, 'db.sqlite3')